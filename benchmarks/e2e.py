@@ -0,0 +1,426 @@
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Self
+from unittest import mock
+
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from scrapy.http import HtmlResponse
+
+from benchmarks.fixtures import anilist_media, royalroad_fiction_page, royalroad_listing
+from benchmarks.mongo import mock_client
+from scraper.anilist.api import AniListAPI
+from scraper.anilist.fetcher import AniListFetcher
+from scraper.anilist.models import AniListModel
+from scraper.core import database
+from scraper.core.changes import ChangeTracker
+from scraper.core.database import DBUtils
+from scraper.core.fetcher import Fetcher
+from scraper.core.validation import validate_many
+from scraper.royalroad.fetcher import RoyalRoadFetcher
+from scraper.royalroad.spider import RoyalRoadSpider
+from scraper.utils.settings import reload_settings
+
+PAGE_ALIAS = re.compile(r"p(\d+): Page\(page: (\d+), perPage: (\d+)\)")
+FICTION_PATH = re.compile(r"^/fiction/(\d+)/")
+LISTING_PATH = re.compile(r"^/fictions/([\w-]+)\?page=(\d+)$")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves RoyalRoad pages and AniList GraphQL responses from fixtures.
+
+    Recorded pages under the server's `root` are served when present
+    (`royalroad/<listing>/<page>.html`, `royalroad/fiction/<id>.html` and
+    `anilist/<page>.json`); anything else is rendered by `benchmarks.fixtures`.
+    """
+
+    server: "FixtureServer"
+
+    def log_message(self, *_: object) -> None:
+        """Keep the benchmark output quiet."""
+
+    def do_GET(self) -> None:
+        """Serve robots.txt, a listing page or a fiction page."""
+        if self.path == "/robots.txt":
+            self.reply(b"User-agent: *\nAllow: /\n", "text/plain")
+        elif match := LISTING_PATH.match(self.path):
+            listing, page = match[1], int(match[2])
+            self.server.hits["royalroad"] += 1
+            recorded = self.server.recorded(f"royalroad/{listing}/{page}.html")
+            self.reply(recorded or royalroad_listing(page), "text/html")
+        elif match := FICTION_PATH.match(self.path):
+            fiction_id = int(match[1])
+            self.server.hits["royalroad_details"] += 1
+            recorded = self.server.recorded(f"royalroad/fiction/{fiction_id}.html")
+            self.reply(recorded or royalroad_fiction_page(fiction_id), "text/html")
+        else:
+            self.send_error(404)
+
+    def do_POST(self) -> None:
+        """Answer an AniList GraphQL query with one media list per page alias."""
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length))["query"]
+        data = {}
+        for alias, page, per_page in PAGE_ALIAS.findall(query):
+            self.server.hits["anilist"] += 1
+            recorded = self.server.recorded(f"anilist/{page}.json")
+            media = (
+                json.loads(recorded)
+                if recorded
+                else anilist_media(int(page), int(per_page))
+            )
+            data[f"p{alias}"] = {"media": media}
+        self.reply(
+            json.dumps({"data": data}).encode(),
+            "application/json",
+            {"X-RateLimit-Limit": "100000", "X-RateLimit-Remaining": "100000"},
+        )
+
+    def reply(
+        self, body: bytes, content_type: str, headers: dict[str, str] | None = None
+    ) -> None:
+        """Send a 200 response.
+
+        Args:
+            body (bytes): The body.
+            content_type (str): The Content-Type.
+            headers (dict[str, str] | None, optional): Extra headers.
+                Defaults to None.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """A local stand-in for RoyalRoad and AniList, counting what it serves."""
+
+    daemon_threads = True
+
+    def __init__(self, root: Path | None = None) -> None:
+        """Initialize the FixtureServer on a free local port.
+
+        Args:
+            root (Path | None, optional): A directory of recorded responses.
+                Defaults to None, which serves synthetic fixtures only.
+        """
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.root = root
+        self.hits: Counter[str] = Counter()
+        self.bytes_sent = 0
+
+    @property
+    def url(self) -> str:
+        """Get the root URL of the server.
+
+        Returns:
+            str: e.g. "http://127.0.0.1:54321".
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def recorded(self, name: str) -> bytes | None:
+        """Read a recorded response, if one exists.
+
+        Args:
+            name (str): The path under the fixture root.
+
+        Returns:
+            bytes | None: The body, or None.
+        """
+        if self.root is None or not (self.root / name).is_file():
+            return None
+        return (self.root / name).read_bytes()
+
+    def start(self) -> None:
+        """Serve requests from a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class ClientCounter:
+    """Counts the MongoDB clients the scraper builds during a benchmark.
+
+    Every `DBUtils.get_collection` used to build its own `MongoClient`, so
+    `collection_lookups` is what an unpooled run would have paid in clients
+    (and server discovery and TLS handshakes); `mongo_clients` is what this
+    run built.
+    """
+
+    def __init__(self, mongo_uri: str | None) -> None:
+        """Initialize the ClientCounter.
+
+        Args:
+            mongo_uri (str | None): A real MongoDB to connect to, or None to
+                hand out one mongomock client for every construction.
+        """
+        self.counts: Counter[str] = Counter()
+        self.stand_in = None if mongo_uri else mock_client()
+        self.get_collection = DBUtils.get_collection
+
+    def client(self, *args: Any, **kwargs: Any) -> MongoClient:  # noqa: ANN401
+        """Build a client in place of `MongoClient`, counting it.
+
+        Args:
+            *args (Any): The arguments of `MongoClient`.
+            **kwargs (Any): The keyword arguments of `MongoClient`.
+
+        Returns:
+            MongoClient: The new client, or the mongomock stand-in.
+        """
+        self.counts["mongo_clients"] += 1
+        if self.stand_in is not None:
+            return self.stand_in
+        return MongoClient(*args, **kwargs)
+
+    def collection(self, name: str) -> Collection:
+        """Look up a collection through `DBUtils`, counting the lookup.
+
+        Args:
+            name (str): The name of the collection.
+
+        Returns:
+            Collection: The collection.
+        """
+        self.counts["collection_lookups"] += 1
+        return self.get_collection(name)
+
+    def __enter__(self) -> Self:
+        """Count client constructions and collection lookups until exit.
+
+        Returns:
+            Self: This counter.
+        """
+        self.patches = ExitStack()
+        self.patches.enter_context(
+            mock.patch.object(database, "MongoClient", self.client)
+        )
+        self.patches.enter_context(
+            mock.patch.object(DBUtils, "get_collection", self.collection)
+        )
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop counting."""
+        self.patches.close()
+
+
+def peak_rss() -> int:
+    """Get the peak resident set size of the process so far.
+
+    Returns:
+        int: The peak RSS in bytes.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure(fn: Callable[[], int], units: int | None = None) -> dict[str, Any]:
+    """Time a call and report its throughput.
+
+    Args:
+        fn (Callable[[], int]): The call; returns the number of items handled.
+        units (int | None, optional): The number of pages, when it differs
+            from the items. Defaults to None.
+
+    Returns:
+        dict[str, Any]: The items, seconds, items/sec and peak RSS.
+    """
+    start = time.perf_counter()
+    items = fn()
+    seconds = time.perf_counter() - start
+    result = {
+        "items": items,
+        "seconds": seconds,
+        "items_per_second": items / seconds if seconds else 0.0,
+        "peak_rss_bytes": peak_rss(),
+    }
+    if units is not None:
+        result["pages"] = units
+        result["pages_per_second"] = units / seconds if seconds else 0.0
+    return result
+
+
+def configure(server: FixtureServer, data_path: Path, mongo_uri: str | None) -> None:
+    """Point the scraper at the fixture server and a MongoDB.
+
+    Args:
+        server (FixtureServer): The running fixture server.
+        data_path (Path): A scratch DATA_PATH.
+        mongo_uri (str | None): A real MongoDB to write to, or None for
+            the mongomock stand-in `ClientCounter` hands out.
+    """
+    os.environ.update(
+        {
+            "SCRAPER_DATA_PATH": str(data_path),
+            "SCRAPER_DATABASE__URI": mongo_uri or "mongodb://benchmark",
+            "SCRAPER_SCRAPER__ROYALROAD_URL": server.url,
+            "SCRAPER_SCRAPER__ANILIST_URL": f"{server.url}/graphql",
+            "SCRAPER_SCRAPER__DOWNLOAD_DELAY": "0",
+            "SCRAPER_SCRAPER__ADAPTIVE_THROTTLE": "false",
+        }
+    )
+    reload_settings()
+
+
+def micro_benchmarks(pages: int) -> dict[str, Any]:
+    """Time parsing, validation and queuing writes without any network.
+
+    Args:
+        pages (int): Number of RoyalRoad listing pages and AniList pages.
+
+    Returns:
+        dict[str, Any]: The results of each stage.
+    """
+    responses = [
+        HtmlResponse(
+            url=f"https://www.royalroad.com/fictions/best-rated?page={page}",
+            body=royalroad_listing(page),
+            encoding="utf-8",
+        )
+        for page in range(1, pages + 1)
+    ]
+    api = AniListAPI(query_limit=pages * 50, page="Top 100", max_pages=pages)
+    api.name = "anilist_benchmark"
+    media = [anilist_media(page) for page in range(1, pages + 1)]
+    rows = [row for page in media for row in api.parse_response(page)]
+    dumped = [row.model_dump() for row in rows]
+
+    def parse() -> int:
+        return sum(len(RoyalRoadSpider.parse_response(r)) for r in responses)
+
+    def validate() -> int:
+        return len(validate_many(AniListModel, dumped))
+
+    def save() -> int:
+        with api.writer:
+            api.save_to_coll(rows)
+        return len(rows)
+
+    return {
+        "royalroad_parse_response": measure(parse, pages),
+        "anilist_validation": measure(validate),
+        "anilist_save_to_coll": measure(save),
+    }
+
+
+def fetch_benchmarks(server: FixtureServer, pages: int) -> dict[str, Any]:
+    """Run both fetchers end to end against the fixture server.
+
+    Args:
+        server (FixtureServer): The running fixture server.
+        pages (int): Number of listing pages each fetcher requests.
+
+    Returns:
+        dict[str, Any]: The results of each fetch.
+    """
+
+    def fetch(fetcher: Fetcher, collection: str) -> Callable[[], int]:
+        def run() -> int:
+            server.hits[fetcher.source] = 0
+            fetcher.fetch()
+            return DBUtils.get_collection(collection).count_documents({})
+
+        return run
+
+    results = {}
+    for name, fetcher in {
+        "anilist_fetch": AniListFetcher(query_limit=pages * 50, max_pages=pages),
+        "anilist_fetch_concurrent": AniListFetcher(
+            query_limit=pages * 50, max_pages=pages, concurrent=True
+        ),
+    }.items():
+        DBUtils.get_collection("anilist").drop()
+        ChangeTracker.get("anilist").load(reload=True)
+        results[name] = measure(fetch(fetcher, "anilist"))
+        results[name]["pages"] = server.hits["anilist"]
+    # The reactor cannot be restarted, so the Scrapy fetch runs last.
+    fetcher = RoyalRoadFetcher(query_limit=pages * 20, max_pages=pages)
+    results["royalroad_fetch"] = measure(fetch(fetcher, "royalroad"))
+    results["royalroad_fetch"]["pages"] = server.hits["royalroad"]
+    for result in results.values():
+        result["pages_per_second"] = result["pages"] / result["seconds"]
+    return results
+
+
+def git_commit() -> str | None:
+    """Get the commit the benchmark runs on, to compare results across commits.
+
+    Returns:
+        str | None: The commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Benchmark the scrapers end to end against local stand-ins.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+
+    Returns:
+        dict: The results, also printed as JSON.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument(
+        "--fixtures", type=Path, help="directory of recorded responses to serve"
+    )
+    parser.add_argument(
+        "--mongo-uri", help="write to this MongoDB instead of mongomock"
+    )
+    parser.add_argument("--output", type=Path, help="also write the JSON here")
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(args.fixtures)
+    server.start()
+    with (
+        tempfile.TemporaryDirectory() as data_path,
+        ClientCounter(args.mongo_uri) as clients,
+    ):
+        configure(server, Path(data_path), args.mongo_uri)
+        results = {
+            "commit": git_commit(),
+            "pages": args.pages,
+            "micro": micro_benchmarks(args.pages),
+            "fetch": fetch_benchmarks(server, args.pages),
+            "bytes_served": server.bytes_sent,
+            "peak_rss_bytes": peak_rss(),
+            **clients.counts,
+        }
+    server.shutdown()
+    output = json.dumps(results, indent=2)
+    print(output)  # noqa: T201
+    if args.output is not None:
+        args.output.write_text(output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import random
+from datetime import date, timedelta
+from html import escape
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Comedy",
+    "Drama",
+    "Fantasy",
+    "Horror",
+    "LitRPG",
+    "Magic",
+    "Progression",
+    "Romance",
+    "Sci-fi",
+    "Slice of Life",
+]
+WORDS = [
+    "the",
+    "of",
+    "a",
+    "and",
+    "to",
+    "in",
+    "is",
+    "was",
+    "he",
+    "for",
+    "it",
+    "with",
+    "as",
+    "his",
+    "on",
+    "be",
+    "at",
+    "by",
+]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """Build a random lowercase sentence.
+
+    Args:
+        rng (random.Random): The random source.
+        words (int): The number of words.
+
+    Returns:
+        str: The sentence.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def royalroad_fiction(rng: random.Random, fiction_id: int) -> str:
+    """Render one RoyalRoad `fiction-list-item` in the site's markup.
+
+    Args:
+        rng (random.Random): The random source.
+        fiction_id (int): The fiction id, also used in its title.
+
+    Returns:
+        str: The HTML of the fiction card.
+    """
+    genres = "".join(
+        f'<a class="label label-default fiction-tag" href="/fictions/search?tagsAdd='
+        f'{escape(genre)}">{escape(genre)}</a>'
+        for genre in rng.sample(GENRES, rng.randint(1, 6))
+    )
+    updated = date(2025, 1, 1) - timedelta(days=rng.randint(0, 900))
+    paragraphs = "".join(
+        f"<p>{_sentence(rng, rng.randint(8, 40))}</p>" for _ in range(rng.randint(1, 4))
+    )
+    return f"""
+<div class="fiction-list-item row">
+  <figure class="col-sm-2 text-center">
+    <a href="/fiction/{fiction_id}/fiction-{fiction_id}">
+      <img src="/covers/{fiction_id}.jpg"></a>
+  </figure>
+  <div class="col-sm-10">
+    <h2 class="fiction-title">
+      <a href="/fiction/{fiction_id}/fiction-{fiction_id}" class="font-red-sunglo bold">
+        Fiction {fiction_id} &amp; Friends </a>
+    </h2>
+    <div class="margin-bottom-10">
+      <span class="label label-default label-sm bg-blue-hoki">Original</span>
+      <span class="tags">{genres}</span>
+    </div>
+    <div class="row stats">
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-users"></i><span>{rng.randint(0, 90000):,} Followers</span>
+      </div>
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-star"></i><span class="star" title="{rng.randint(0, 500) / 100}"
+          aria-label="Rating"></span>
+      </div>
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-book"></i><span>{rng.randint(1, 9000):,} Pages</span>
+      </div>
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-eye"></i><span>{rng.randint(0, 9000000):,} Views</span>
+      </div>
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-list"></i><span>{rng.randint(1, 2000):,} Chapters</span>
+      </div>
+      <div class="col-sm-6 uppercase bold font-blue-dark">
+        <i class="fa fa-calendar"></i><span><time unixtime="0" format="agoshort"
+          >{updated.strftime("%b %d, %Y")}</time></span>
+      </div>
+    </div>
+    <div id="description-{fiction_id}" class="hidden-content">{paragraphs}</div>
+  </div>
+</div>"""
+
+
+def royalroad_listing(page: int, per_page: int = 20, seed: int = 0) -> bytes:
+    """Render a synthetic RoyalRoad listing page.
+
+    Args:
+        page (int): The page number, which selects the fictions on it.
+        per_page (int, optional): Fictions per page. Defaults to 20.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        bytes: The UTF-8 encoded HTML page.
+    """
+    rng = random.Random(seed * 100003 + page)  # noqa: S311
+    start = (page - 1) * per_page
+    items = "".join(royalroad_fiction(rng, start + i) for i in range(per_page))
+    return (
+        "<!DOCTYPE html><html><head><title>Fictions | Royal Road</title></head>"
+        f'<body><div class="fiction-list">{items}</div></body></html>'
+    ).encode()
+
+
+def royalroad_fiction_page(fiction_id: int, chapters: int = 50, seed: int = 0) -> bytes:
+    """Render a synthetic RoyalRoad fiction detail page.
+
+    Args:
+        fiction_id (int): The fiction id, as linked from the listings.
+        chapters (int, optional): Number of chapters. Defaults to 50.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        bytes: The UTF-8 encoded HTML page.
+    """
+    rng = random.Random(seed * 100003 + fiction_id)  # noqa: S311
+    base = f"/fiction/{fiction_id}/fiction-{fiction_id}"
+    published = 1600000000 + rng.randint(0, 10**7)
+    rows = []
+    for i in range(1, chapters + 1):
+        published += rng.randint(3600, 7 * 86400)
+        rows.append(
+            f"""
+<tr style="cursor: pointer" data-url="{base}/chapter/{i}" class="chapter-row">
+  <td><a href="{base}/chapter/{i}/chapter-{i}">Chapter {i}</a></td>
+  <td data-content="{i - 1}" class="text-right"><a href="{base}/chapter/{i}">
+    <time unixtime="{published}" format="ago">some time ago</time></a></td>
+</tr>"""
+        )
+    stats = {
+        "Total Views": rng.randint(1000, 9000000),
+        "Average Views": rng.randint(100, 90000),
+        "Followers": rng.randint(0, 90000),
+        "Favorites": rng.randint(0, 20000),
+        "Ratings": rng.randint(0, 20000),
+        "Pages": rng.randint(1, 9000),
+    }
+    items = "".join(
+        f'<li class="bold uppercase">{label} :</li>'
+        f'<li class="bold uppercase font-red-sunglo">{value:,}</li>'
+        for label, value in stats.items()
+    )
+    return f"""<!DOCTYPE html><html><head><title>Fiction {fiction_id}</title></head>
+<body>
+<div class="fic-header"><div class="fic-title"><div class="col">
+  <h1 class="font-white">Fiction {fiction_id} &amp; Friends</h1></div></div></div>
+<div class="fiction-stats"><div class="stats-content">
+  <div class="col-sm-6"><ul class="list-unstyled">
+    <li class="bold uppercase font-red-sunglo">Overall Score</li>
+    <li><span data-content="{rng.randint(0, 500) / 100} / 5" class="star"></span></li>
+  </ul></div>
+  <div class="col-sm-6"><ul class="list-unstyled">{items}</ul></div>
+</div></div>
+<table class="table no-border" id="chapters"><thead><tr><th>Chapter Name</th>
+<th>Release Date</th></tr></thead><tbody>{"".join(rows)}</tbody></table>
+</body></html>""".encode()
+
+
+def anilist_media(page: int, per_page: int = 50, seed: int = 0) -> list[dict]:
+    """Build one page of synthetic AniList media, as the GraphQL API returns it.
+
+    Args:
+        page (int): The page number, which selects the media on it.
+        per_page (int, optional): Media per page. Defaults to 50.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        list[dict]: The `media` list of the page.
+    """
+    rng = random.Random(seed * 100003 + page)  # noqa: S311
+    start = (page - 1) * per_page
+    english_share = 0.7
+    return [
+        {
+            "title": {
+                "english": f"Manga {i}" if rng.random() < english_share else None,
+                "romaji": f"Manga {i} no Monogatari",
+            },
+            "genres": rng.sample(GENRES, rng.randint(1, 4)),
+            "popularity": rng.randint(0, 500000),
+            "favourites": rng.randint(0, 50000),
+            "averageScore": rng.randint(0, 100),
+            "status": rng.choice(["RELEASING", "FINISHED", "HIATUS"]),
+            "description": " ".join(
+                _sentence(rng, rng.randint(8, 40)) for _ in range(rng.randint(1, 6))
+            ),
+        }
+        for i in range(start, start + per_page)
+    ]
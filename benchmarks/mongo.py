@@ -0,0 +1,49 @@
+"""An in-memory MongoDB for the benchmarks and tests.
+
+mongomock 4.3 predates pymongo 4.11, whose `UpdateOne` hands a `sort`
+argument to the bulk builder on every bulk write, set or not. The builder is
+patched to accept it while unset, which is all the scraper's upserts need.
+"""
+
+import inspect
+from typing import Any
+
+import mongomock
+from mongomock.collection import BulkOperationBuilder
+
+_add_update = BulkOperationBuilder.add_update
+
+
+def _add_update_unsorted(
+    self: BulkOperationBuilder,
+    *args: Any,  # noqa: ANN401
+    sort: dict[str, Any] | None = None,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    """Add an update to a bulk write, refusing a sort mongomock cannot apply.
+
+    Args:
+        self (BulkOperationBuilder): The bulk write.
+        *args (Any): The arguments of `add_update`.
+        sort (dict[str, Any] | None, optional): The sort of an update that
+            matches several documents. Defaults to None.
+        **kwargs (Any): The keyword arguments of `add_update`.
+
+    Raises:
+        NotImplementedError: If a sort is given.
+    """
+    if sort is not None:
+        msg = "mongomock cannot sort bulk updates"
+        raise NotImplementedError(msg)
+    _add_update(self, *args, **kwargs)
+
+
+def mock_client() -> mongomock.MongoClient:
+    """Create an in-memory MongoDB client that accepts the pinned pymongo's writes.
+
+    Returns:
+        mongomock.MongoClient: The client.
+    """
+    if "sort" not in inspect.signature(_add_update).parameters:
+        BulkOperationBuilder.add_update = _add_update_unsorted
+    return mongomock.MongoClient()
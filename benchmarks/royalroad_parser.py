@@ -0,0 +1,121 @@
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.fixtures import royalroad_listing
+from scraper.royalroad.models import RoyalRoadModel
+from scraper.royalroad.parser import parse_fiction_list
+from scraper.royalroad.replay import iter_saved_pages, load_saved_page
+from scraper.royalroad.spider import RoyalRoadSpider
+
+
+def fixture_responses(pages: int, saved: bool = False) -> list[HtmlResponse]:
+    """Build the listing pages to parse.
+
+    Args:
+        pages (int): Number of synthetic pages.
+        saved (bool, optional): Also include the pages saved by real crawls.
+            Defaults to False.
+
+    Returns:
+        list[HtmlResponse]: The responses.
+    """
+    responses = [
+        HtmlResponse(
+            url=f"https://www.royalroad.com/fictions/best-rated?page={page}",
+            body=royalroad_listing(page),
+            encoding="utf-8",
+        )
+        for page in range(1, pages + 1)
+    ]
+    if saved:
+        responses += [
+            HtmlResponse(url=str(page), body=load_saved_page(page), encoding="utf-8")
+            for page in iter_saved_pages()
+        ]
+    return responses
+
+
+def check_parity(responses: list[HtmlResponse]) -> int:
+    """Check that both parsers produce identical models for every page.
+
+    Args:
+        responses (list[HtmlResponse]): The pages to compare.
+
+    Returns:
+        int: The number of items compared.
+
+    Raises:
+        AssertionError: If any page parses differently.
+    """
+    count = 0
+    for response in responses:
+        expected = RoyalRoadSpider.parse_response_css(response)
+        actual = parse_fiction_list(response.text)
+        if expected != actual:
+            msg = f"parsers disagree on {response.url}"
+            raise AssertionError(msg)
+        count += len(expected)
+    return count
+
+
+def items_per_second(
+    parse: Callable[[HtmlResponse], list[RoyalRoadModel]],
+    responses: list[HtmlResponse],
+    repeat: int,
+) -> float:
+    """Measure the throughput of a parser.
+
+    Args:
+        parse (Callable[[HtmlResponse], list[RoyalRoadModel]]): The parser.
+        responses (list[HtmlResponse]): The pages to parse.
+        repeat (int): How many times to parse every page.
+
+    Returns:
+        float: Items parsed per second.
+    """
+    items = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            items += len(parse(response))
+    return items / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Compare the CSS and lxml RoyalRoad parsers.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+
+    Returns:
+        dict: The results, also printed as JSON.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=4)
+    parser.add_argument("--saved", action="store_true", help="add saved pages")
+    args = parser.parse_args(argv)
+
+    responses = fixture_responses(args.pages, saved=args.saved)
+    results = {
+        "pages": len(responses),
+        "items_checked": check_parity(responses),
+        "css_items_per_sec": items_per_second(
+            RoyalRoadSpider.parse_response_css, responses, args.repeat
+        ),
+        "lxml_items_per_sec": items_per_second(
+            lambda r: parse_fiction_list(r.text), responses, args.repeat
+        ),
+    }
+    results["speedup"] = results["lxml_items_per_sec"] / results["css_items_per_sec"]
+    print(json.dumps(results, indent=2))  # noqa: T201
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import json
+import time
+from typing import Any
+
+import numpy as np
+
+from scraper.core.trends import TrendMatrix, compute_trends, to_matrix, top_n
+
+
+def synthetic_observations(
+    series: int, days: int, per_day: int = 2, seed: int = 0
+) -> dict[str, Any]:
+    """Build flat follower/view observations like `load_matrix` collects.
+
+    Every series is a noisy random walk; a few percent grow several times
+    faster over the last week, and a tenth of the observations are missing.
+
+    Args:
+        series (int): Number of series.
+        days (int): Number of days.
+        per_day (int, optional): Observations per series and day. Defaults to 2.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        dict[str, Any]: The `to_matrix` arguments.
+    """
+    rng = np.random.default_rng(seed)
+    steps = days * per_day
+    base = rng.lognormal(6, 1.5, series)
+    growth = rng.gamma(2, 0.002, (series, 1)) * base[:, None]
+    growth = np.repeat(growth, steps, axis=1) * rng.uniform(0, 2, (series, steps))
+    rising = rng.random(series) < 0.02  # noqa: PLR2004
+    growth[rising, -7 * per_day :] *= 8
+    followers = base[:, None] + np.cumsum(growth, axis=1)
+    views = followers * rng.uniform(20, 80, (series, 1))
+    first = np.datetime64("2026-01-01")
+    offsets = np.arange(steps) * np.timedelta64(24 * 60 // per_day, "m")
+    stamps = np.broadcast_to(first + offsets, (series, steps))
+    rows = np.broadcast_to(np.arange(series)[:, None], (series, steps))
+    keep = rng.random((series, steps)) >= 0.1  # noqa: PLR2004
+    return {
+        "keys": [f"Fiction {i}" for i in range(series)],
+        "rows": rows[keep],
+        "stamps": stamps[keep].astype("datetime64[ms]"),
+        "columns": {"followers": followers[keep], "views": views[keep]},
+        "first": first,
+        "days": days,
+    }
+
+
+def per_series(matrix: TrendMatrix, window: int) -> list[float]:
+    """Compute the follower velocity one series at a time, as a loop would.
+
+    Args:
+        matrix (TrendMatrix): The daily matrix.
+        window (int): The number of days.
+
+    Returns:
+        list[float]: The velocity of each series.
+    """
+    result = []
+    for row in matrix.values["followers"].tolist():
+        observed = [(i, v) for i, v in enumerate(row) if v == v]  # noqa: PLR0124
+        recent = [(i, v) for i, v in observed if i >= len(row) - 1 - window]
+        if len(recent) < 2:  # noqa: PLR2004
+            result.append(float("nan"))
+            continue
+        (i0, v0), (i1, v1) = recent[0], recent[-1]
+        result.append((v1 - v0) / (i1 - i0))
+    return result
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Time the vectorized trend engine on synthetic series.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+
+    Returns:
+        dict: The results, also printed as JSON.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--series", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--window", type=int, default=7)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    observations = synthetic_observations(args.series, args.days)
+    start = time.perf_counter()
+    matrix = to_matrix(**observations)
+    built = time.perf_counter()
+    trends = compute_trends(matrix, args.window)
+    computed = time.perf_counter()
+    entries = top_n(matrix, trends, args.top)
+    ranked = time.perf_counter()
+    per_series(matrix, args.window)
+    looped = time.perf_counter()
+
+    results = {
+        "series": args.series,
+        "observations": len(observations["rows"]),
+        "matrix_seconds": built - start,
+        "trends_seconds": computed - built,
+        "top_n_seconds": ranked - computed,
+        "total_seconds": ranked - start,
+        "per_series_velocity_seconds": looped - ranked,
+        "top": [entry["title"] for entry in entries[:5]],
+    }
+    print(json.dumps(results, indent=2))  # noqa: T201
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from benchmarks.fixtures import royalroad_listing
+from scraper.anilist.models import AniListModel
+from scraper.core.validation import documents, dump_many, validate_many
+from scraper.royalroad.models import RoyalRoadModel
+from scraper.royalroad.parser import fiction_rows
+
+
+def anilist_rows(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Build synthetic AniList rows as `AniListAPI.parse_response` does.
+
+    Args:
+        count (int): Number of rows.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        list[dict[str, Any]]: The rows.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    return [
+        {
+            "title": f"Manga {i}",
+            "genres": rng.sample(["Action", "Drama", "Fantasy", "Romance"], 2),
+            "popularity": rng.randint(0, 500000),
+            "favorites": rng.randint(0, 50000),
+            "rating": rng.randint(0, 100),
+            "status": "RELEASING",
+            "description": "A story. " * rng.randint(5, 60),
+        }
+        for i in range(count)
+    ]
+
+
+def royalroad_rows(count: int) -> list[dict[str, Any]]:
+    """Build RoyalRoad rows by parsing synthetic listing pages.
+
+    Args:
+        count (int): Number of rows, rounded up to whole pages of 20.
+
+    Returns:
+        list[dict[str, Any]]: The rows.
+    """
+    rows = []
+    page = 1
+    while len(rows) < count:
+        rows += fiction_rows(royalroad_listing(page).decode())
+        page += 1
+    return rows
+
+
+def per_object(model: type[BaseModel], rows: list[dict]) -> list[dict]:
+    """Validate and dump one object at a time, as the spiders used to.
+
+    Args:
+        model (type[BaseModel]): The model class.
+        rows (list[dict]): The rows.
+
+    Returns:
+        list[dict]: The documents.
+    """
+    return [model(**row).model_dump() for row in rows]
+
+
+def batch(model: type[BaseModel], rows: list[dict]) -> list[dict]:
+    """Validate and dump a whole page through the cached list adapter.
+
+    Args:
+        model (type[BaseModel]): The model class.
+        rows (list[dict]): The rows.
+
+    Returns:
+        list[dict]: The documents.
+    """
+    return dump_many(model, validate_many(model, rows))
+
+
+def construct(model: type[BaseModel], rows: list[dict]) -> list[dict]:
+    """Construct without validation, then dump through the list adapter.
+
+    Args:
+        model (type[BaseModel]): The model class.
+        rows (list[dict]): The rows.
+
+    Returns:
+        list[dict]: The documents.
+    """
+    return dump_many(model, validate_many(model, rows, trusted=True))
+
+
+def trusted(model: type[BaseModel], rows: list[dict]) -> list[dict]:
+    """Skip the models and fill in the defaults of already typed rows.
+
+    Args:
+        model (type[BaseModel]): The model class.
+        rows (list[dict]): The rows.
+
+    Returns:
+        list[dict]: The documents.
+    """
+    return documents(model, rows, trusted=True)
+
+
+def items_per_second(
+    fn: Callable[[type[BaseModel], list[dict]], list[dict]],
+    model: type[BaseModel],
+    rows: list[dict],
+    page_size: int,
+    repeat: int,
+) -> float:
+    """Measure the throughput of a validation strategy, page by page.
+
+    Args:
+        fn (Callable[[type[BaseModel], list[dict]], list[dict]]): The strategy.
+        model (type[BaseModel]): The model class.
+        rows (list[dict]): The rows.
+        page_size (int): Rows handled per call.
+        repeat (int): How many times to process every row.
+
+    Returns:
+        float: Items per second.
+    """
+    pages = [rows[i : i + page_size] for i in range(0, len(rows), page_size)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            fn(model, page)
+    return len(rows) * repeat / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Compare per-object, batch, constructed and trusted model validation.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+
+    Returns:
+        dict: The results, also printed as JSON.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cases = {
+        "royalroad": (RoyalRoadModel, royalroad_rows(args.items), 20),
+        "anilist": (AniListModel, anilist_rows(args.items), 50),
+    }
+    results = {}
+    for name, (model, rows, page_size) in cases.items():
+        results[name] = {
+            strategy.__name__: items_per_second(
+                strategy, model, rows, page_size, args.repeat
+            )
+            for strategy in (per_object, batch, construct, trusted)
+        }
+    print(json.dumps(results, indent=2))  # noqa: T201
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,47 @@
 import time
+from functools import partial
 
 import requests
-from pymongo import UpdateOne
 
 from scraper.anilist.models import AniListModel
 from scraper.anilist.types import AniListPages
-from scraper.core.database import DBUtils
-from scraper.utils.utils import get_config
+from scraper.core.checkpoint import Checkpoint
+from scraper.core.metrics import Metrics
+from scraper.core.pipeline import BatchWriter, item_ops
+from scraper.core.throttle import AdaptiveThrottle, host_of, retry_after
+from scraper.core.validation import dump_many, validate_many
+from scraper.utils.settings import get_settings
 
 HTTP_OK = 200
+MAX_PER_PAGE = 50
 
 
 class AniListAPI:
-    """A class for interacting with the AniList API."""
+    """A class for interacting with the AniList API.
+
+    The selected media fields live in `media_fields`; extend it (e.g. with
+    "id", "updatedAt" or "chapters") to request more data per item. Pages are
+    cut to the size that lets ANILIST_PAGES_PER_QUERY of them share one
+    request within the ANILIST_MAX_COMPLEXITY budget.
+    """
 
-    entries_per_page = 50
     name = "anilist"
+    media_fields: tuple[str, ...] = (
+        "title { english romaji }",
+        "genres",
+        "popularity",
+        "favourites",
+        "averageScore",
+        "status",
+        "description",
+    )
 
     def __init__(
         self,
         query_limit: int,
         page: AniListPages,
         max_pages: int,
+        checkpoint: Checkpoint | None = None,
     ) -> None:
         """Initialize the AniListAPI with a query limit and page type.
 
@@ -29,44 +49,193 @@ class AniListAPI:
             query_limit (int): The maximum number of items to scrape.
             page (AniListPages): The page type to scrape.
             max_pages (int): The maximum number of pages to scrape.
+            checkpoint (Checkpoint | None, optional): The run's checkpoint;
+                pages it already has are skipped and fetched pages are marked
+                done once their items are written. Defaults to None.
         """
         self.query_limit = query_limit
         self.page = page
         self.max_pages = max_pages
+        self.checkpoint = checkpoint
+        self.writer = BatchWriter()
+        self.entries_per_page = self.fit_page_size()
+
+    def fit_page_size(self) -> int:
+        """Get the largest page size that lets a full batch fit the budget.
+
+        AniList charges every media field once per entry, so a request holds
+        about the same number of entries however they are split into pages;
+        smaller pages let ANILIST_PAGES_PER_QUERY of them share it.
+
+        Returns:
+            int: The entries per page, at most AniList's 50.
+        """
+        cfg = get_settings().scraper
+        page_budget = cfg.anilist_max_complexity // max(1, cfg.anilist_pages_per_query)
+        return max(1, min(MAX_PER_PAGE, (page_budget - 1) // self.field_count()))
+
+    @property
+    def item_limit(self) -> int:
+        """Get the most items to fetch.
+
+        `max_pages` counts pages of AniList's largest size, so the cap does not
+        depend on how small the pages are cut.
+
+        Returns:
+            int: The query limit, capped at `max_pages` full pages.
+        """
+        return min(self.query_limit, self.max_pages * MAX_PER_PAGE)
+
+    def page_numbers(self) -> range:
+        """Get the page numbers to fetch for the query limit and page cap.
+
+        Returns:
+            range: The 1-based page numbers to fetch.
+        """
+        return range(1, -(-self.item_limit // self.entries_per_page) + 1)
 
     def start(self) -> None:
         """Start the API request to fetch data from AniList."""
-        for i in range(
-            1, min((self.query_limit // self.entries_per_page) + 1, self.max_pages + 1)
-        ):
-            if i > 1:
-                time.sleep(get_config("SCRAPER", "DOWNLOAD_DELAY"))
-            self.parse(self.submit_query(i))
+        with self.writer:
+            for batch in self.batches():
+                for media in self.submit_query(batch).values():
+                    self.parse(media)
+                self.mark_done(batch)
 
-    def submit_query(self, page_num: int) -> list[dict]:
-        """Submit a GraphQL query to the AniList API.
+    def mark_done(self, page_nums: list[int]) -> None:
+        """Checkpoint pages once the items queued for them are written.
 
         Args:
-            page_num (int): The page number to fetch.
+            page_nums (list[int]): The page numbers.
+        """
+        if self.checkpoint is not None:
+            self.writer.after_flush(partial(self.checkpoint.mark, page_nums))
+
+    def batches(self) -> list[list[int]]:
+        """Split the page numbers into batches that fit in one query.
+
+        A batch holds as many pages as the ANILIST_MAX_COMPLEXITY budget allows,
+        capped at ANILIST_PAGES_PER_QUERY, and at least one page even if a page
+        alone exceeds the budget. Pages the checkpoint already has are left out.
+
+        Returns:
+            list[list[int]]: The page numbers to fetch, one list per request.
+        """
+        cfg = get_settings().scraper
+        budget = cfg.anilist_max_complexity // self.page_complexity()
+        size = max(1, min(cfg.anilist_pages_per_query, budget))
+        pages = list(self.page_numbers())
+        if self.checkpoint is not None:
+            pages = self.checkpoint.pending(pages)
+        return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+    def page_complexity(self) -> int:
+        """Estimate the query complexity of a single aliased page.
+
+        AniList charges the fields of a list once per entry it returns, so the
+        media fields count `entries_per_page` times.
+
+        Returns:
+            int: One point for the page plus one per selected media field and
+                entry.
+        """
+        return 1 + self.entries_per_page * self.field_count()
+
+    def field_count(self) -> int:
+        """Count the selected media fields, nested ones included.
 
         Returns:
-            list[dict]: A list of media items from the API response.
+            int: The number of scalar fields selected per entry.
         """
-        response = requests.post(
-            "https://graphql.anilist.co",
-            json={"query": self.form_query(page_num)},
-            timeout=10,
+        return sum(
+            len(field.replace("{", " ").replace("}", " ").split()) - field.count("{")
+            for field in self.media_fields
         )
+
+    def submit_query(self, page_nums: list[int]) -> dict[int, list[dict]]:
+        """Submit a GraphQL query for one or more pages to the AniList API.
+
+        The request waits for the host's `AdaptiveThrottle` slot and reports its
+        outcome back to it; its latency, size and pages are recorded in
+        `Metrics`.
+
+        Args:
+            page_nums (list[int]): The page numbers to fetch in one request.
+
+        Returns:
+            dict[int, list[dict]]: The media items of each page, by page number.
+        """
+        url = get_settings().scraper.anilist_url
+        throttle = AdaptiveThrottle.get()
+        metrics = Metrics.get()
+        throttle.wait(host_of(url))
+        started = time.monotonic()
+        try:
+            with (
+                metrics.in_flight("in_flight", source=self.name),
+                metrics.timer("download_seconds", source=self.name),
+            ):
+                response = requests.post(
+                    url, json={"query": self.form_query(page_nums)}, timeout=10
+                )
+        except requests.RequestException:
+            throttle.release(host_of(url))
+            raise
+        throttle.release(
+            host_of(url),
+            time.monotonic() - started,
+            response.status_code,
+            retry_after(response.headers.get("Retry-After")),
+        )
+        self.count_response(response, page_nums)
+        return self.handle_response(response, page_nums)
+
+    def count_response(self, response: requests.Response, page_nums: list[int]) -> None:
+        """Count the pages and bytes of a response in `Metrics`.
+
+        Args:
+            response (requests.Response): The HTTP response to a query.
+            page_nums (list[int]): The page numbers the query asked for.
+        """
+        metrics = Metrics.get()
+        metrics.inc("pages_total", len(page_nums), source=self.name)
+        metrics.inc("bytes_total", len(response.content), source=self.name)
+
+    def handle_response(
+        self, response: requests.Response, page_nums: list[int]
+    ) -> dict[int, list[dict]]:
+        """Split an AniList API response back into per-page media lists.
+
+        Args:
+            response (requests.Response): The HTTP response to a query.
+            page_nums (list[int]): The page numbers the query asked for.
+
+        Returns:
+            dict[int, list[dict]]: The media items of each page, by page number,
+                without those past `item_limit` on the last page.
+        """
         if response.status_code == HTTP_OK:
-            return response.json()["data"]["Page"]["media"]
+            body = response.json()
+            if body.get("errors"):
+                msg = f"Query failed with errors: {body['errors']}"
+                raise Exception(msg)
+            return {
+                i: body["data"][f"p{i}"]["media"][
+                    : self.item_limit - (i - 1) * self.entries_per_page
+                ]
+                for i in page_nums
+            }
         msg = f"Query failed with status code {response.status_code}: {response.text}"
         raise Exception(msg)
 
-    def form_query(self, page_num: int) -> str:
+    def form_query(self, page_nums: list[int]) -> str:
         """Formulate a GraphQL query string based on the selected page type.
 
+        Each page is requested under its own alias (`p1: Page(...)`,
+        `p2: Page(...)`), so several pages share one round-trip.
+
         Args:
-            page_num (int): The page number to fetch.
+            page_nums (list[int]): The page numbers to fetch.
 
         Returns:
             str: The formatted GraphQL query string for the AniList API.
@@ -75,28 +244,28 @@ class AniListAPI:
             filter_str = "SCORE_DESC"
         elif self.page == "Trending":
             filter_str = "TRENDING_DESC"
-        return f"""
-        query {{
-            Page(page: {page_num}, perPage: {self.entries_per_page}) {{
+        fields = "\n                ".join(self.media_fields)
+        pages = "\n".join(
+            f"""
+            p{page_num}: Page(page: {page_num}, perPage: {self.entries_per_page}) {{
                 media(type: MANGA, sort: {filter_str}) {{
-                title {{
-                    english
-                    romaji
-                }}
-                genres
-                popularity
-                favourites
-                averageScore
-                status
-                description
+                {fields}
                 }}
-            }}
+            }}"""
+            for page_num in page_nums
+        )
+        return f"""
+        query {{{pages}
         }}
         """
 
     def parse(self, response: list[dict]) -> None:
         """Parse the response from the AniList API and save its content."""
-        self.save_to_coll(self.parse_response(response))
+        metrics = Metrics.get()
+        with metrics.timer("parse_seconds", source=self.name):
+            items = self.parse_response(response)
+        metrics.inc("items_total", len(items), source=self.name)
+        self.save_to_coll(items)
 
     def parse_response(self, response: list[dict]) -> list[AniListModel]:
         """Parse the response from the AniList API into AniListModel instances.
@@ -108,41 +277,36 @@ class AniListAPI:
             list[AniListModel]: A list of AniListModel instances with extracted
                 media information.
         """
-        ret = []
+        rows = []
         for item in response:
-            title = item["title"]["english"] or item["title"]["romaji"]
+            titles = [item["title"]["english"], item["title"]["romaji"]]
+            title = titles[0] or titles[1]
+            alt_titles = [t for t in titles if t and t != title]
             genres = item["genres"]
             popularity = item["popularity"]
             favorites = item["favourites"]
             rating = item["averageScore"]
             status = item["status"]
             description = item["description"]
-            ret.append(
-                AniListModel(
-                    title=title,
-                    genres=genres,
-                    popularity=popularity,
-                    favorites=favorites,
-                    rating=rating,
-                    status=status,
-                    description=description,
-                )
+            rows.append(
+                {
+                    "title": title,
+                    "alt_titles": alt_titles,
+                    "genres": genres,
+                    "popularity": popularity,
+                    "favorites": favorites,
+                    "rating": rating,
+                    "status": status,
+                    "description": description,
+                }
             )
-        return ret
+        return validate_many(AniListModel, rows)
 
     def save_to_coll(self, data: list[AniListModel]) -> None:
-        """Save a list of AniListModel instances to the collection.
+        """Queue a list of AniListModel instances for the collection.
 
         Args:
             data (list[AniListModel]): The list of AniListModel instances to save.
         """
-        coll = DBUtils.get_collection(self.name)
-        ops = [
-            UpdateOne(
-                {"_id": item.title},
-                {"$set": item.model_dump()},
-                upsert=True,
-            )
-            for item in data
-        ]
-        coll.bulk_write(ops)
+        for doc in dump_many(AniListModel, data):
+            self.writer.put_many(item_ops(self.name, doc))
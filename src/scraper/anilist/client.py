@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.anilist.api import AniListAPI
+from scraper.anilist.types import AniListPages
+from scraper.core.checkpoint import Checkpoint
+from scraper.core.metrics import Metrics
+from scraper.core.ratelimit import TokenBucket
+from scraper.core.throttle import AdaptiveThrottle, host_of, retry_after
+from scraper.utils.settings import get_settings
+
+HTTP_TOO_MANY_REQUESTS = 429
+MAX_RETRIES = 5
+
+
+class AsyncAniListAPI(AniListAPI):
+    """An AniList client that keeps several page requests in flight.
+
+    Requests are paced by a `TokenBucket` fed from the AniList rate-limit
+    headers and by the shared `AdaptiveThrottle`, which also decides how many
+    of the ANILIST_CONCURRENCY requests may be in flight at once. The blocking
+    HTTP calls, the parsing and the Mongo writes run in worker threads so that
+    they overlap.
+    """
+
+    def __init__(
+        self,
+        query_limit: int,
+        page: AniListPages,
+        max_pages: int,
+        checkpoint: Checkpoint | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        """Initialize the AsyncAniListAPI.
+
+        Args:
+            query_limit (int): The maximum number of items to scrape.
+            page (AniListPages): The page type to scrape.
+            max_pages (int): The maximum number of pages to scrape.
+            checkpoint (Checkpoint | None, optional): The run's checkpoint.
+                Defaults to None.
+            concurrency (int | None, optional): The maximum number of requests
+                in flight. Defaults to the ANILIST_CONCURRENCY setting.
+        """
+        super().__init__(
+            query_limit=query_limit,
+            page=page,
+            max_pages=max_pages,
+            checkpoint=checkpoint,
+        )
+        cfg = get_settings().scraper
+        self.concurrency = concurrency or cfg.anilist_concurrency
+        self.bucket = TokenBucket(cfg.anilist_rate_limit)
+
+    def start(self) -> None:
+        """Start the API requests to fetch data from AniList."""
+        with self.writer:
+            asyncio.run(self.run())
+
+    async def run(self) -> None:
+        """Fetch, parse and save every page concurrently."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            async with asyncio.TaskGroup() as group:
+                for batch in self.batches():
+                    group.create_task(self.fetch_batch(session, semaphore, batch))
+
+    async def fetch_batch(
+        self,
+        session: requests.Session,
+        semaphore: asyncio.Semaphore,
+        page_nums: list[int],
+    ) -> None:
+        """Fetch a batch of pages within the rate limit, then parse and save it.
+
+        Args:
+            session (requests.Session): The shared HTTP session.
+            semaphore (asyncio.Semaphore): Bounds the requests in flight.
+            page_nums (list[int]): The page numbers to fetch in one request.
+        """
+        async with semaphore:
+            response = await self.post(session, self.form_query(page_nums))
+        self.count_response(response, page_nums)
+        for media in self.handle_response(response, page_nums).values():
+            await asyncio.to_thread(self.parse, media)
+        await asyncio.to_thread(self.mark_done, page_nums)
+
+    async def post(self, session: requests.Session, query: str) -> requests.Response:
+        """Post a query once the bucket allows it, retrying on HTTP 429.
+
+        Args:
+            session (requests.Session): The shared HTTP session.
+            query (str): The GraphQL query string.
+
+        Returns:
+            requests.Response: The last response received.
+        """
+        url = get_settings().scraper.anilist_url
+        throttle = AdaptiveThrottle.get()
+        metrics = Metrics.get()
+        for attempt in range(MAX_RETRIES):
+            if attempt:
+                metrics.inc("retries_total", source=self.name)
+            await self.bucket.acquire()
+            await throttle.wait_async(host_of(url))
+            started = time.monotonic()
+            try:
+                with (
+                    metrics.in_flight("in_flight", source=self.name),
+                    metrics.timer("download_seconds", source=self.name),
+                ):
+                    response = await asyncio.to_thread(
+                        session.post, url, json={"query": query}, timeout=10
+                    )
+            except requests.RequestException:
+                throttle.release(host_of(url))
+                raise
+            except BaseException:
+                # Cancelled, e.g. by the TaskGroup after another batch failed;
+                # the slot must not stay claimed.
+                throttle.cancel(host_of(url))
+                raise
+            throttle.release(
+                host_of(url),
+                time.monotonic() - started,
+                response.status_code,
+                retry_after(response.headers.get("Retry-After")),
+            )
+            self.bucket.update(response.headers)
+            if response.status_code != HTTP_TOO_MANY_REQUESTS:
+                break
+        return response
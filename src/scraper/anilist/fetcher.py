@@ -1,19 +1,25 @@
 from datetime import UTC, datetime
 
 from scraper.anilist.api import AniListAPI
+from scraper.anilist.client import AsyncAniListAPI
 from scraper.anilist.types import AniListPages
-from scraper.core.database import DBUtils
 from scraper.core.fetcher import Fetcher
+from scraper.core.metrics import Metrics
 
 
 class AniListFetcher(Fetcher):
     """A class for fetching data from AniList."""
 
+    source = "anilist"
+    collections = ("anilist",)
+
     def __init__(
         self,
         query_limit: int = 250,
         page: AniListPages = "Top 100",
         max_pages: int = 10,
+        concurrent: bool = False,
+        resume: bool = False,
     ) -> None:
         """Initialize the AniListFetcher.
 
@@ -24,21 +30,35 @@ class AniListFetcher(Fetcher):
                 Defaults to "Top 100".
             max_pages (int, optional): The maximum number of pages to scrape.
                 Defaults to 10.
+            concurrent (bool, optional): Whether to keep several requests in
+                flight with the asyncio client. Defaults to False.
+            resume (bool, optional): Whether to continue the last unfinished
+                pull of the page type, fetching only its missing pages.
+                Defaults to False.
         """
-        super().__init__(query_limit=query_limit, max_pages=max_pages)
+        super().__init__(query_limit=query_limit, max_pages=max_pages, resume=resume)
         self.page = page
+        self.concurrent = concurrent
 
     def fetch(self) -> None:
-        """Fetch data from AniList."""
-        AniListAPI(
-            query_limit=self.query_limit,
-            page=self.page,
-            max_pages=self.max_pages,
-        ).start()
-
-        coll = DBUtils.get_collection("last_updated")
-        coll.update_one(
-            {"_id": "anilist"},
-            {"$set": {self.page: datetime.now(UTC)}},
-            upsert=True,
-        )
+        """Fetch data from AniList.
+
+        Pages are checkpointed as they are written, so if the pull fails a
+        resumed one fetches only the missing pages. Its metrics are recorded
+        whether or not it succeeds.
+        """
+        started = datetime.now(UTC)
+        baseline = Metrics.get().snapshot()
+        checkpoint = self.open_checkpoint()
+        self.start_history(started)
+        api = AsyncAniListAPI if self.concurrent else AniListAPI
+        try:
+            api(
+                query_limit=self.query_limit,
+                page=self.page,
+                max_pages=self.max_pages,
+                checkpoint=checkpoint,
+            ).start()
+        finally:
+            self.record_run(started, baseline)
+        self.close_run(checkpoint, started)
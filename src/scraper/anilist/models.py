@@ -8,6 +8,9 @@ class AniListModel(BaseModel):
     ----------
     title : str
         The title of the media.
+    alt_titles : list[str]
+        The media's other titles, e.g. the romaji one when `title` is the
+        English one.
     genres : list[str]
         List of genres associated with the media.
     popularity : int
@@ -25,6 +28,7 @@ class AniListModel(BaseModel):
     """
 
     title: str
+    alt_titles: list[str] = []
     genres: list[str]
     popularity: int
     favorites: int
@@ -0,0 +1,214 @@
+import gzip
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO, Literal, NamedTuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+Compression = Literal["auto", "gzip", "zstd"]
+
+SUFFIXES = {"gzip": ".html.gz", "zstd": ".html.zst"}
+
+
+class ArchiveEntry(NamedTuple):
+    """One archived crawl of a listing page."""
+
+    listing: str
+    page: int
+    crawled_at: datetime
+    digest: str
+    size: int
+
+
+class HtmlArchive:
+    """A compressed, content-addressed store of crawled HTML pages.
+
+    Each body is stored once under its SHA-256 digest in `blobs/`, compressed
+    with zstd when `zstandard` is installed and gzip otherwise. A SQLite index
+    records every crawl as (listing, page, crawled_at) -> digest, so identical
+    pages from different runs share a blob while the full history is kept.
+    """
+
+    def __init__(self, root: Path, compression: Compression = "auto") -> None:
+        """Initialize the HtmlArchive.
+
+        Args:
+            root (Path): The directory holding the blobs and the index.
+            compression (Compression, optional): The codec for new blobs.
+                Defaults to "auto", which picks zstd when available.
+        """
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression == "zstd" and zstandard is None:
+            msg = "zstd compression requires the zstandard package"
+            raise ValueError(msg)
+        self.root = root
+        self.compression = compression
+        self.blob_dir = root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(root / "index.sqlite", check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                listing TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                crawled_at TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (listing, page, crawled_at)
+            )
+            """
+        )
+        self._db.commit()
+
+    def put(
+        self,
+        listing: str,
+        page: int,
+        body: bytes,
+        crawled_at: datetime | None = None,
+    ) -> str:
+        """Archive a page body, writing its blob only if it is new.
+
+        Args:
+            listing (str): The listing the page belongs to.
+            page (int): The page number.
+            body (bytes): The raw HTML body.
+            crawled_at (datetime | None, optional): The crawl time. Defaults to
+                now.
+
+        Returns:
+            str: The digest of the body.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        if self._find_blob(digest) is None:
+            self._write_blob(digest, body)
+        crawled_at = crawled_at or datetime.now(UTC)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (listing, page, crawled_at.isoformat(), digest, len(body)),
+            )
+            self._db.commit()
+        return digest
+
+    def open(self, digest: str) -> BinaryIO:
+        """Open a blob for streaming, decompressed reads.
+
+        Args:
+            digest (str): The digest of the body.
+
+        Returns:
+            BinaryIO: A file object yielding the raw HTML body.
+        """
+        path = self._find_blob(digest)
+        if path is None:
+            raise FileNotFoundError(digest)
+        if path.name.endswith(SUFFIXES["zstd"]):
+            if zstandard is None:
+                msg = "reading zstd blobs requires the zstandard package"
+                raise ValueError(msg)
+            return zstandard.ZstdDecompressor().stream_reader(path.open("rb"))
+        return gzip.open(path, "rb")
+
+    def read(self, digest: str) -> bytes:
+        """Read a whole blob.
+
+        Args:
+            digest (str): The digest of the body.
+
+        Returns:
+            bytes: The raw HTML body.
+        """
+        with self.open(digest) as f:
+            return f.read()
+
+    def entries(
+        self, listing: str | None = None, latest: bool = False
+    ) -> Iterator[ArchiveEntry]:
+        """Iterate over the archived crawls.
+
+        Args:
+            listing (str | None, optional): Only this listing. Defaults to None.
+            latest (bool, optional): Only the most recent crawl of each page.
+                Defaults to False.
+
+        Yields:
+            ArchiveEntry: The crawls, ordered by listing, page and time.
+        """
+        query = "SELECT listing, page, crawled_at, digest, size FROM pages"
+        params: tuple = ()
+        if listing is not None:
+            query += " WHERE listing = ?"
+            params = (listing,)
+        if latest:
+            # `query` is built from the constant fragments above; the listing
+            # is always a bound parameter.
+            query = (
+                f"SELECT listing, page, MAX(crawled_at), digest, size FROM ({query})"  # noqa: S608
+                " GROUP BY listing, page"
+            )
+        query += " ORDER BY 1, 2, 3"
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        for row_listing, page, crawled_at, digest, size in rows:
+            yield ArchiveEntry(
+                row_listing, page, datetime.fromisoformat(crawled_at), digest, size
+            )
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._db.close()
+
+    def _blob_path(self, digest: str, compression: str) -> Path:
+        """Get the path of a blob for a codec.
+
+        Args:
+            digest (str): The digest of the body.
+            compression (str): The codec.
+
+        Returns:
+            Path: The blob path.
+        """
+        return self.blob_dir / digest[:2] / f"{digest}{SUFFIXES[compression]}"
+
+    def _find_blob(self, digest: str) -> Path | None:
+        """Find the stored blob for a digest, whatever its codec.
+
+        Args:
+            digest (str): The digest of the body.
+
+        Returns:
+            Path | None: The blob path, or None if it is not stored.
+        """
+        for compression in SUFFIXES:
+            path = self._blob_path(digest, compression)
+            if path.exists():
+                return path
+        return None
+
+    def _write_blob(self, digest: str, body: bytes) -> None:
+        """Compress and write a blob atomically.
+
+        Args:
+            digest (str): The digest of the body.
+            body (bytes): The raw HTML body.
+        """
+        path = self._blob_path(digest, self.compression)
+        path.parent.mkdir(exist_ok=True)
+        if self.compression == "zstd":
+            data = zstandard.ZstdCompressor().compress(body)
+        else:
+            data = gzip.compress(body, mtime=0)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
@@ -0,0 +1,179 @@
+import hashlib
+import threading
+from datetime import UTC, datetime
+from typing import Any, ClassVar, Self
+
+from pydantic import BaseModel
+from pymongo import UpdateOne
+from pymongo.cursor import Cursor
+
+from scraper.core.database import DBUtils
+
+UNTRACKED_FIELDS = frozenset({"new"})
+
+
+def fingerprint(doc: dict[str, Any]) -> dict[str, str]:
+    """Hash every tracked field of a document.
+
+    Args:
+        doc (dict[str, Any]): The document.
+
+    Returns:
+        dict[str, str]: A short hash of each field's value, by field name.
+    """
+    return {
+        key: hashlib.blake2b(repr(value).encode(), digest_size=8).hexdigest()
+        for key, value in doc.items()
+        if key not in UNTRACKED_FIELDS
+    }
+
+
+class ChangeTracker:
+    """Turns scraped items into minimal writes for one collection.
+
+    The per-field fingerprints of every stored document are loaded once with
+    a single projection query. Unchanged items produce no write at all,
+    changed items `$set` only the fields that differ, and `new` is true only
+    for documents inserted for the first time, until `expire_new` clears it
+    after the next fetch of the collection. Each write also records
+    `_changed_at` and `_changed_fields`, so "what changed this run" is a
+    cheap query.
+    """
+
+    _trackers: ClassVar[dict[str, "ChangeTracker"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, collection: str) -> None:
+        """Initialize the ChangeTracker.
+
+        Args:
+            collection (str): The name of the tracked collection.
+        """
+        self.collection = collection
+        self._fingerprints: dict[str, dict[str, str]] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, collection: str) -> Self:
+        """Get the process-wide tracker for a collection.
+
+        Args:
+            collection (str): The name of the tracked collection.
+
+        Returns:
+            Self: The shared tracker.
+        """
+        with cls._registry_lock:
+            tracker = cls._trackers.get(collection)
+            if tracker is None:
+                tracker = cls._trackers[collection] = cls(collection)
+        return tracker
+
+    def load(self, reload: bool = False) -> None:
+        """Load the stored fingerprints, unless they are already loaded.
+
+        Args:
+            reload (bool, optional): Load them again even if they are cached.
+                Defaults to False.
+        """
+        with self._lock:
+            if self._fingerprints is not None and not reload:
+                return
+            coll = DBUtils.get_collection(self.collection)
+            self._fingerprints = {
+                doc["_id"]: doc.get("_fingerprint", {})
+                for doc in coll.find({}, {"_fingerprint": 1})
+            }
+
+    def is_unchanged(self, item: BaseModel | dict[str, Any]) -> bool:
+        """Check whether an item matches its stored version.
+
+        Args:
+            item (BaseModel | dict[str, Any]): The item or its document.
+
+        Returns:
+            bool: True if the item is stored and none of its fields changed.
+        """
+        self.load()
+        doc = item if isinstance(item, dict) else item.model_dump()
+        return self._fingerprints.get(doc["title"]) == fingerprint(doc)
+
+    def op(
+        self,
+        item: BaseModel | dict[str, Any],
+        now: datetime | None = None,
+        extra: dict[str, Any] | None = None,
+    ) -> UpdateOne | None:
+        """Build the minimal write for an item.
+
+        Args:
+            item (BaseModel | dict[str, Any]): The item or its document.
+            now (datetime | None, optional): The change time. Defaults to now.
+            extra (dict[str, Any] | None, optional): Untracked fields derived
+                from the item, set along with any change. Defaults to None.
+
+        Returns:
+            UpdateOne | None: The write, or None if the item is unchanged.
+        """
+        self.load()
+        doc = item if isinstance(item, dict) else item.model_dump()
+        key = doc["title"]
+        fields = fingerprint(doc)
+        with self._lock:
+            previous = self._fingerprints.get(key)
+            if previous == fields:
+                return None
+            self._fingerprints[key] = fields
+        if previous is None:
+            changed = list(fields)
+        else:
+            changed = [
+                name for name, value in fields.items() if previous.get(name) != value
+            ]
+        update = {name: doc[name] for name in changed} | {"new": previous is None}
+        update |= extra or {}
+        update |= {
+            "_fingerprint": fields,
+            "_changed_at": now or datetime.now(UTC),
+            "_changed_fields": changed,
+        }
+        return UpdateOne({"_id": key}, {"$set": update}, upsert=True)
+
+    def expire_new(self, before: datetime) -> int:
+        """Clear `new` on documents last written before a time.
+
+        Fetchers call this with their start time once they finish, so `new`
+        only marks documents inserted by the latest fetch; a document never
+        written again keeps it otherwise.
+
+        Args:
+            before (datetime): The start of the latest fetch.
+
+        Returns:
+            int: The number of documents no longer new.
+        """
+        return (
+            DBUtils.get_collection(self.collection)
+            .update_many(
+                {"new": True, "_changed_at": {"$lt": before}}, {"$set": {"new": False}}
+            )
+            .modified_count
+        )
+
+    def changed_since(
+        self, since: datetime, projection: dict[str, Any] | None = None
+    ) -> Cursor:
+        """Find the documents written with changes since a time.
+
+        Args:
+            since (datetime): The start of the window.
+            projection (dict[str, Any] | None, optional): The fields to return.
+                Defaults to the title and the changed fields.
+
+        Returns:
+            Cursor: The matching documents.
+        """
+        return DBUtils.get_collection(self.collection).find(
+            {"_changed_at": {"$gte": since}},
+            projection or {"_changed_at": 1, "_changed_fields": 1},
+        )
@@ -0,0 +1,130 @@
+import threading
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any, NamedTuple, Self
+
+from scraper.core.database import DBUtils
+
+COLLECTION = "checkpoints"
+
+
+class PageDone(NamedTuple):
+    """Marks a page as done once the items scraped before it are written.
+
+    Spiders yield it after a page's items; `MongoPipeline` queues the mark
+    behind those items on its `BatchWriter`.
+    """
+
+    checkpoint: "Checkpoint"
+    page: int
+
+
+class Checkpoint:
+    """The completed pages of one run over a (source, listing), kept in Mongo.
+
+    Each (source, listing) has one document in the `checkpoints` collection,
+    keyed "source/listing", holding its latest run: the pages done so far and
+    whether the run finished. Starting a run replaces it, so the collection
+    never grows past one document per listing. Opening with `resume=True`
+    continues the run instead if it is unfinished, so only its missing pages
+    are fetched again.
+    """
+
+    def __init__(self, doc: dict[str, Any]) -> None:
+        """Initialize the Checkpoint from its document.
+
+        Args:
+            doc (dict[str, Any]): The checkpoint document.
+        """
+        self.id: str = doc["_id"]
+        self.source: str = doc["source"]
+        self.listing: str = doc["listing"]
+        self.done: set[int] = set(doc.get("done", []))
+        self.planned: set[int] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, source: str, listing: str, resume: bool = False) -> Self:
+        """Start a run, or continue the unfinished one.
+
+        Args:
+            source (str): The source, e.g. "anilist".
+            listing (str): The listing or page type, e.g. "Top 100".
+            resume (bool, optional): Whether to continue the listing's run if
+                it is unfinished instead of starting over. Defaults to False.
+
+        Returns:
+            Self: The checkpoint of the run.
+        """
+        coll = DBUtils.get_collection(COLLECTION)
+        key = f"{source}/{listing}"
+        if resume:
+            doc = coll.find_one({"_id": key, "finished": False})
+            if doc is not None:
+                return cls(doc)
+        now = datetime.now(UTC)
+        doc = {
+            "_id": key,
+            "source": source,
+            "listing": listing,
+            "started_at": now,
+            "updated_at": now,
+            "done": [],
+            "finished": False,
+        }
+        coll.replace_one({"_id": key}, doc, upsert=True)
+        return cls(doc)
+
+    def pending(self, pages: Iterable[int]) -> list[int]:
+        """Plan the pages of the run and get the ones not done yet.
+
+        Args:
+            pages (Iterable[int]): Every page of the run.
+
+        Returns:
+            list[int]: The pages still to fetch, in order.
+        """
+        self.plan(pages)
+        with self._lock:
+            return sorted(self.planned - self.done)
+
+    def plan(self, pages: Iterable[int]) -> None:
+        """Add pages to the run, so it only finishes once they are done.
+
+        Args:
+            pages (Iterable[int]): The pages.
+        """
+        with self._lock:
+            self.planned.update(pages)
+
+    def mark(self, pages: int | Iterable[int]) -> None:
+        """Record pages as done.
+
+        Args:
+            pages (int | Iterable[int]): The page or pages.
+        """
+        pages = [pages] if isinstance(pages, int) else list(pages)
+        with self._lock:
+            self.done.update(pages)
+        DBUtils.get_collection(COLLECTION).update_one(
+            {"_id": self.id},
+            {
+                "$addToSet": {"done": {"$each": pages}},
+                "$set": {"updated_at": datetime.now(UTC)},
+            },
+        )
+
+    def finish(self) -> bool:
+        """Close the run if every planned page is done.
+
+        Returns:
+            bool: True if the run finished; otherwise it stays resumable.
+        """
+        with self._lock:
+            finished = self.planned <= self.done
+        if finished:
+            DBUtils.get_collection(COLLECTION).update_one(
+                {"_id": self.id},
+                {"$set": {"finished": True, "updated_at": datetime.now(UTC)}},
+            )
+        return finished
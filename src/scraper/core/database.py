@@ -1,14 +1,102 @@
-from pymongo import MongoClient
+import atexit
+import threading
+from typing import ClassVar
+
+from pymongo import MongoClient, WriteConcern
 from pymongo.collection import Collection
+from pymongo.database import Database
 
-from scraper.utils.utils import get_config
+from scraper.utils.settings import get_settings
 
 
 class DBUtils:
-    """Utility class for interacting with the MongoDB database."""
+    """Utility class for interacting with the MongoDB database.
+
+    Clients are pooled process-wide: one `MongoClient` is created per URI and
+    shared by every caller, so a crawl reuses a single warm connection pool
+    instead of paying for server discovery and a TLS handshake on every page.
+    """
+
+    _clients: ClassVar[dict[str, MongoClient]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def _client_options() -> dict:
+        """Build the `MongoClient` keyword arguments from the settings.
+
+        Returns:
+            dict: The pool size and timeout options.
+        """
+        cfg = get_settings().database
+        return {
+            "maxPoolSize": cfg.max_pool_size,
+            "minPoolSize": cfg.min_pool_size,
+            "connectTimeoutMS": cfg.connect_timeout_ms,
+            "serverSelectionTimeoutMS": cfg.server_selection_timeout_ms,
+            "socketTimeoutMS": cfg.socket_timeout_ms or None,
+        }
 
     @staticmethod
-    def get_collection(name: str) -> Collection:
+    def _write_concern() -> WriteConcern:
+        """Build the write concern from the settings.
+
+        Returns:
+            WriteConcern: The write concern applied to the scraper database.
+        """
+        w = get_settings().database.write_concern
+        return WriteConcern(w=int(w) if w.isdigit() else w)
+
+    @classmethod
+    def get_client(cls, uri: str | None = None) -> MongoClient:
+        """Get the shared MongoDB client for a URI, creating it on first use.
+
+        Args:
+            uri (str | None, optional): The connection URI. Defaults to the
+                DATABASE URI from the config file.
+
+        Returns:
+            MongoClient: The pooled MongoDB client.
+        """
+        if uri is None:
+            uri = get_settings().database.uri
+        client = cls._clients.get(uri)
+        if client is not None:
+            return client
+        with cls._lock:
+            client = cls._clients.get(uri)
+            if client is None:
+                client = MongoClient(uri, **cls._client_options())
+                cls._clients[uri] = client
+        return client
+
+    @classmethod
+    def use_client(cls, client: MongoClient, uri: str | None = None) -> None:
+        """Serve a given client for a URI instead of connecting to it.
+
+        This lets benchmarks and tools run against a stand-in such as
+        `mongomock.MongoClient()` without touching the callers.
+
+        Args:
+            client (MongoClient): The client to hand out.
+            uri (str | None, optional): The URI it stands in for. Defaults to
+                the DATABASE URI from the config file.
+        """
+        with cls._lock:
+            cls._clients[uri or get_settings().database.uri] = client
+
+    @classmethod
+    def get_database(cls) -> Database:
+        """Get the scraper database from the shared client.
+
+        Returns:
+            Database: The MongoDB database object.
+        """
+        return cls.get_client().get_database(
+            "scraper", write_concern=cls._write_concern()
+        )
+
+    @classmethod
+    def get_collection(cls, name: str) -> Collection:
         """Get a MongoDB collection by name.
 
         Args:
@@ -17,6 +105,20 @@ class DBUtils:
         Returns:
             Collection: The MongoDB collection object.
         """
-        client = MongoClient(get_config("DATABASE", "URI"))
-        db = client.get_database("scraper")
-        return db[name]
+        return cls.get_database()[name]
+
+    @classmethod
+    def close(cls) -> None:
+        """Close every pooled client.
+
+        Clients are recreated on the next call to `get_client`, so this is safe
+        to call between crawls as well as at interpreter shutdown.
+        """
+        with cls._lock:
+            clients = list(cls._clients.values())
+            cls._clients.clear()
+        for client in clients:
+            client.close()
+
+
+atexit.register(DBUtils.close)
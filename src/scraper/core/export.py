@@ -0,0 +1,404 @@
+import argparse
+import json
+import time
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime
+from itertools import pairwise
+from pathlib import Path
+from types import NoneType, UnionType
+from typing import Any, Literal, Union, get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel
+
+from scraper.anilist.models import AniListModel
+from scraper.core.database import DBUtils
+from scraper.royalroad.models import RoyalRoadDetailModel, RoyalRoadModel
+from scraper.utils.utils import get_data_directory
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+Format = Literal["auto", "parquet", "npz"]
+
+STATE_FILE = "export.json"
+SKIPPED_FIELDS = frozenset({"_fingerprint", "_changed_fields"})
+
+MODELS: dict[str, type[BaseModel]] = {
+    "royalroad": RoyalRoadModel,
+    "royalroad_details": RoyalRoadDetailModel,
+    "anilist": AniListModel,
+}
+
+
+class ExportReport(BaseModel):
+    """Summary of an export.
+
+    Attributes
+    ----------
+    rows : int
+        Number of documents exported.
+    files : list[str]
+        The files written.
+    seconds : float
+        Wall-clock duration of the export.
+    """
+
+    rows: int = 0
+    files: list[str] = []
+    seconds: float = 0.0
+
+
+def encode_column(values: list[Any]) -> dict[str, np.ndarray]:
+    """Turn the values of one field into NumPy arrays.
+
+    Numbers, booleans and datetimes become one typed array; missing values
+    turn integer and boolean columns into floats with NaN, and datetimes into
+    NaT. Strings are dictionary encoded as int32 `codes` into sorted `values`,
+    and lists of strings (e.g. genres) additionally get `offsets`, so row i
+    is `values[codes[offsets[i]:offsets[i + 1]]]`.
+
+    Args:
+        values (list[Any]): The field's value in each document.
+
+    Returns:
+        dict[str, np.ndarray]: The arrays, keyed by "" for the main array and
+            by "values" or "offsets" for the dictionary and list offsets.
+    """
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, datetime):
+        return {"": np.array(values, dtype="datetime64[ms]")}
+    if isinstance(sample, str):
+        uniques, codes = np.unique(
+            np.array(["" if v is None else v for v in values]), return_inverse=True
+        )
+        return {"": codes.astype(np.int32), "values": uniques}
+    if isinstance(sample, list):
+        flat = [str(v) for row in values for v in row or ()]
+        offsets = np.cumsum([0] + [len(row or ()) for row in values], dtype=np.int64)
+        uniques, codes = np.unique(np.array(flat, dtype=str), return_inverse=True)
+        return {"": codes.astype(np.int32), "values": uniques, "offsets": offsets}
+    if sample is None or any(v is None for v in values):
+        return {"": np.array(values, dtype=np.float64)}
+    return {"": np.array(values)}
+
+
+def decode_npz(path: Path) -> dict[str, np.ndarray | list[np.ndarray]]:
+    """Read a part written by the `.npz` fallback back into plain columns.
+
+    Args:
+        path (Path): The `.npz` file.
+
+    Returns:
+        dict[str, np.ndarray | list[np.ndarray]]: The columns by field name;
+            string columns are decoded, list columns are one array per row.
+    """
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    columns: dict[str, np.ndarray | list[np.ndarray]] = {}
+    for key, array in arrays.items():
+        if "." in key:
+            continue
+        values = arrays.get(f"{key}.values")
+        offsets = arrays.get(f"{key}.offsets")
+        if values is None:
+            columns[key] = array
+        elif offsets is None:
+            columns[key] = values[array]
+        else:
+            decoded = values[array]
+            columns[key] = [decoded[start:end] for start, end in pairwise(offsets)]
+    return columns
+
+
+def arrow_type(annotation: Any) -> "pa.DataType":  # noqa: ANN401
+    """Get the Arrow type of a model field.
+
+    Args:
+        annotation (Any): The field's annotation, e.g. `list[str]`, a nested
+            model or an optional type.
+
+    Returns:
+        pa.DataType: The Arrow type; every Arrow field is nullable.
+    """
+    origin = get_origin(annotation)
+    if origin in {Union, UnionType}:
+        (inner,) = (arg for arg in get_args(annotation) if arg is not NoneType)
+        return arrow_type(inner)
+    if origin is list:
+        return pa.list_(arrow_type(get_args(annotation)[0]))
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return pa.struct(
+            [
+                pa.field(name, arrow_type(info.annotation))
+                for name, info in annotation.model_fields.items()
+            ]
+        )
+    scalars = {
+        str: pa.string(),
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        datetime: pa.timestamp("ms"),
+    }
+    return scalars[annotation]
+
+
+def parquet_schema(
+    collection: str, fields: Sequence[str] | None = None
+) -> "pa.Schema | None":
+    """Declare the Parquet schema of a collection from its model.
+
+    Besides the model's fields, documents may carry `new`, `genre_ids` and
+    `_changed_at`, written next to them by the pipeline.
+
+    Args:
+        collection (str): The name of the collection.
+        fields (Sequence[str] | None, optional): The exported fields.
+            Defaults to every declared one.
+
+    Returns:
+        pa.Schema | None: The schema, or None if the collection has no model
+            in `MODELS` or a field is not declared.
+    """
+    model = MODELS.get(collection)
+    if model is None:
+        return None
+    types = {
+        name: arrow_type(info.annotation) for name, info in model.model_fields.items()
+    }
+    types |= {
+        "new": pa.bool_(),
+        "genre_ids": pa.list_(pa.int64()),
+        "_changed_at": pa.timestamp("ms"),
+    }
+    if fields is None:
+        fields = list(types)
+    elif any(name not in types for name in fields):
+        return None
+    return pa.schema([pa.field(name, types[name]) for name in fields])
+
+
+class ColumnarExporter:
+    """Streams a collection into columnar files with bounded memory.
+
+    Documents are read through a projected cursor in batches of `batch_size`;
+    each batch becomes a Parquet row group when `pyarrow` is installed, and an
+    `.npz` part of dictionary-encoded arrays otherwise, so only one batch is
+    held at a time. The Parquet schema is declared from the collection's model
+    (see `parquet_schema`), so a first batch with missing or null fields
+    cannot narrow it; other collections take it from their first batch.
+    Every export writes new files under `DATA_PATH/exports/<collection>/`.
+    Incremental exports pick up only the documents whose `_changed_at`
+    (stamped by change detection) is at or after the start of the previous
+    export, so a document changed while an export ran may appear in two
+    files; the latest file wins.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        fields: Sequence[str] | None = None,
+        batch_size: int = 10000,
+        fmt: Format = "auto",
+        root: Path | None = None,
+    ) -> None:
+        """Initialize the ColumnarExporter.
+
+        Args:
+            collection (str): The name of the collection to export.
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field except the change-detection
+                bookkeeping.
+            batch_size (int, optional): Documents per row group or part.
+                Defaults to 10000.
+            fmt (Format, optional): "parquet", "npz", or "auto" for Parquet
+                when pyarrow is installed. Defaults to "auto".
+            root (Path | None, optional): The output directory. Defaults to
+                `DATA_PATH/exports/<collection>`.
+
+        Raises:
+            ValueError: If Parquet is requested without pyarrow installed.
+        """
+        if fmt == "auto":
+            fmt = "parquet" if pa is not None else "npz"
+        if fmt == "parquet" and pa is None:
+            msg = "Parquet export requires the pyarrow package"
+            raise ValueError(msg)
+        self.collection = collection
+        self.fields = fields
+        self.batch_size = batch_size
+        self.fmt = fmt
+        self.root = root or get_data_directory("exports") / collection
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def last_export(self) -> datetime | None:
+        """Get the start time of the previous export.
+
+        Returns:
+            datetime | None: The time, or None if nothing was exported yet.
+        """
+        path = self.root / STATE_FILE
+        if not path.exists():
+            return None
+        return datetime.fromisoformat(json.loads(path.read_text())["started_at"])
+
+    def batches(self, since: datetime | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Read the documents to export in batches.
+
+        Args:
+            since (datetime | None, optional): Only documents changed at or
+                after this time. Defaults to every document.
+
+        Yields:
+            list[dict[str, Any]]: Up to `batch_size` documents.
+        """
+        query = {} if since is None else {"_changed_at": {"$gte": since}}
+        if self.fields is None:
+            projection = dict.fromkeys(SKIPPED_FIELDS, 0) | {"_id": 0}
+        else:
+            projection = {"_id": 0, **dict.fromkeys(self.fields, 1)}
+        cursor = (
+            DBUtils.get_collection(self.collection)
+            .find(query, projection)
+            .batch_size(self.batch_size)
+        )
+        batch: list[dict[str, Any]] = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def export(self, incremental: bool = False) -> ExportReport:
+        """Export the collection.
+
+        Args:
+            incremental (bool, optional): Only the documents changed since the
+                previous export. Defaults to False.
+
+        Returns:
+            ExportReport: The number of rows and the files written.
+        """
+        started = datetime.now(UTC)
+        clock = time.perf_counter()
+        since = self.last_export() if incremental else None
+        stem = started.strftime("%Y%m%dT%H%M%S")
+        if self.fmt == "parquet":
+            report = self._write_parquet(
+                self.batches(since),
+                self.root / stem,
+                parquet_schema(self.collection, self.fields),
+            )
+        else:
+            report = self._write_npz(self.batches(since), self.root / stem)
+        (self.root / STATE_FILE).write_text(
+            json.dumps({"started_at": started.isoformat(), "files": report.files})
+        )
+        report.seconds = time.perf_counter() - clock
+        return report
+
+    @staticmethod
+    def _write_parquet(
+        batches: Iterator[list[dict[str, Any]]],
+        stem: Path,
+        schema: "pa.Schema | None" = None,
+    ) -> ExportReport:
+        """Write the batches as row groups of one Parquet file.
+
+        Args:
+            batches (Iterator[list[dict[str, Any]]]): The documents.
+            stem (Path): The file path without its suffix.
+            schema (pa.Schema | None, optional): The schema of the file.
+                Defaults to the one inferred from the first batch.
+
+        Returns:
+            ExportReport: The number of rows and the file written.
+        """
+        report = ExportReport()
+        path = stem.with_suffix(".parquet")
+        writer = None
+        try:
+            for batch in batches:
+                table = pa.Table.from_pylist(batch, schema=schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(table)
+                report.rows += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+                report.files.append(str(path))
+        return report
+
+    @staticmethod
+    def _write_npz(batches: Iterator[list[dict[str, Any]]], stem: Path) -> ExportReport:
+        """Write each batch as an `.npz` part of encoded columns.
+
+        Args:
+            batches (Iterator[list[dict[str, Any]]]): The documents.
+            stem (Path): The path prefix of the parts.
+
+        Returns:
+            ExportReport: The number of rows and the parts written.
+        """
+        report = ExportReport()
+        for i, batch in enumerate(batches):
+            names = dict.fromkeys(key for doc in batch for key in doc)
+            arrays: dict[str, np.ndarray] = {}
+            for name in names:
+                encoded = encode_column([doc.get(name) for doc in batch])
+                for suffix, array in encoded.items():
+                    arrays[f"{name}.{suffix}" if suffix else name] = array
+            path = stem.with_name(f"{stem.name}-{i:05d}.npz")
+            np.savez(path, **arrays)
+            report.rows += len(batch)
+            report.files.append(str(path))
+        return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run an export from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Export a scraped collection to columnar files."
+    )
+    parser.add_argument("collection", help="e.g. royalroad or anilist")
+    parser.add_argument("--fields", nargs="+", help="only these fields")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only documents changed since the last export",
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "parquet", "npz"], default="auto", dest="fmt"
+    )
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--out", type=Path, help="output directory")
+    args = parser.parse_args(argv)
+    report = ColumnarExporter(
+        args.collection,
+        fields=args.fields,
+        batch_size=args.batch_size,
+        fmt=args.fmt,
+        root=args.out,
+    ).export(incremental=args.incremental)
+    print(  # noqa: T201
+        f"{report.rows} rows in {len(report.files)} files, {report.seconds:.2f}s"
+    )
+    for path in report.files:
+        print(f"  {path}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
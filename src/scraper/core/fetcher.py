@@ -1,7 +1,28 @@
+from datetime import datetime
+
+from scraper.core.changes import ChangeTracker
+from scraper.core.checkpoint import Checkpoint
+from scraper.core.database import DBUtils
+from scraper.core.metrics import Metrics, Snapshot
+from scraper.core.timeseries import TimeSeries
+from scraper.utils.settings import get_settings
+
+
 class Fetcher:
-    """A superclass for fetching data."""
+    """A superclass for fetching data.
+
+    Subclasses set `source`, the `collections` they write and the `page` they
+    fetch; the time of each fetch is kept per page in the `last_updated`
+    collection, and its metrics in `runs` when the METRICS setting is on.
+    `run_started` is set by a `Runner` running several fetches as one run.
+    """
+
+    source = ""
+    collections: tuple[str, ...] = ()
 
-    def __init__(self, query_limit: int = 250, max_pages: int = 1) -> None:
+    def __init__(
+        self, query_limit: int = 250, max_pages: int = 1, resume: bool = False
+    ) -> None:
         """Initialize the Fetcher.
 
         Args:
@@ -9,9 +30,23 @@ class Fetcher:
                 Defaults to 250.
             max_pages (int, optional): The maximum number of pages to scrape.
                 Defaults to 10.
+            resume (bool, optional): Whether to continue the last unfinished
+                run, fetching only the pages it is missing. Defaults to False.
         """
         self.query_limit = query_limit
         self.max_pages = max_pages
+        self.resume = resume
+        self.page = ""
+        self.run_started: datetime | None = None
+
+    @property
+    def name(self) -> str:
+        """Get the name of the fetch job.
+
+        Returns:
+            str: The source and page, e.g. "royalroad/Best Rated".
+        """
+        return f"{self.source}/{self.page}"
 
     def fetch(self) -> None:
         """Fetch data from the source.
@@ -19,3 +54,86 @@ class Fetcher:
         This method should be implemented by subclasses to define how data is fetched.
         """
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def open_checkpoint(self) -> Checkpoint:
+        """Start the checkpoint of a run, or continue the last unfinished one.
+
+        Returns:
+            Checkpoint: The checkpoint.
+        """
+        return Checkpoint.open(self.source, self.page, resume=self.resume)
+
+    def close_run(self, checkpoint: Checkpoint, started: datetime) -> bool:
+        """Finish the run's checkpoint and, if it finished, set the watermark.
+
+        `new` is cleared on what earlier fetches inserted either way.
+
+        Args:
+            checkpoint (Checkpoint): The run's checkpoint.
+            started (datetime): The time the fetch started.
+
+        Returns:
+            bool: True if every page of the run was done.
+        """
+        finished = checkpoint.finish()
+        self.expire_new(started)
+        if finished:
+            self.set_watermark(started)
+        return finished
+
+    def start_history(self, started: datetime) -> None:
+        """Open the metric-history run of the fetch's collections.
+
+        Inside a `Runner` every job shares the runner's start, so an item on
+        several listings of one run is recorded once.
+
+        Args:
+            started (datetime): The time the fetch started.
+        """
+        for collection in self.collections:
+            series = TimeSeries.get(collection)
+            if series is not None:
+                series.start_run(self.run_started or started)
+
+    def watermark(self) -> datetime | None:
+        """Get the time the page was last fetched.
+
+        Returns:
+            datetime | None: The watermark, or None if it was never fetched.
+        """
+        doc = DBUtils.get_collection("last_updated").find_one(
+            {"_id": self.source}, {self.page: 1}
+        )
+        return (doc or {}).get(self.page)
+
+    def set_watermark(self, when: datetime) -> None:
+        """Record the time the page was fetched.
+
+        Args:
+            when (datetime): The time the fetch started.
+        """
+        DBUtils.get_collection("last_updated").update_one(
+            {"_id": self.source},
+            {"$set": {self.page: when}},
+            upsert=True,
+        )
+
+    def record_run(self, started: datetime, baseline: Snapshot) -> None:
+        """Store the metrics of the fetch, if the METRICS setting is on.
+
+        Args:
+            started (datetime): The time the fetch started.
+            baseline (Snapshot): The metrics snapshot taken when it started.
+        """
+        Metrics.get().record_run(self.name, started, baseline)
+
+    def expire_new(self, started: datetime) -> None:
+        """Clear `new` on what earlier fetches inserted, with CHANGE_DETECTION on.
+
+        Args:
+            started (datetime): The time the fetch started.
+        """
+        if not get_settings().scraper.change_detection:
+            return
+        for collection in self.collections:
+            ChangeTracker.get(collection).expire_new(started)
@@ -0,0 +1,365 @@
+import argparse
+import threading
+from collections.abc import Iterable, Sequence
+from itertools import combinations
+from typing import Any, ClassVar, Self
+
+import numpy as np
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from scraper.core.database import DBUtils
+from scraper.utils.settings import get_settings
+
+COLLECTION = "genres"
+COUNTERS = "counters"
+
+
+class GenreDictionary:
+    """Maps genre names to small integer ids, shared through Mongo.
+
+    Each genre is a document `{_id: name, id: n}` in the `genres` collection;
+    new names take the next id from a counter in `counters`, so every process
+    and every collection agrees on the ids. The mapping is loaded once and
+    only unseen genres cost a round trip.
+    """
+
+    _instance: ClassVar["GenreDictionary | None"] = None
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self) -> None:
+        """Initialize the GenreDictionary."""
+        self._ids: dict[str, int] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Self:
+        """Get the process-wide dictionary.
+
+        Returns:
+            Self: The shared dictionary.
+        """
+        with cls._registry_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    @property
+    def names(self) -> dict[int, str]:
+        """Get the genre names by id.
+
+        Returns:
+            dict[int, str]: The reverse mapping.
+        """
+        self.load()
+        return {genre_id: name for name, genre_id in self._ids.items()}
+
+    def load(self, reload: bool = False) -> None:
+        """Load the stored mapping, unless it is already loaded.
+
+        Args:
+            reload (bool, optional): Load it again even if it is cached.
+                Defaults to False.
+        """
+        with self._lock:
+            if self._ids is not None and not reload:
+                return
+            coll = DBUtils.get_collection(COLLECTION)
+            coll.create_index([("id", ASCENDING)], unique=True)
+            self._ids = {doc["_id"]: doc["id"] for doc in coll.find()}
+
+    def lookup(self, name: str) -> int | None:
+        """Get the id of a genre without assigning one.
+
+        Args:
+            name (str): The genre name.
+
+        Returns:
+            int | None: The id, or None for a genre never stored.
+        """
+        self.load()
+        return self._ids.get(name)
+
+    def ids(self, names: Iterable[str]) -> list[int]:
+        """Get the ids of genres, assigning ids to new ones.
+
+        Args:
+            names (Iterable[str]): The genre names.
+
+        Returns:
+            list[int]: The ids, in the same order.
+        """
+        self.load()
+        return [self._ids.get(name) or self._assign(name) for name in names]
+
+    def _assign(self, name: str) -> int:
+        """Store a new genre, or read its id if another process stored it.
+
+        Args:
+            name (str): The genre name.
+
+        Returns:
+            int: The genre's id.
+        """
+        counter = _upsert(
+            DBUtils.get_collection(COUNTERS),
+            {"_id": COLLECTION},
+            {"$inc": {"seq": 1}},
+        )
+        doc = _upsert(
+            DBUtils.get_collection(COLLECTION),
+            {"_id": name},
+            {"$setOnInsert": {"id": counter["seq"]}},
+        )
+        with self._lock:
+            self._ids[name] = doc["id"]
+        return doc["id"]
+
+
+def _upsert(
+    coll: Collection, query: dict[str, Any], update: dict[str, Any]
+) -> dict[str, Any]:
+    """Update or insert a document by `_id` and get it back.
+
+    Two writers upserting the same new `_id` at once can both try to insert
+    it, and the loser gets a duplicate key error; by then the document exists,
+    so the update is simply run again.
+
+    Args:
+        coll (Collection): The collection.
+        query (dict[str, Any]): The filter on `_id`.
+        update (dict[str, Any]): The update.
+
+    Returns:
+        dict[str, Any]: The document after the update.
+    """
+    try:
+        return coll.find_one_and_update(
+            query, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        return coll.find_one_and_update(
+            query, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+
+
+def genre_fields(doc: dict[str, Any]) -> dict[str, Any]:
+    """Get the `genre_ids` stored next to a document's genres.
+
+    Args:
+        doc (dict[str, Any]): The item's document.
+
+    Returns:
+        dict[str, Any]: `{"genre_ids": [...]}`, or nothing if the document has
+            no genres or the GENRE_IDS setting is off.
+    """
+    if not get_settings().scraper.genre_ids or "genres" not in doc:
+        return {}
+    return {"genre_ids": GenreDictionary.get().ids(doc["genres"])}
+
+
+class GenreIndex:
+    """An in-memory inverted index from genres to the items that have them.
+
+    Each genre holds a bitset, a Python int whose bit i is set when item i has
+    the genre, so boolean genre queries are a few big-integer ANDs, ORs and
+    NOTs and co-occurrence counts are popcounts of their intersections.
+    """
+
+    def __init__(self, keys: list[str], bitsets: dict[int, int]) -> None:
+        """Initialize the GenreIndex.
+
+        Args:
+            keys (list[str]): The item titles; item i is bit i.
+            bitsets (dict[int, int]): The bitset of each genre id.
+        """
+        self.keys = keys
+        self.bitsets = bitsets
+        self.everything = (1 << len(keys)) - 1
+
+    @classmethod
+    def load(cls, collection: str) -> Self:
+        """Build the index of a collection from its stored genres.
+
+        Documents written before `genre_ids` existed are mapped through the
+        dictionary from their genre names.
+
+        Args:
+            collection (str): The collection, e.g. "royalroad".
+
+        Returns:
+            Self: The index.
+        """
+        dictionary = GenreDictionary.get()
+        members: dict[int, list[int]] = {}
+        keys: list[str] = []
+        cursor = DBUtils.get_collection(collection).find(
+            {}, {"genre_ids": 1, "genres": 1}, batch_size=10000
+        )
+        for doc in cursor:
+            ids = doc.get("genre_ids")
+            if ids is None:
+                ids = dictionary.ids(doc.get("genres") or [])
+            for genre_id in ids:
+                members.setdefault(genre_id, []).append(len(keys))
+            keys.append(doc["_id"])
+        return cls(keys, {g: _bitset(rows) for g, rows in members.items()})
+
+    def bitset(self, genre: str) -> int:
+        """Get the bitset of a genre.
+
+        Args:
+            genre (str): The genre name.
+
+        Returns:
+            int: The items that have it; 0 for an unknown genre.
+        """
+        return self.bitsets.get(GenreDictionary.get().lookup(genre), 0)
+
+    def match(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        any_of: Iterable[str] = (),
+    ) -> int:
+        """Get the bitset of the items matching a genre combination.
+
+        Args:
+            include (Iterable[str], optional): Genres every match has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no match has.
+                Defaults to ().
+            any_of (Iterable[str], optional): Genres of which every match has
+                at least one. Defaults to ().
+
+        Returns:
+            int: The matching items.
+        """
+        bits = self.everything
+        for genre in include:
+            bits &= self.bitset(genre)
+        if any_of := list(any_of):
+            union = 0
+            for genre in any_of:
+                union |= self.bitset(genre)
+            bits &= union
+        for genre in exclude:
+            bits &= ~self.bitset(genre)
+        return bits
+
+    def query(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        any_of: Iterable[str] = (),
+    ) -> list[str]:
+        """Get the items matching a genre combination.
+
+        Args:
+            include (Iterable[str], optional): Genres every match has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no match has.
+                Defaults to ().
+            any_of (Iterable[str], optional): Genres of which every match has
+                at least one. Defaults to ().
+
+        Returns:
+            list[str]: The titles of the matching items.
+        """
+        rows = _rows(self.match(include, exclude, any_of), len(self.keys))
+        return [self.keys[row] for row in rows]
+
+    def count(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        any_of: Iterable[str] = (),
+    ) -> int:
+        """Count the items matching a genre combination.
+
+        Args:
+            include (Iterable[str], optional): Genres every match has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no match has.
+                Defaults to ().
+            any_of (Iterable[str], optional): Genres of which every match has
+                at least one. Defaults to ().
+
+        Returns:
+            int: The number of matching items.
+        """
+        return self.match(include, exclude, any_of).bit_count()
+
+    def cooccurrence(self) -> dict[tuple[str, str], int]:
+        """Count how many items have each pair of genres.
+
+        Returns:
+            dict[tuple[str, str], int]: The count of each pair of genre names
+                that occur together, in name order.
+        """
+        names = GenreDictionary.get().names
+        counts = {}
+        for a, b in combinations(sorted(self.bitsets, key=names.get), 2):
+            count = (self.bitsets[a] & self.bitsets[b]).bit_count()
+            if count:
+                counts[names[a], names[b]] = count
+        return counts
+
+
+def _bitset(rows: Sequence[int]) -> int:
+    """Pack row numbers into a bitset.
+
+    Args:
+        rows (Sequence[int]): The row numbers.
+
+    Returns:
+        int: The bitset with those bits set.
+    """
+    bits = np.zeros(max(rows) + 1, dtype=np.uint8)
+    bits[np.asarray(rows)] = 1
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def _rows(bits: int, size: int) -> np.ndarray:
+    """Unpack a bitset into row numbers.
+
+    Args:
+        bits (int): The bitset.
+        size (int): The number of rows.
+
+    Returns:
+        np.ndarray: The set rows, in order.
+    """
+    packed = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder="little"))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Query a collection by genre from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Find items by genre.")
+    parser.add_argument("collection", help="e.g. royalroad or anilist")
+    parser.add_argument("--all", nargs="+", default=[], help="genres required")
+    parser.add_argument("--any", nargs="+", default=[], help="at least one of")
+    parser.add_argument("--none", nargs="+", default=[], help="genres excluded")
+    parser.add_argument(
+        "--pairs", type=int, default=0, help="print the N most common genre pairs"
+    )
+    args = parser.parse_args(argv)
+    index = GenreIndex.load(args.collection)
+    titles = index.query(args.all, args.none, args.any)
+    print(f"{len(titles)} of {len(index.keys)} items match")  # noqa: T201
+    for title in titles[:20]:
+        print(f"  {title}")  # noqa: T201
+    pairs = sorted(index.cooccurrence().items(), key=lambda kv: -kv[1])
+    for (a, b), count in pairs[: args.pairs]:
+        print(f"  {a} + {b}: {count}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
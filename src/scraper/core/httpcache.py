@@ -0,0 +1,242 @@
+import gzip
+import hashlib
+import sqlite3
+import threading
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple, Self
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.statscollectors import StatsCollector
+
+from scraper.utils.settings import get_settings
+from scraper.utils.utils import get_data_directory
+
+UNCHANGED_FLAG = "unchanged"
+SAVE_META = "conditional_cache_save"
+HTTP_OK = 200
+HTTP_NOT_MODIFIED = 304
+
+
+class CacheEntry(NamedTuple):
+    """The validators and body last seen for a URL."""
+
+    etag: str | None
+    last_modified: str | None
+    digest: str
+    body: bytes
+
+
+class ConditionalCacheStore:
+    """A SQLite store of validators and compressed bodies, keyed by URL."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the ConditionalCacheStore.
+
+        Args:
+            path (Path): The SQLite file.
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                digest TEXT NOT NULL,
+                body BLOB NOT NULL,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Get the cached entry for a URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            CacheEntry | None: The entry, or None if the URL was never stored.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, digest, body FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, digest, body = row
+        return CacheEntry(etag, last_modified, digest, gzip.decompress(body))
+
+    def put(self, url: str, entry: CacheEntry) -> None:
+        """Store the entry for a URL.
+
+        Args:
+            url (str): The URL.
+            entry (CacheEntry): The validators and body.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.digest,
+                    gzip.compress(entry.body, mtime=0),
+                    datetime.now(UTC).isoformat(),
+                ),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """Close the store."""
+        with self._lock:
+            self._db.close()
+
+
+class ConditionalRequestMiddleware:
+    """Downloader middleware that revalidates pages with conditional requests.
+
+    Requests for a URL seen before carry `If-None-Match`/`If-Modified-Since`.
+    A 304 is turned back into the cached 200 response, and a 200 whose body
+    hashes the same as last time is kept as is; both get the `unchanged` flag
+    so spiders can skip parsing and writing them. Hits and misses are counted
+    under `httpcache/conditional/*` in the crawl stats.
+
+    New validators and bodies are not stored right away: the function that
+    stores them is left in the response's meta under `SAVE_META`, and the
+    spider yields it as an `AfterFlush` marker behind the page's items. A page
+    whose parse or write fails is therefore fetched and parsed in full again
+    on the next run.
+    """
+
+    def __init__(self, stats: StatsCollector) -> None:
+        """Initialize the ConditionalRequestMiddleware.
+
+        Args:
+            stats (StatsCollector): The crawl stats.
+        """
+        self.stats = stats
+        self.store: ConditionalCacheStore | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware, unless the HTTP_CONDITIONAL_CACHE setting is off.
+
+        Args:
+            crawler (Crawler): The crawler using the middleware.
+
+        Returns:
+            Self: The middleware instance.
+        """
+        if not get_settings().scraper.http_conditional_cache:
+            raise NotConfigured
+        middleware = cls(crawler.stats)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider: Spider) -> None:
+        """Open the spider's store under DATA_PATH/httpcache.
+
+        Args:
+            spider (Spider): The spider being opened.
+        """
+        path = get_data_directory("httpcache") / f"{spider.name}.sqlite"
+        self.store = ConditionalCacheStore(path)
+
+    def spider_closed(self, spider: Spider) -> None:  # noqa: ARG002
+        """Close the store.
+
+        Args:
+            spider (Spider): The spider being closed.
+        """
+        if self.store is not None:
+            self.store.close()
+
+    def process_request(
+        self,
+        request: Request,
+        spider: Spider,  # noqa: ARG002
+    ) -> None:
+        """Add the validators of the cached response to a GET request.
+
+        Args:
+            request (Request): The outgoing request.
+            spider (Spider): The spider that issued the request.
+        """
+        if request.method != "GET" or self.store is None:
+            return
+        entry = self.store.get(request.url)
+        if entry is None:
+            return
+        request.meta["conditional_cache"] = entry
+        if entry.etag:
+            request.headers.setdefault(b"If-None-Match", entry.etag)
+        if entry.last_modified:
+            request.headers.setdefault(b"If-Modified-Since", entry.last_modified)
+
+    def process_response(
+        self,
+        request: Request,
+        response: Response,
+        spider: Spider,  # noqa: ARG002
+    ) -> Response:
+        """Resolve 304s from the cache and flag unchanged bodies.
+
+        Args:
+            request (Request): The request.
+            response (Response): The downloaded response.
+            spider (Spider): The spider that issued the request.
+
+        Returns:
+            Response: The response to pass on to the spider.
+        """
+        if self.store is None:
+            return response
+        entry: CacheEntry | None = request.meta.get("conditional_cache")
+        if response.status == HTTP_NOT_MODIFIED and entry is not None:
+            self.stats.inc_value("httpcache/conditional/not_modified")
+            return response.replace(
+                status=HTTP_OK,
+                body=entry.body,
+                flags=[*response.flags, UNCHANGED_FLAG],
+            )
+        if response.status != HTTP_OK:
+            return response
+        digest = hashlib.sha256(response.body).hexdigest()
+        latest = CacheEntry(
+            _header(response, b"ETag"),
+            _header(response, b"Last-Modified"),
+            digest,
+            response.body,
+        )
+        if latest != entry:
+            request.meta[SAVE_META] = partial(self.store.put, request.url, latest)
+        if entry is not None and entry.digest == digest:
+            self.stats.inc_value("httpcache/conditional/unchanged")
+            return response.replace(flags=[*response.flags, UNCHANGED_FLAG])
+        self.stats.inc_value("httpcache/conditional/miss")
+        return response
+
+
+def _header(response: Response, name: bytes) -> str | None:
+    """Get a response header as a string.
+
+    Args:
+        response (Response): The response.
+        name (bytes): The header name.
+
+    Returns:
+        str | None: The header value, or None if it is missing.
+    """
+    value = response.headers.get(name)
+    return value.decode("latin-1") if value is not None else None
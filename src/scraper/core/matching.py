@@ -0,0 +1,345 @@
+import argparse
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+from pymongo import UpdateOne
+
+from scraper.core.database import DBUtils
+
+COLLECTION = "title_matches"
+WATERMARK = "title_matches"
+MERSENNE = (1 << 61) - 1
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_SPACES = re.compile(r"\s+")
+_EDITION = re.compile(
+    r"\((?:web ?novel|light novel|novel|manga|manhwa|manhua|comic)\)", re.IGNORECASE
+)
+
+
+def normalize(title: str) -> str:
+    """Reduce a title to the form titles are compared in.
+
+    Accents, case, punctuation, format tags such as "(Light Novel)" and extra
+    whitespace are removed.
+
+    Args:
+        title (str): The display title.
+
+    Returns:
+        str: The normalized title.
+    """
+    text = unicodedata.normalize("NFKD", _EDITION.sub(" ", title))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+
+
+def shingles(title: str, n: int = 3) -> set[str]:
+    """Get the character n-grams of a normalized title.
+
+    Args:
+        title (str): The normalized title.
+        n (int, optional): The n-gram length. Defaults to 3.
+
+    Returns:
+        set[str]: The n-grams, with the title padded by one space each side.
+    """
+    padded = f" {title} "
+    return {padded[i : i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Get the Jaccard similarity of two n-gram sets.
+
+    Args:
+        a (set[str]): The first set.
+        b (set[str]): The second set.
+
+    Returns:
+        float: The size of the intersection over the size of the union.
+    """
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class MinHashIndex:
+    """Locality-sensitive hashing over the n-gram sets of titles.
+
+    Each title gets a MinHash signature of `num_perm` values, computed for all
+    its n-grams at once with NumPy, and is filed under one bucket per band of
+    `num_perm // bands` values. Titles sharing any bucket are candidates, so
+    a lookup touches only titles likely to be similar (above a Jaccard
+    similarity of roughly `(1 / bands) ** (bands / num_perm)`) instead of
+    every title.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1) -> None:
+        """Initialize the MinHashIndex.
+
+        Args:
+            num_perm (int, optional): The signature length. Defaults to 64.
+            bands (int, optional): The number of bands; must divide `num_perm`.
+                Defaults to 16.
+            seed (int, optional): The seed of the hash permutations.
+                Defaults to 1.
+        """
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets: dict[tuple[int, bytes], list[Any]] = defaultdict(list)
+
+    def signature(self, grams: Iterable[str]) -> np.ndarray:
+        """Compute the MinHash signature of an n-gram set.
+
+        Args:
+            grams (Iterable[str]): The n-grams.
+
+        Returns:
+            np.ndarray: The `num_perm` minimum hash values.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64
+        )
+        if not hashes.size:
+            return np.zeros(len(self.a), dtype=np.uint64)
+        # (a * x + b) mod p with x < 2**32 and a, b < 2**31 never overflows.
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE
+        return permuted.min(axis=0)
+
+    def _bands(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        """Split a signature into its band keys.
+
+        Args:
+            signature (np.ndarray): The MinHash signature.
+
+        Returns:
+            list[tuple[int, bytes]]: One (band, bytes of the band) key per band.
+        """
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: Any, grams: Iterable[str]) -> None:  # noqa: ANN401
+        """File an item under the buckets of its n-gram set.
+
+        Args:
+            key (Any): The item, returned by `candidates`.
+            grams (Iterable[str]): The item's n-grams.
+        """
+        for bucket in self._bands(self.signature(grams)):
+            self.buckets[bucket].append(key)
+
+    def candidates(self, grams: Iterable[str]) -> set[Any]:
+        """Get the items that share a bucket with an n-gram set.
+
+        Args:
+            grams (Iterable[str]): The n-grams to look up.
+
+        Returns:
+            set[Any]: The candidate items.
+        """
+        found: set[Any] = set()
+        for bucket in self._bands(self.signature(grams)):
+            found.update(self.buckets.get(bucket, ()))
+        return found
+
+
+class TitleSide:
+    """The titles of one source, indexed for matching.
+
+    Every title and alternative title of an item is normalized, broken into
+    trigrams and added to a `MinHashIndex` under the item's key.
+    """
+
+    def __init__(self, collection: str) -> None:
+        """Initialize the TitleSide and index every stored title.
+
+        Args:
+            collection (str): The collection, e.g. "anilist".
+        """
+        self.collection = collection
+        self.index = MinHashIndex()
+        self.grams: dict[str, list[set[str]]] = {}
+        cursor = DBUtils.get_collection(collection).find(
+            {}, {"alt_titles": 1}, batch_size=10000
+        )
+        for doc in cursor:
+            self.add(doc)
+
+    @staticmethod
+    def title_grams(doc: dict[str, Any]) -> list[set[str]]:
+        """Get the trigram sets of every distinct title of a document.
+
+        Args:
+            doc (dict[str, Any]): The document, keyed by its title.
+
+        Returns:
+            list[set[str]]: One trigram set per normalized title.
+        """
+        titles = {normalize(t) for t in [doc["_id"], *doc.get("alt_titles", [])]}
+        return [shingles(title) for title in titles if title]
+
+    def add(self, doc: dict[str, Any]) -> None:
+        """Index a document's titles.
+
+        Args:
+            doc (dict[str, Any]): The document, keyed by its title.
+        """
+        self.grams[doc["_id"]] = grams = self.title_grams(doc)
+        for title in grams:
+            self.index.add(doc["_id"], title)
+
+    def best(self, grams: list[set[str]]) -> tuple[str | None, float]:
+        """Find the indexed item most similar to a set of titles.
+
+        Only the candidates sharing an LSH bucket are scored, by the highest
+        Jaccard similarity between any of their titles.
+
+        Args:
+            grams (list[set[str]]): The trigram sets of the titles to match.
+
+        Returns:
+            tuple[str | None, float]: The best item's key and its score, or
+                None and 0.0 without candidates.
+        """
+        candidates = set().union(*(self.index.candidates(g) for g in grams))
+        best, score = None, 0.0
+        for key in candidates:
+            similarity = max(
+                jaccard(mine, theirs) for mine in grams for theirs in self.grams[key]
+            )
+            if similarity > score:
+                best, score = key, similarity
+        return best, score
+
+
+def stored_links(left: str, keys: list[str]) -> dict[str, tuple[str, float]]:
+    """Get the stored links of some left items.
+
+    Args:
+        left (str): The collection links start from.
+        keys (list[str]): The keys of the items.
+
+    Returns:
+        dict[str, tuple[str, float]]: The linked right key and score of each
+            item that has a link.
+    """
+    if not keys:
+        return {}
+    cursor = DBUtils.get_collection(COLLECTION).find(
+        {"_id": {"$in": [f"{left}/{key}" for key in keys]}},
+        {"left": 1, "right": 1, "score": 1},
+    )
+    return {doc["left"]: (doc["right"], doc["score"]) for doc in cursor}
+
+
+def match_titles(
+    left: str = "royalroad",
+    right: str = "anilist",
+    threshold: float = 0.7,
+    full: bool = False,
+) -> int:
+    """Link the items of two collections that share a title.
+
+    Only the items changed since the previous matching run (every item with
+    `full`) are looked up, each in an index of the other side's titles. Links
+    scoring at least `threshold` are upserted into the `title_matches`
+    collection as `{_id: "<left>/<key>", left, right, score}`. A link found
+    from the right side replaces the left item's current link only if it
+    scores higher or points to the same item.
+
+    Args:
+        left (str, optional): The collection links start from.
+            Defaults to "royalroad".
+        right (str, optional): The collection links point to.
+            Defaults to "anilist".
+        threshold (float, optional): The lowest Jaccard similarity of title
+            trigrams to link. Defaults to 0.7.
+        full (bool, optional): Match every item, not only the changed ones.
+            Defaults to False.
+
+    Returns:
+        int: The number of links written.
+    """
+    started = datetime.now(UTC)
+    pair = f"{left}/{right}"
+    watermarks = DBUtils.get_collection("last_updated")
+    since = None if full else (watermarks.find_one({"_id": WATERMARK}) or {}).get(pair)
+    query = {} if since is None else {"_changed_at": {"$gte": since}}
+    changed = {
+        name: list(DBUtils.get_collection(name).find(query, {"alt_titles": 1}))
+        for name in (left, right)
+    }
+    links: dict[str, tuple[str, float]] = {}
+    if changed[left]:
+        side = TitleSide(right)
+        for doc in changed[left]:
+            key, score = side.best(TitleSide.title_grams(doc))
+            if key is not None and score >= threshold:
+                links[doc["_id"]] = key, score
+    side = TitleSide(left) if changed[right] else None
+    found: dict[str, tuple[str, float]] = {}
+    for doc in changed[right]:
+        key, score = side.best(TitleSide.title_grams(doc))
+        if key is None or score < threshold:
+            continue
+        if key not in found or score > found[key][1]:
+            found[key] = doc["_id"], score
+    stored = stored_links(left, [key for key in found if key not in links])
+    for key, (other, score) in found.items():
+        best = links.get(key) or stored.get(key)
+        if best is None or best[0] == other or score > best[1]:
+            links[key] = other, score
+    ops = [
+        UpdateOne(
+            {"_id": f"{left}/{key}"},
+            {
+                "$set": {
+                    "left": key,
+                    "right": other,
+                    "collections": [left, right],
+                    "score": score,
+                    "matched_at": started,
+                }
+            },
+            upsert=True,
+        )
+        for key, (other, score) in links.items()
+    ]
+    if ops:
+        DBUtils.get_collection(COLLECTION).bulk_write(ops, ordered=False)
+    watermarks.update_one({"_id": WATERMARK}, {"$set": {pair: started}}, upsert=True)
+    return len(ops)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run title matching from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Link RoyalRoad fictions to AniList media with the same title."
+    )
+    parser.add_argument("--left", default="royalroad")
+    parser.add_argument("--right", default="anilist")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument(
+        "--full", action="store_true", help="match every item, not only new ones"
+    )
+    args = parser.parse_args(argv)
+    count = match_titles(args.left, args.right, args.threshold, args.full)
+    print(f"{count} links written")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from datetime import UTC, datetime
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, ClassVar, Self
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+
+from scraper.core.database import DBUtils
+from scraper.utils.settings import get_settings
+from scraper.utils.utils import get_data_directory
+
+COLLECTION = "runs"
+PROMETHEUS_FILE = "scraper.prom"
+PREFIX = "scraper_"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+Key = tuple[str, tuple[tuple[str, str], ...]]
+Snapshot = list[dict[str, Any]]
+
+_NO_CONTEXT = nullcontext()
+
+
+def _key(name: str, labels: dict[str, Any]) -> Key:
+    """Build the key of a metric and its labels.
+
+    Args:
+        name (str): The metric name.
+        labels (dict[str, Any]): The label values.
+
+    Returns:
+        Key: The name and the sorted (label, value) pairs.
+    """
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Histogram:
+    """Counts of observed durations per `BUCKETS` upper bound, plus their sum."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self) -> None:
+        """Initialize the Histogram."""
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count one observation.
+
+        Args:
+            value (float): The duration in seconds.
+        """
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+
+
+class Metrics:
+    """Process-wide counters, gauges and latency histograms of the fetches.
+
+    Every metric has a name and labels, e.g. `parse_seconds{source=
+    "royalroad"}`. Histograms hold per-stage latencies (`download_seconds`,
+    `parse_seconds`, `validate_seconds`, `save_html_seconds`,
+    `bulk_write_seconds`), counters the pages, items, bytes, retries and
+    written, upserted and modified documents, and gauges the requests in
+    flight and the writes queued. `snapshot` copies them all, `record_run`
+    stores what changed during a fetch in the `runs` collection and rewrites
+    the Prometheus text file under DATA_PATH/metrics.
+
+    With the METRICS setting off, `get` returns `NullMetrics`, whose methods do
+    nothing, so instrumented code pays one settings lookup per call.
+    """
+
+    _instance: ClassVar["Metrics | None"] = None
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self) -> None:
+        """Initialize the Metrics."""
+        self.counters: dict[Key, float] = {}
+        self.gauges: dict[Key, float] = {}
+        self.histograms: dict[Key, Histogram] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "Metrics | NullMetrics":
+        """Get the process-wide registry, or a no-op one if METRICS is off.
+
+        Returns:
+            Metrics | NullMetrics: The registry.
+        """
+        if not get_settings().scraper.metrics:
+            return NULL_METRICS
+        with cls._registry_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:  # noqa: ANN401
+        """Add to a counter.
+
+        Args:
+            name (str): The counter name, e.g. "pages_total".
+            value (float, optional): The amount. Defaults to 1.
+            **labels (Any): The label values.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:  # noqa: ANN401
+        """Set a gauge.
+
+        Args:
+            name (str): The gauge name, e.g. "write_queue".
+            value (float): The current value.
+            **labels (Any): The label values.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def add(self, name: str, delta: float, **labels: Any) -> None:  # noqa: ANN401
+        """Move a gauge up or down.
+
+        Args:
+            name (str): The gauge name, e.g. "in_flight".
+            delta (float): The change.
+            **labels (Any): The label values.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:  # noqa: ANN401
+        """Record a duration in a histogram.
+
+        Args:
+            name (str): The histogram name, e.g. "parse_seconds".
+            seconds (float): The duration.
+            **labels (Any): The label values.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:  # noqa: ANN401
+        """Time a block into a histogram, whether or not it raises.
+
+        Args:
+            name (str): The histogram name.
+            **labels (Any): The label values.
+
+        Yields:
+            None: Inside the timed block.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def in_flight(self, name: str, **labels: Any) -> Iterator[None]:  # noqa: ANN401
+        """Count a block in a gauge while it runs.
+
+        Args:
+            name (str): The gauge name.
+            **labels (Any): The label values.
+
+        Yields:
+            None: Inside the counted block.
+        """
+        self.add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add(name, -1, **labels)
+
+    def snapshot(self) -> Snapshot:
+        """Copy the current value of every metric.
+
+        Returns:
+            Snapshot: One entry per metric and label set with its `name`,
+                `labels` and `type`; counters and gauges have a `value`,
+                histograms a `count`, a `sum` and the cumulative `buckets`
+                counts per `BUCKETS` bound and +Inf.
+        """
+        with self._lock:
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+            histograms = [
+                (key, list(h.counts), h.sum) for key, h in self.histograms.items()
+            ]
+        entries = [
+            {"name": name, "labels": dict(labels), "type": kind, "value": value}
+            for kind, values in (("counter", counters), ("gauge", gauges))
+            for (name, labels), value in values
+        ]
+        for (name, labels), counts, total in histograms:
+            cumulative = list(accumulate(counts))
+            entries.append(
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "type": "histogram",
+                    "count": cumulative[-1],
+                    "sum": total,
+                    "buckets": cumulative,
+                }
+            )
+        return entries
+
+    def prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, each name prefixed with "scraper_".
+        """
+        lines = []
+        typed = set()
+        for entry in sorted(self.snapshot(), key=lambda e: (e["name"], e["type"])):
+            name = PREFIX + entry["name"]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {entry['type']}")
+            labels = entry["labels"]
+            if entry["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {entry['value']}")
+                continue
+            for bound, count in zip(
+                [*map(str, BUCKETS), "+Inf"], entry["buckets"], strict=True
+            ):
+                lines.append(f"{name}_bucket{_labels(labels | {'le': bound})} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {entry['sum']}")
+            lines.append(f"{name}_count{_labels(labels)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> Path:
+        """Replace the Prometheus text file.
+
+        The file suits node_exporter's textfile collector.
+
+        Returns:
+            Path: DATA_PATH/metrics/scraper.prom.
+        """
+        path = get_data_directory("metrics") / PROMETHEUS_FILE
+        temp = path.with_suffix(f".{os.getpid()}.tmp")
+        temp.write_text(self.prometheus())
+        temp.replace(path)
+        return path
+
+    def record_run(self, job: str, started: datetime, baseline: Snapshot) -> None:
+        """Store what a fetch changed and refresh the Prometheus file.
+
+        Metrics are process-wide, so the runs of jobs that overlap (e.g. the
+        runner's RoyalRoad and AniList lanes) include each other's activity.
+
+        Args:
+            job (str): The fetch job, e.g. "royalroad/Best Rated".
+            started (datetime): When the fetch started.
+            baseline (Snapshot): The snapshot taken when it started.
+        """
+        DBUtils.get_collection(COLLECTION).insert_one(
+            {
+                "job": job,
+                "started_at": started,
+                "finished_at": datetime.now(UTC),
+                "metrics": since(self.snapshot(), baseline),
+            }
+        )
+        self.write_prometheus()
+
+
+class NullMetrics:
+    """The registry used while the METRICS setting is off; records nothing."""
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:  # noqa: ANN401
+        """Do nothing."""
+
+    def set(self, name: str, value: float, **labels: Any) -> None:  # noqa: ANN401
+        """Do nothing."""
+
+    def add(self, name: str, delta: float, **labels: Any) -> None:  # noqa: ANN401
+        """Do nothing."""
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:  # noqa: ANN401
+        """Do nothing."""
+
+    def timer(
+        self,
+        name: str,  # noqa: ARG002
+        **labels: Any,  # noqa: ANN401, ARG002
+    ) -> AbstractContextManager[None]:
+        """Get a context that does nothing.
+
+        Returns:
+            AbstractContextManager[None]: A shared no-op context.
+        """
+        return _NO_CONTEXT
+
+    def in_flight(
+        self,
+        name: str,  # noqa: ARG002
+        **labels: Any,  # noqa: ANN401, ARG002
+    ) -> AbstractContextManager[None]:
+        """Get a context that does nothing.
+
+        Returns:
+            AbstractContextManager[None]: A shared no-op context.
+        """
+        return _NO_CONTEXT
+
+    def snapshot(self) -> Snapshot:
+        """Get no metrics.
+
+        Returns:
+            Snapshot: An empty snapshot.
+        """
+        return []
+
+    def record_run(self, job: str, started: datetime, baseline: Snapshot) -> None:
+        """Do nothing."""
+
+
+NULL_METRICS = NullMetrics()
+
+
+def since(current: Snapshot, baseline: Snapshot) -> Snapshot:
+    """Get how much the counters and histograms grew between two snapshots.
+
+    Gauges keep their current value; metrics that did not change are left out.
+
+    Args:
+        current (Snapshot): The later snapshot.
+        baseline (Snapshot): The earlier snapshot.
+
+    Returns:
+        Snapshot: The differences.
+    """
+    before = {_key(e["name"], e["labels"]): e for e in baseline}
+    changes = []
+    for entry in current:
+        old = before.get(_key(entry["name"], entry["labels"]))
+        if entry["type"] == "gauge" or old is None:
+            changes.append(entry)
+        elif entry["type"] == "counter" and entry["value"] != old["value"]:
+            changes.append(entry | {"value": entry["value"] - old["value"]})
+        elif entry["type"] == "histogram" and entry["count"] != old["count"]:
+            changes.append(
+                entry
+                | {
+                    "count": entry["count"] - old["count"],
+                    "sum": entry["sum"] - old["sum"],
+                    "buckets": [
+                        a - b
+                        for a, b in zip(entry["buckets"], old["buckets"], strict=True)
+                    ],
+                }
+            )
+    return changes
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Format labels for the Prometheus text format.
+
+    Args:
+        labels (dict[str, str]): The label values.
+
+    Returns:
+        str: e.g. `{source="royalroad"}`, or "" without labels.
+    """
+    if not labels:
+        return ""
+    pairs = []
+    for label, value in labels.items():
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{label}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsExtension:
+    """Scrapy extension that feeds the downloads of a crawl into `Metrics`.
+
+    Every downloaded response counts as a page, with its size in bytes and its
+    `download_latency`, and requests between the downloader and the network
+    are counted in the `in_flight` gauge. When the spider closes, Scrapy's
+    retry count is added to `retries_total` and everything the crawl changed
+    is copied into the crawl stats under `metrics/*`.
+    """
+
+    def __init__(self, crawler: Crawler, metrics: Metrics) -> None:
+        """Initialize the MetricsExtension.
+
+        Args:
+            crawler (Crawler): The crawler using the extension.
+            metrics (Metrics): The process-wide registry.
+        """
+        self.crawler = crawler
+        self.metrics = metrics
+        self.baseline: Snapshot = []
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the extension, unless the METRICS setting is off.
+
+        Args:
+            crawler (Crawler): The crawler using the extension.
+
+        Returns:
+            Self: The extension instance.
+        """
+        if not get_settings().scraper.metrics:
+            raise NotConfigured
+        extension = cls(crawler, Metrics.get())
+        for handler, signal in (
+            (extension.spider_opened, signals.spider_opened),
+            (extension.spider_closed, signals.spider_closed),
+            (extension.request_reached_downloader, signals.request_reached_downloader),
+            (extension.request_left_downloader, signals.request_left_downloader),
+            (extension.response_downloaded, signals.response_downloaded),
+        ):
+            crawler.signals.connect(handler, signal=signal)
+        return extension
+
+    def spider_opened(self, spider: Spider) -> None:  # noqa: ARG002
+        """Take the baseline the crawl's stats are measured from.
+
+        Args:
+            spider (Spider): The spider being opened.
+        """
+        self.baseline = self.metrics.snapshot()
+
+    def request_reached_downloader(
+        self,
+        request: Request,  # noqa: ARG002
+        spider: Spider,
+    ) -> None:
+        """Count a request in flight.
+
+        Args:
+            request (Request): The request.
+            spider (Spider): The spider that issued it.
+        """
+        self.metrics.add("in_flight", 1, source=spider.name)
+
+    def request_left_downloader(
+        self,
+        request: Request,  # noqa: ARG002
+        spider: Spider,
+    ) -> None:
+        """Count a request no longer in flight, whether or not it succeeded.
+
+        Args:
+            request (Request): The request.
+            spider (Spider): The spider that issued it.
+        """
+        self.metrics.add("in_flight", -1, source=spider.name)
+
+    def response_downloaded(
+        self, response: Response, request: Request, spider: Spider
+    ) -> None:
+        """Count a downloaded page, its bytes and its latency.
+
+        Args:
+            response (Response): The response, before any middleware.
+            request (Request): The request.
+            spider (Spider): The spider that issued it.
+        """
+        self.metrics.inc("pages_total", source=spider.name)
+        self.metrics.inc("bytes_total", len(response.body), source=spider.name)
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.metrics.observe("download_seconds", latency, source=spider.name)
+
+    def spider_closed(self, spider: Spider) -> None:
+        """Add the retries and copy the crawl's metrics into the crawl stats.
+
+        Histograms become `metrics/<name>/<labels>/count` and `.../sum`,
+        counters and gauges `metrics/<name>/<labels>`.
+
+        Args:
+            spider (Spider): The spider being closed.
+        """
+        stats = self.crawler.stats
+        retries = stats.get_value("retry/count", 0)
+        if retries:
+            self.metrics.inc("retries_total", retries, source=spider.name)
+        for entry in since(self.metrics.snapshot(), self.baseline):
+            key = "/".join(["metrics", entry["name"], *entry["labels"].values()])
+            if entry["type"] == "histogram":
+                stats.set_value(f"{key}/count", entry["count"])
+                stats.set_value(f"{key}/sum", entry["sum"])
+            else:
+                stats.set_value(key, entry["value"])
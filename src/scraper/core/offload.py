@@ -0,0 +1,150 @@
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Literal
+
+from scrapy.statscollectors import StatsCollector
+from twisted.internet.defer import Deferred, DeferredSemaphore
+
+OffloadMode = Literal["none", "thread", "process"]
+
+
+class Offloader:
+    """Runs blocking work on a thread or process pool from the reactor thread.
+
+    `run` returns a Deferred that fires on the reactor thread with the result.
+    At most `max_in_flight` calls are submitted to the pool at once; further
+    calls wait in a queue whose depth is reported to the crawl stats under
+    `offload/<name>/...`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mode: OffloadMode,
+        max_workers: int | None = None,
+        max_in_flight: int = 16,
+        stats: StatsCollector | None = None,
+    ) -> None:
+        """Initialize the Offloader.
+
+        Args:
+            name (str): The name used in the stats keys.
+            mode (OffloadMode): "thread" or "process"; "none" runs the work
+                inline and is only useful as a switch for callers.
+            max_workers (int | None, optional): The pool size. Defaults to the
+                executor's own default.
+            max_in_flight (int, optional): Maximum number of calls submitted to
+                the pool at once. Defaults to 16.
+            stats (StatsCollector | None, optional): Crawl stats to report queue
+                depth and in-flight work to. Defaults to None.
+        """
+        self.name = name
+        self.mode = mode
+        self.stats = stats
+        self._executor: Executor | None = None
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f"offload-{name}"
+            )
+        elif mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._semaphore = DeferredSemaphore(max_in_flight)
+        self._queued = 0
+        self._in_flight = 0
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Deferred:  # noqa: ANN401
+        """Run a function on the pool.
+
+        With a process pool, `fn`, its arguments and its result must be
+        picklable.
+
+        Args:
+            fn (Callable[..., Any]): The function to run.
+            *args (Any): The positional arguments for the function.
+
+        Returns:
+            Deferred: Fires with the function's result on the reactor thread.
+        """
+        self._queued += 1
+        self._gauge("queued", self._queued)
+        return self._semaphore.run(self._submit, fn, *args)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Deferred:  # noqa: ANN401
+        """Submit a function to the pool once a slot is free.
+
+        Args:
+            fn (Callable[..., Any]): The function to run.
+            *args (Any): The positional arguments for the function.
+
+        Returns:
+            Deferred: Fires with the function's result.
+        """
+        self._queued -= 1
+        self._in_flight += 1
+        self._gauge("queued", self._queued)
+        self._gauge("in_flight", self._in_flight)
+        d: Deferred = Deferred()
+        d.addBoth(self._done)
+        if self._executor is None:
+            try:
+                d.callback(fn(*args))
+            except Exception:  # noqa: BLE001
+                d.errback()
+            return d
+        # Importing the reactor at module level would install the default one
+        # before Scrapy installs the asyncio reactor at crawl time.
+        from twisted.internet import reactor  # noqa: PLC0415
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: reactor.callFromThread(self._resolve, d, f))
+        return d
+
+    @staticmethod
+    def _resolve(d: Deferred, future: Future) -> None:
+        """Fire a Deferred with the outcome of a finished future.
+
+        Args:
+            d (Deferred): The Deferred to fire.
+            future (Future): The finished future.
+        """
+        error = future.exception()
+        if error is not None:
+            d.errback(error)
+        else:
+            d.callback(future.result())
+
+    def _done(self, result: Any) -> Any:  # noqa: ANN401
+        """Record a finished call and pass its result through.
+
+        Args:
+            result (Any): The result or failure of the call.
+
+        Returns:
+            Any: The same result or failure.
+        """
+        self._in_flight -= 1
+        self._gauge("in_flight", self._in_flight)
+        if self.stats is not None:
+            self.stats.inc_value(f"offload/{self.name}/done")
+        return result
+
+    def _gauge(self, key: str, value: int) -> None:
+        """Report the current and peak value of a gauge to the stats.
+
+        Args:
+            key (str): The gauge name.
+            value (int): The current value.
+        """
+        if self.stats is not None:
+            self.stats.set_value(f"offload/{self.name}/{key}", value)
+            self.stats.max_value(f"offload/{self.name}/{key}_max", value)
+
+    def shutdown(self) -> None:
+        """Shut the pool down, waiting for submitted work to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
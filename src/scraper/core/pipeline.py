@@ -0,0 +1,399 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from functools import partial
+from typing import Any, NamedTuple, Self
+
+from pydantic import BaseModel
+from pymongo import UpdateOne
+from scrapy import Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DropItem
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThread
+
+from scraper.core.changes import ChangeTracker
+from scraper.core.checkpoint import PageDone
+from scraper.core.database import DBUtils
+from scraper.core.genres import GenreDictionary, genre_fields
+from scraper.core.metrics import Metrics
+from scraper.core.timeseries import TimeSeries
+from scraper.utils.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AfterFlush(NamedTuple):
+    """Runs a callback once the items scraped before it are written.
+
+    Spiders yield it after a page's items; `MongoPipeline` queues the callback
+    behind those items on its `BatchWriter`, which skips it if a write fails.
+    """
+
+    callback: Callable[[], object]
+
+
+def upsert_op(
+    item: BaseModel | dict[str, Any], extra: dict[str, Any] | None = None
+) -> UpdateOne:
+    """Build the upsert for a scraped item, keyed by its title.
+
+    Args:
+        item (BaseModel | dict[str, Any]): The validated item, or its already
+            dumped document.
+        extra (dict[str, Any] | None, optional): Fields derived from the item
+            to set as well. Defaults to None.
+
+    Returns:
+        UpdateOne: The upsert operation.
+    """
+    doc = item if isinstance(item, dict) else item.model_dump()
+    return UpdateOne({"_id": doc["title"]}, {"$set": doc | (extra or {})}, upsert=True)
+
+
+def write_op(collection: str, item: BaseModel | dict[str, Any]) -> UpdateOne | None:
+    """Build the write for a scraped item.
+
+    With the CHANGE_DETECTION setting enabled the collection's `ChangeTracker`
+    skips unchanged items and sets only the changed fields; otherwise the whole
+    item is upserted. Either way the item's `genre_ids` are written with it.
+
+    Args:
+        collection (str): The name of the collection the item goes to.
+        item (BaseModel | dict[str, Any]): The validated item, or its already
+            dumped document.
+
+    Returns:
+        UpdateOne | None: The write, or None if nothing needs writing.
+    """
+    doc = item if isinstance(item, dict) else item.model_dump()
+    if get_settings().scraper.change_detection:
+        return ChangeTracker.get(collection).op(doc, extra=genre_fields(doc))
+    return upsert_op(doc, extra=genre_fields(doc))
+
+
+def item_ops(
+    collection: str, item: BaseModel | dict[str, Any]
+) -> list[tuple[str, UpdateOne]]:
+    """Build every write for a scraped item, by collection.
+
+    That is the item's own write from `write_op`, if it changed, and the
+    observation appended to its metric history, if the collection keeps one
+    and the item was not recorded yet in the open run.
+
+    Args:
+        collection (str): The name of the collection the item goes to.
+        item (BaseModel | dict[str, Any]): The validated item, or its already
+            dumped document.
+
+    Returns:
+        list[tuple[str, UpdateOne]]: The writes and their collections.
+    """
+    ops = []
+    op = write_op(collection, item)
+    if op is not None:
+        ops.append((collection, op))
+    series = TimeSeries.get(collection)
+    op = None if series is None else series.op(item)
+    if op is not None:
+        ops.append((series.name, op))
+    return ops
+
+
+class BatchWriter:
+    """Buffers upserts and flushes them as unordered bulk writes.
+
+    A background thread drains a bounded queue and flushes each collection's
+    pending operations once `batch_size` operations are buffered or
+    `flush_interval` seconds have passed. When Mongo falls behind the queue
+    fills up and `put` blocks, which bounds the memory held by pending writes.
+    """
+
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        """Initialize the BatchWriter.
+
+        Args:
+            batch_size (int | None, optional): Operations per flush. Defaults to
+                the BATCH_SIZE setting.
+            flush_interval (float | None, optional): Seconds before a partial
+                batch is flushed. Defaults to the BATCH_FLUSH_INTERVAL setting.
+            max_pending (int | None, optional): Operations queued before `put`
+                blocks. Defaults to the BATCH_MAX_PENDING setting.
+        """
+        cfg = get_settings().scraper
+        self.batch_size = batch_size or cfg.batch_size
+        self.flush_interval = flush_interval or cfg.batch_flush_interval
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=max_pending or cfg.batch_max_pending
+        )
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._error: Exception | None = None
+
+    def __enter__(self) -> Self:
+        """Start the writer thread.
+
+        Returns:
+            Self: The started writer.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Flush the remaining operations and stop the writer thread."""
+        self.close()
+
+    def start(self) -> None:
+        """Start the writer thread if it is not running yet."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="scraper-batch-writer", daemon=True
+                )
+                self._thread.start()
+
+    def put(self, collection: str, op: UpdateOne, block: bool = True) -> None:
+        """Queue an operation for a collection.
+
+        Args:
+            collection (str): The name of the collection to write to.
+            op (UpdateOne): The operation to queue.
+            block (bool, optional): Whether to wait for room in the queue.
+                Defaults to True.
+
+        Raises:
+            queue.Full: If `block` is False and the queue is full.
+        """
+        self.start()
+        self._queue.put((collection, op), block=block)
+
+    def put_many(self, ops: list[tuple[str, UpdateOne]]) -> None:
+        """Queue several operations, waiting for room in the queue.
+
+        Args:
+            ops (list[tuple[str, UpdateOne]]): The operations and their
+                collections.
+        """
+        for collection, op in ops:
+            self.put(collection, op)
+
+    def after_flush(self, callback: Callable[[], object], block: bool = True) -> None:
+        """Run a callback once every operation queued before it is written.
+
+        The callback runs on the writer thread, and is skipped if a bulk write
+        has failed.
+
+        Args:
+            callback (Callable[[], object]): The function to call.
+            block (bool, optional): Whether to wait for room in the queue.
+                Defaults to True.
+
+        Raises:
+            queue.Full: If `block` is False and the queue is full.
+        """
+        self.start()
+        self._queue.put((None, callback), block=block)
+
+    def close(self) -> None:
+        """Flush the remaining operations and stop the writer thread.
+
+        Raises:
+            Exception: The first error raised by a bulk write, if any.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        """Drain the queue and flush batches until stopped."""
+        pending: dict[str, list[UpdateOne]] = defaultdict(list)
+        count = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                entry = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = None
+            if entry is _STOP:
+                self._flush(pending)
+                return
+            if entry is not None and entry[0] is None:
+                self._flush(pending)
+                pending = defaultdict(list)
+                count = 0
+                self._call(entry[1])
+            elif entry is not None:
+                collection, op = entry
+                pending[collection].append(op)
+                count += 1
+            if count >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(pending)
+                pending = defaultdict(list)
+                count = 0
+                deadline = time.monotonic() + self.flush_interval
+
+    def _call(self, callback: Callable[[], object]) -> None:
+        """Run an `after_flush` callback unless a write has failed.
+
+        Args:
+            callback (Callable[[], object]): The function to call.
+        """
+        if self._error is not None:
+            return
+        try:
+            callback()
+        except Exception:
+            logger.exception("Callback after flush failed")
+
+    def _flush(self, pending: dict[str, list[UpdateOne]]) -> None:
+        """Write the pending operations of every collection.
+
+        Each bulk write is timed in `bulk_write_seconds`, and its operations,
+        upserts and modified documents are counted per collection.
+
+        Args:
+            pending (dict[str, list[UpdateOne]]): The operations by collection.
+        """
+        metrics = Metrics.get()
+        metrics.set("write_queue", self._queue.qsize())
+        for collection, ops in pending.items():
+            if not ops:
+                continue
+            try:
+                with metrics.timer("bulk_write_seconds", collection=collection):
+                    result = DBUtils.get_collection(collection).bulk_write(
+                        ops, ordered=False
+                    )
+            except Exception as e:
+                logger.exception("Bulk write to %s failed", collection)
+                if self._error is None:
+                    self._error = e
+                continue
+            metrics.inc("writes_total", len(ops), collection=collection)
+            metrics.inc("upserted_total", result.upserted_count, collection=collection)
+            metrics.inc("modified_total", result.modified_count, collection=collection)
+
+
+class MongoPipeline:
+    """Scrapy item pipeline that upserts items through a `BatchWriter`.
+
+    Items are written to the collection named after the spider. When the
+    writer's queue is full the item is handed over from a worker thread, so
+    the reactor keeps downloading while Scrapy waits for room.
+    """
+
+    def __init__(self, writer: BatchWriter) -> None:
+        """Initialize the MongoPipeline.
+
+        Args:
+            writer (BatchWriter): The writer that performs the bulk writes.
+        """
+        self.writer = writer
+
+    @classmethod
+    def from_crawler(cls, _crawler: Crawler) -> Self:
+        """Create the pipeline for a crawler.
+
+        Args:
+            _crawler (Crawler): The crawler using the pipeline.
+
+        Returns:
+            Self: The pipeline instance.
+        """
+        return cls(BatchWriter())
+
+    def open_spider(self, spider: Spider) -> Deferred | None:
+        """Start the writer when the spider opens.
+
+        The stored fingerprints (with change detection enabled) and the genre
+        dictionary are loaded on a worker thread before the first item arrives.
+
+        Args:
+            spider (Spider): The spider being opened.
+
+        Returns:
+            Deferred | None: Fires once they are loaded, if needed.
+        """
+        self.writer.start()
+        cfg = get_settings().scraper
+        loaders = []
+        if cfg.change_detection:
+            loaders.append(ChangeTracker.get(spider.name).load)
+        if cfg.genre_ids:
+            loaders.append(GenreDictionary.get().load)
+        if not loaders:
+            return None
+        return deferToThread(lambda: [load() for load in loaders])
+
+    def close_spider(self, _spider: Spider) -> Deferred:
+        """Flush the remaining items when the spider closes.
+
+        Returns:
+            Deferred: Fires once every item has been written.
+        """
+        return deferToThread(self.writer.close)
+
+    def process_item(self, item: Any, spider: Spider) -> Any:  # noqa: ANN401
+        """Queue the writes for an item.
+
+        Items go to the spider's collection unless their model names another
+        one in a `collection` class variable. `PageDone` and `AfterFlush`
+        markers are queued behind the items before them and then dropped.
+
+        Args:
+            item (Any): The scraped item.
+            spider (Spider): The spider that scraped the item.
+
+        Returns:
+            Any: The item, or a Deferred firing with it once it was queued.
+
+        Raises:
+            DropItem: For markers, which are not items.
+        """
+        if isinstance(item, PageDone):
+            item = AfterFlush(partial(item.checkpoint.mark, item.page))
+        if isinstance(item, AfterFlush):
+            try:
+                self.writer.after_flush(item.callback, block=False)
+            except queue.Full:
+                d = deferToThread(self.writer.after_flush, item.callback)
+                d.addCallback(lambda _: _drop_marker())
+                return d
+            _drop_marker()
+        collection = getattr(type(item), "collection", spider.name)
+        ops = item_ops(collection, item)
+        if not ops or ops[0][0] != collection:
+            spider.crawler.stats.inc_value("mongo/unchanged")
+        for i, (name, op) in enumerate(ops):
+            try:
+                self.writer.put(name, op, block=False)
+            except queue.Full:
+                d = deferToThread(self.writer.put_many, ops[i:])
+                d.addCallback(lambda _: item)
+                return d
+        return item
+
+
+def _drop_marker() -> None:
+    """Drop a marker quietly once it is queued.
+
+    Raises:
+        DropItem: Always.
+    """
+    msg = "flush marker"
+    raise DropItem(msg, log_level="DEBUG")
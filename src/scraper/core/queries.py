@@ -0,0 +1,289 @@
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any, Generic
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collection import Collection
+
+from scraper.core.database import DBUtils
+from scraper.core.validation import M
+
+INDEXES: dict[str, list[IndexModel]] = {
+    "royalroad": [
+        IndexModel([("genres", ASCENDING), ("followers", DESCENDING)]),
+        IndexModel([("genre_ids", ASCENDING)]),
+        IndexModel([("followers", DESCENDING)]),
+        IndexModel([("rating", DESCENDING)]),
+        IndexModel([("last_updated", DESCENDING)]),
+        IndexModel([("new", ASCENDING)]),
+        IndexModel([("_changed_at", ASCENDING)]),
+    ],
+    "royalroad_details": [
+        IndexModel([("followers", DESCENDING)]),
+        IndexModel([("_changed_at", ASCENDING)]),
+    ],
+    "anilist": [
+        IndexModel([("genres", ASCENDING), ("popularity", DESCENDING)]),
+        IndexModel([("genre_ids", ASCENDING)]),
+        IndexModel([("popularity", DESCENDING)]),
+        IndexModel([("rating", DESCENDING)]),
+        IndexModel([("favorites", DESCENDING)]),
+        IndexModel([("new", ASCENDING)]),
+        IndexModel([("_changed_at", ASCENDING)]),
+    ],
+}
+
+HEAVY_FIELDS: dict[str, frozenset[str]] = {
+    "royalroad": frozenset({"description"}),
+    "royalroad_details": frozenset({"chapters"}),
+    "anilist": frozenset({"description"}),
+}
+
+
+def ensure_indexes(collections: Iterable[str] | None = None) -> dict[str, list[str]]:
+    """Create the declared indexes of each collection.
+
+    Creating an index that already exists is a no-op, so this is safe to run
+    before every query session.
+
+    Args:
+        collections (Iterable[str] | None, optional): The collections to index.
+            Defaults to every collection in `INDEXES`.
+
+    Returns:
+        dict[str, list[str]]: The index names, by collection.
+    """
+    names = INDEXES if collections is None else collections
+    return {
+        name: DBUtils.get_collection(name).create_indexes(INDEXES[name])
+        for name in names
+        if INDEXES.get(name)
+    }
+
+
+def index_names(plan: dict[str, Any]) -> set[str]:
+    """Collect the indexes a query plan reads.
+
+    Args:
+        plan (dict[str, Any]): The output of `Cursor.explain()`, or any stage
+            of it.
+
+    Returns:
+        set[str]: The names of the indexes; empty for a collection scan.
+    """
+    names: set[str] = set()
+    if "indexName" in plan:
+        names.add(plan["indexName"])
+    for value in plan.values():
+        stages = value if isinstance(value, list) else [value]
+        for stage in stages:
+            if isinstance(stage, dict):
+                names |= index_names(stage)
+    return names
+
+
+class Query(Generic[M]):
+    """Typed, indexed reads over one scraped collection.
+
+    Every query projects onto the model's fields, leaving out the collection's
+    bulky ones in `HEAVY_FIELDS` (descriptions, or chapter lists on detail
+    pages) unless asked for, reads the cursor in
+    batches of `batch_size` and yields models as they arrive, so a consumer
+    never holds the whole collection. Documents come from the scraper's own
+    writes, so the models are built without validating them again; fields
+    left out of the projection are unset on them.
+    """
+
+    def __init__(self, model: type[M], collection: str, batch_size: int = 500) -> None:
+        """Initialize the Query.
+
+        Args:
+            model (type[M]): The model stored in the collection.
+            collection (str): The name of the collection.
+            batch_size (int, optional): Documents fetched per round trip.
+                Defaults to 500.
+        """
+        self.model = model
+        self.collection = collection
+        self.batch_size = batch_size
+
+    @property
+    def coll(self) -> Collection:
+        """Get the queried collection.
+
+        Returns:
+            Collection: The MongoDB collection object.
+        """
+        return DBUtils.get_collection(self.collection)
+
+    def projection(self, fields: Sequence[str] | None = None) -> dict[str, int]:
+        """Build the projection of a query.
+
+        Args:
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every model field except the collection's
+                `HEAVY_FIELDS`.
+
+        Returns:
+            dict[str, int]: The projection.
+        """
+        if fields is None:
+            heavy = HEAVY_FIELDS.get(self.collection, frozenset())
+            fields = [f for f in self.model.model_fields if f not in heavy]
+        return {"_id": 0, **dict.fromkeys(fields, 1)}
+
+    def find(
+        self,
+        query: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        fields: Sequence[str] | None = None,
+    ) -> Iterator[M]:
+        """Stream the models matching a query.
+
+        Args:
+            query (dict[str, Any] | None, optional): The filter. Defaults to
+                every document.
+            sort (list[tuple[str, int]] | None, optional): The sort order.
+                Defaults to None.
+            limit (int, optional): The most models to yield, 0 for no limit.
+                Defaults to 0.
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field but the bulky ones.
+
+        Yields:
+            M: The matching models.
+        """
+        cursor = self.coll.find(query or {}, self.projection(fields))
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.limit(limit).batch_size(self.batch_size)
+        for doc in cursor:
+            yield self.model.model_construct(**doc)
+
+    def explain(
+        self,
+        query: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+    ) -> set[str]:
+        """Get the indexes the server would use for a query.
+
+        Args:
+            query (dict[str, Any] | None, optional): The filter. Defaults to
+                every document.
+            sort (list[tuple[str, int]] | None, optional): The sort order.
+                Defaults to None.
+
+        Returns:
+            set[str]: The index names in the winning plan; empty means a
+                collection scan.
+        """
+        cursor = self.coll.find(query or {}, self.projection())
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        return index_names(plan)
+
+    @staticmethod
+    def genre_filter(
+        include: Iterable[str] = (), exclude: Iterable[str] = ()
+    ) -> dict[str, Any]:
+        """Build the filter for a genre combination.
+
+        Args:
+            include (Iterable[str], optional): Genres every match has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no match has.
+                Defaults to ().
+
+        Returns:
+            dict[str, Any]: The filter on the `genres` array.
+        """
+        condition: dict[str, list[str]] = {}
+        if include := list(include):
+            condition["$all"] = include
+        if exclude := list(exclude):
+            condition["$nin"] = exclude
+        return {"genres": condition} if condition else {}
+
+    def top(
+        self,
+        field: str,
+        limit: int = 100,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        fields: Sequence[str] | None = None,
+    ) -> Iterator[M]:
+        """Stream the models with the highest value of a field.
+
+        Args:
+            field (str): The field to rank by, e.g. "followers".
+            limit (int, optional): The number of models. Defaults to 100.
+            include (Iterable[str], optional): Genres every model has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no model has.
+                Defaults to ().
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field but the bulky ones.
+
+        Returns:
+            Iterator[M]: The models, highest first.
+        """
+        return self.find(
+            self.genre_filter(include, exclude),
+            sort=[(field, DESCENDING)],
+            limit=limit,
+            fields=fields,
+        )
+
+    def with_genres(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        fields: Sequence[str] | None = None,
+    ) -> Iterator[M]:
+        """Stream the models matching a genre combination.
+
+        Args:
+            include (Iterable[str], optional): Genres every model has.
+                Defaults to ().
+            exclude (Iterable[str], optional): Genres no model has.
+                Defaults to ().
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field but the bulky ones.
+
+        Returns:
+            Iterator[M]: The matching models.
+        """
+        return self.find(self.genre_filter(include, exclude), fields=fields)
+
+    def updated_since(
+        self, since: datetime, fields: Sequence[str] | None = None
+    ) -> Iterator[M]:
+        """Stream the models updated at or after a time, most recent first.
+
+        Args:
+            since (datetime): The earliest `last_updated` to include.
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field but the bulky ones.
+
+        Returns:
+            Iterator[M]: The recently updated models.
+        """
+        return self.find(
+            {"last_updated": {"$gte": since}},
+            sort=[("last_updated", DESCENDING)],
+            fields=fields,
+        )
+
+    def new(self, fields: Sequence[str] | None = None) -> Iterator[M]:
+        """Stream the models inserted by their latest write.
+
+        Args:
+            fields (Sequence[str] | None, optional): The fields to read.
+                Defaults to every field but the bulky ones.
+
+        Returns:
+            Iterator[M]: The new models.
+        """
+        return self.find({"new": True}, fields=fields)
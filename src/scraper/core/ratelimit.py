@@ -0,0 +1,76 @@
+import asyncio
+import time
+from collections.abc import Mapping
+
+from scraper.core.throttle import retry_after
+
+
+class TokenBucket:
+    """An asyncio token bucket paced by rate-limit response headers.
+
+    The bucket starts with `capacity` tokens that refill evenly over `period`
+    seconds. Every response should be passed to `update`, which adopts the
+    server's `X-RateLimit-Limit`, never lets the local budget exceed
+    `X-RateLimit-Remaining`, and pauses every caller until `Retry-After`
+    (seconds or an HTTP-date) has elapsed.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0) -> None:
+        """Initialize the TokenBucket.
+
+        Args:
+            capacity (int): The number of requests allowed per period.
+            period (float, optional): The refill period in seconds.
+                Defaults to 60.0.
+        """
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        elapsed = now - self._updated
+        self.tokens = min(
+            float(self.capacity), self.tokens + elapsed * self.capacity / self.period
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.period / self.capacity)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket from the rate-limit headers of a response.
+
+        Args:
+            headers (Mapping[str, str]): The response headers.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        limit = headers.get("X-RateLimit-Limit")
+        if limit is not None and int(limit) > 0:
+            self.capacity = int(limit)
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+        wait = retry_after(headers.get("Retry-After"))
+        if wait is not None:
+            self.tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + wait)
@@ -0,0 +1,98 @@
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, TypeVar
+
+from pydantic import BaseModel
+
+from scraper.core.pipeline import BatchWriter, write_op
+
+T = TypeVar("T")
+
+
+class ReplayError(NamedTuple):
+    """A saved page that failed to parse."""
+
+    source: str
+    error: str
+
+
+class ReplayReport(BaseModel):
+    """Summary of a replay run.
+
+    Attributes
+    ----------
+    pages : int
+        Number of pages parsed successfully.
+    items : int
+        Number of items parsed.
+    seconds : float
+        Wall-clock duration of the run.
+    errors : list[ReplayError]
+        The pages that failed, with their error messages.
+    """
+
+    pages: int = 0
+    items: int = 0
+    seconds: float = 0.0
+    errors: list[ReplayError] = []
+
+    @property
+    def items_per_second(self) -> float:
+        """Get the parsing throughput of the run.
+
+        Returns:
+            float: Items parsed per second.
+        """
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+def replay(
+    sources: Iterable[T],
+    parse: Callable[[T], list[BaseModel]],
+    collection: str,
+    workers: int | None = None,
+    write: bool = True,
+) -> ReplayReport:
+    """Parse saved pages across a process pool and upsert the results.
+
+    Pages are parsed in parallel, but their items are applied in the order of
+    `sources`: when several snapshots hold the same title, only the one from
+    the last source is written. Sources should therefore come oldest first.
+
+    Args:
+        sources (Iterable[T]): Picklable descriptions of the saved pages,
+            oldest first.
+        parse (Callable[[T], list[BaseModel]]): A picklable, module-level
+            function that loads and parses one page.
+        collection (str): The collection the items are written to.
+        workers (int | None, optional): Number of processes. Defaults to the
+            number of CPUs.
+        write (bool, optional): Whether to write the items to Mongo; disable
+            to benchmark parsing alone. Defaults to True.
+
+    Returns:
+        ReplayReport: The page and item counts, timing and per-page errors.
+    """
+    report = ReplayReport()
+    start = time.perf_counter()
+    latest: dict[str, BaseModel] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(source, pool.submit(parse, source)) for source in sources]
+        for source, future in futures:
+            try:
+                items = future.result()
+            except Exception as e:  # noqa: BLE001
+                report.errors.append(ReplayError(str(source), repr(e)))
+                continue
+            report.pages += 1
+            report.items += len(items)
+            if write:
+                latest.update((item.title, item) for item in items)
+    with BatchWriter() as writer:
+        for item in latest.values():
+            op = write_op(collection, item)
+            if op is not None:
+                writer.put(collection, op)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,476 @@
+import asyncio
+import threading
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, ClassVar, Self
+from urllib.parse import urlsplit
+
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+
+from scraper.utils.settings import get_settings
+
+if TYPE_CHECKING:
+    from scrapy.statscollectors import StatsCollector
+
+THROTTLED_STATUSES = frozenset({429, 503})
+SERVER_ERROR = 500
+LATENCY_WEIGHT = 0.3
+SPEEDUP = 0.8
+SLOWDOWN = 1.25
+BACKOFF = 2.0
+MIN_STEP = 0.25
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class HostState:
+    """The throttle state and counters of one host.
+
+    `waiters` holds the event, and its loop, of every `wait_async` call
+    waiting for a free slot; `release` sets them.
+    """
+
+    delay: float
+    concurrency: int
+    latency: float | None = None
+    responses: int = 0
+    errors: int = 0
+    throttled: int = 0
+    streak: int = 0
+    in_flight: int = 0
+    next_start: float = 0.0
+    waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(
+        default_factory=list
+    )
+
+
+def host_of(url: str) -> str:
+    """Get the host a URL is throttled under.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The host name.
+    """
+    return urlsplit(url).hostname or ""
+
+
+def retry_after(value: str | bytes | None) -> float | None:
+    """Parse a `Retry-After` header value, in seconds.
+
+    The header holds either a number of seconds or an HTTP-date.
+
+    Args:
+        value (str | bytes | None): The header value.
+
+    Returns:
+        float | None: The delay, or None if it is missing or malformed.
+    """
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+class AdaptiveThrottle:
+    """A process-wide delay and concurrency controller per host.
+
+    Every response is reported with `record`. A 429 or 503 doubles the delay
+    and halves the concurrency, and nothing is sent before its `Retry-After`
+    has passed; a network error or 5xx raises the delay, and so, slightly, does
+    a response slower than the target latency. Fast responses lower the delay,
+    and once it is at the minimum a run of them adds one concurrent request.
+    Both stay within the THROTTLE_* bounds. `AdaptiveThrottleMiddleware`
+    applies the state to Scrapy's downloader slots; plain HTTP clients call
+    `wait` (or `wait_async`) before each request and `release` after it, or
+    `cancel` if it was given up without an answer.
+    """
+
+    _instance: ClassVar["AdaptiveThrottle | None"] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        start_delay: float,
+        min_delay: float,
+        max_delay: float,
+        max_concurrency: int,
+        target_latency: float,
+        adaptive: bool = True,
+    ) -> None:
+        """Initialize the AdaptiveThrottle.
+
+        Args:
+            start_delay (float): The delay a host starts with, in seconds.
+            min_delay (float): The lowest delay, in seconds.
+            max_delay (float): The highest delay, in seconds.
+            max_concurrency (int): The most requests in flight per host.
+            target_latency (float): Responses slower than this, in seconds,
+                count as a sign of load.
+            adaptive (bool, optional): Whether to adapt at all; if not, every
+                host keeps the start delay and the maximum concurrency.
+                Defaults to True.
+        """
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.adaptive = adaptive
+        self.hosts: dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Self:
+        """Get the throttle shared by every client in the process.
+
+        Returns:
+            Self: The throttle, configured from the settings.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cfg = get_settings().scraper
+                cls._instance = cls(
+                    start_delay=cfg.download_delay,
+                    min_delay=cfg.throttle_min_delay,
+                    max_delay=cfg.throttle_max_delay,
+                    max_concurrency=cfg.throttle_max_concurrency,
+                    target_latency=cfg.throttle_target_latency,
+                    adaptive=cfg.adaptive_throttle,
+                )
+        return cls._instance
+
+    def state(self, host: str) -> HostState:
+        """Get the state of a host, creating it on first use.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            HostState: The state.
+        """
+        with self._lock:
+            return self._state(host)
+
+    def _state(self, host: str) -> HostState:
+        """Get the state of a host; the caller holds the lock.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            HostState: The state.
+        """
+        state = self.hosts.get(host)
+        if state is None:
+            concurrency = 1 if self.adaptive else self.max_concurrency
+            state = self.hosts[host] = HostState(self.start_delay, concurrency)
+        return state
+
+    def record(
+        self,
+        host: str,
+        latency: float | None = None,
+        status: int | None = None,
+        wait: float | None = None,
+    ) -> HostState:
+        """Adjust a host's delay and concurrency from one response.
+
+        Args:
+            host (str): The host name.
+            latency (float | None, optional): The response time in seconds.
+                Defaults to None.
+            status (int | None, optional): The HTTP status, or None if the
+                request failed without a response. Defaults to None.
+            wait (float | None, optional): The server's `Retry-After`, in
+                seconds. Defaults to None.
+
+        Returns:
+            HostState: The updated state.
+        """
+        with self._lock:
+            state = self._state(host)
+            state.responses += 1
+            if latency is not None:
+                previous = latency if state.latency is None else state.latency
+                state.latency = (
+                    LATENCY_WEIGHT * latency + (1 - LATENCY_WEIGHT) * previous
+                )
+            if wait:
+                state.next_start = max(state.next_start, time.monotonic() + wait)
+            if status in THROTTLED_STATUSES:
+                state.throttled += 1
+            elif status is None or status >= SERVER_ERROR:
+                state.errors += 1
+            if not self.adaptive:
+                return state
+            if status in THROTTLED_STATUSES:
+                state.streak = 0
+                state.concurrency = max(1, state.concurrency // 2)
+                state.delay = self._bound(max(state.delay * BACKOFF, MIN_STEP))
+            elif status is None or status >= SERVER_ERROR:
+                state.streak = 0
+                state.delay = self._bound(max(state.delay * SLOWDOWN, MIN_STEP))
+            elif state.latency is not None and state.latency > self.target_latency:
+                state.streak = 0
+                state.delay = self._bound(state.delay * SLOWDOWN)
+            else:
+                state.streak += 1
+                state.delay = self._bound(state.delay * SPEEDUP)
+                if (
+                    state.delay <= self.min_delay
+                    and state.streak >= 4 * state.concurrency
+                    and state.concurrency < self.max_concurrency
+                ):
+                    state.concurrency += 1
+                    state.streak = 0
+            return state
+
+    def _bound(self, delay: float) -> float:
+        """Clamp a delay to the configured bounds.
+
+        Args:
+            delay (float): The delay in seconds.
+
+        Returns:
+            float: The clamped delay.
+        """
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def reserve(self, host: str) -> float | None:
+        """Claim a request slot on a host.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            float | None: Seconds to wait before sending the request, or None
+                if every slot is busy and the caller should try again later.
+        """
+        with self._lock:
+            return self._reserve(self._state(host))
+
+    @staticmethod
+    def _reserve(state: HostState) -> float | None:
+        """Claim a request slot; the caller holds the lock.
+
+        Args:
+            state (HostState): The state of the host.
+
+        Returns:
+            float | None: Seconds to wait before sending the request, or None
+                if every slot is busy.
+        """
+        if state.in_flight >= state.concurrency:
+            return None
+        now = time.monotonic()
+        start = max(now, state.next_start)
+        state.next_start = start + state.delay
+        state.in_flight += 1
+        return start - now
+
+    def release(
+        self,
+        host: str,
+        latency: float | None = None,
+        status: int | None = None,
+        wait: float | None = None,
+    ) -> HostState:
+        """Free a slot claimed with `reserve`, record the response and wake waiters.
+
+        Args:
+            host (str): The host name.
+            latency (float | None, optional): The response time in seconds.
+                Defaults to None.
+            status (int | None, optional): The HTTP status, or None if the
+                request failed without a response. Defaults to None.
+            wait (float | None, optional): The server's `Retry-After`, in
+                seconds. Defaults to None.
+
+        Returns:
+            HostState: The updated state.
+        """
+        state = self.record(host, latency, status, wait)
+        self.cancel(host)
+        return state
+
+    def cancel(self, host: str) -> None:
+        """Free a slot claimed with `reserve` without recording a response.
+
+        For requests given up before they were answered, e.g. when their task
+        is cancelled; they tell nothing about the host's load.
+
+        Args:
+            host (str): The host name.
+        """
+        with self._lock:
+            state = self._state(host)
+            state.in_flight -= 1
+            waiters, state.waiters = state.waiters, []
+        for loop, freed in waiters:
+            # The loop is gone if its waiter was cancelled and it has closed.
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(freed.set)
+
+    def wait(self, host: str) -> None:
+        """Block until a request to a host may be sent, and claim its slot.
+
+        Args:
+            host (str): The host name.
+        """
+        while (delay := self.reserve(host)) is None:
+            time.sleep(POLL_INTERVAL)
+        time.sleep(delay)
+
+    async def wait_async(self, host: str) -> None:
+        """Wait until a request to a host may be sent, and claim its slot.
+
+        While every slot is busy, it waits for the next `release` on the host,
+        which may come from another thread or event loop. If it is cancelled
+        after claiming the slot, the slot is freed again.
+
+        Args:
+            host (str): The host name.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            freed = asyncio.Event()
+            with self._lock:
+                state = self._state(host)
+                delay = self._reserve(state)
+                if delay is None:
+                    state.waiters.append((loop, freed))
+            if delay is not None:
+                break
+            await freed.wait()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancel(host)
+            raise
+
+
+class AdaptiveThrottleMiddleware:
+    """Downloader middleware that drives Scrapy's slots from `AdaptiveThrottle`.
+
+    Every response and download error is recorded for its host, and the
+    host's delay and concurrency are copied to its downloader slot. A pending
+    `Retry-After` moves the slot's last download time forward, so Scrapy
+    waits it out on top of the slot delay before the next download. The
+    current values and the error and throttling counts are kept in the crawl
+    stats under `throttle/<host>/*`.
+    """
+
+    def __init__(self, crawler: Crawler, throttle: AdaptiveThrottle) -> None:
+        """Initialize the AdaptiveThrottleMiddleware.
+
+        Args:
+            crawler (Crawler): The crawler using the middleware.
+            throttle (AdaptiveThrottle): The shared throttle.
+        """
+        self.crawler = crawler
+        self.stats: StatsCollector = crawler.stats
+        self.throttle = throttle
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        """Create the middleware, unless the ADAPTIVE_THROTTLE setting is off.
+
+        Args:
+            crawler (Crawler): The crawler using the middleware.
+
+        Returns:
+            Self: The middleware instance.
+        """
+        if not get_settings().scraper.adaptive_throttle:
+            raise NotConfigured
+        return cls(crawler, AdaptiveThrottle.get())
+
+    def process_response(
+        self,
+        request: Request,
+        response: Response,
+        spider: Spider,  # noqa: ARG002
+    ) -> Response:
+        """Record a response and update the host's slot.
+
+        Args:
+            request (Request): The request.
+            response (Response): The downloaded response.
+            spider (Spider): The spider that issued the request.
+
+        Returns:
+            Response: The same response.
+        """
+        self._record(
+            request,
+            request.meta.get("download_latency"),
+            response.status,
+            retry_after(response.headers.get(b"Retry-After")),
+        )
+        return response
+
+    def process_exception(
+        self,
+        request: Request,
+        exception: Exception,  # noqa: ARG002
+        spider: Spider,  # noqa: ARG002
+    ) -> None:
+        """Record a download error and update the host's slot.
+
+        Args:
+            request (Request): The request.
+            exception (Exception): The download error.
+            spider (Spider): The spider that issued the request.
+        """
+        self._record(request, None, None, None)
+
+    def _record(
+        self,
+        request: Request,
+        latency: float | None,
+        status: int | None,
+        wait: float | None,
+    ) -> None:
+        """Record an outcome and copy the host's state to its downloader slot.
+
+        Args:
+            request (Request): The request.
+            latency (float | None): The response time in seconds.
+            status (int | None): The HTTP status, or None for an error.
+            wait (float | None): The server's `Retry-After`, in seconds.
+        """
+        host = host_of(request.url)
+        state = self.throttle.record(host, latency, status, wait)
+        key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is not None:
+            slot.delay = state.delay
+            slot.concurrency = state.concurrency
+            # Scrapy delays a slot's next download from `lastseen`, a wall
+            # clock time; `next_start` is on the monotonic clock.
+            until = time.time() + state.next_start - time.monotonic()
+            slot.lastseen = max(slot.lastseen, until)
+        self.stats.set_value(f"throttle/{host}/delay", state.delay)
+        self.stats.set_value(f"throttle/{host}/concurrency", state.concurrency)
+        self.stats.set_value(f"throttle/{host}/errors", state.errors)
+        self.stats.set_value(f"throttle/{host}/throttled", state.throttled)
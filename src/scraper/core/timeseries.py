@@ -0,0 +1,229 @@
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Any, ClassVar, Self
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, UpdateOne
+
+from scraper.core.database import DBUtils
+from scraper.utils.settings import get_settings
+
+METRICS: dict[str, tuple[str, ...]] = {
+    "royalroad": ("followers", "views", "rating", "chapters", "pages"),
+    "royalroad_details": (
+        "followers",
+        "total_views",
+        "favorites",
+        "ratings",
+        "overall_score",
+    ),
+    "anilist": ("popularity", "favorites", "rating"),
+}
+
+
+def bucket_start(when: datetime, bucket: str) -> datetime:
+    """Get the start of the bucket a time falls in.
+
+    Args:
+        when (datetime): The time of the observation.
+        bucket (str): The bucket size, "day" or "week" (weeks start on Monday).
+
+    Returns:
+        datetime: Midnight UTC on the first day of the bucket.
+    """
+    day = when.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+class TimeSeries:
+    """Keeps the history of a collection's metrics in bucketed documents.
+
+    Every observation of an item is `$push`ed into one document per item and
+    day (or week) in `<collection>_history`, holding the observation times in
+    `t` and one array per metric, so a year of daily runs is 365 small
+    documents per item rather than one document per observation.
+
+    Fetches open a run with `start_run`, and every item parsed in it is
+    recorded once, at the run's start, whether or not it changed; a fiction
+    listed on several pages or listings in one run is not recorded twice.
+    Pages the conditional HTTP cache reports unchanged are not parsed, so
+    their items get no observation in that run: a gap means the item was not
+    crawled or its page was the same as at its previous observation, whose
+    values `trends.forward_fill` carries forward.
+    """
+
+    _series: ClassVar[dict[str, "TimeSeries"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, collection: str, fields: tuple[str, ...], bucket: str) -> None:
+        """Initialize the TimeSeries.
+
+        Args:
+            collection (str): The name of the collection whose items are tracked.
+            fields (tuple[str, ...]): The metrics recorded for each item.
+            bucket (str): The bucket size, "day" or "week".
+        """
+        self.collection = collection
+        self.fields = fields
+        self.bucket = bucket
+        self.name = f"{collection}_history"
+        self.run: datetime | None = None
+        self._observed: set[str] = set()
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    @classmethod
+    def get(cls, collection: str) -> Self | None:
+        """Get the process-wide series for a collection.
+
+        Args:
+            collection (str): The name of the collection.
+
+        Returns:
+            Self | None: The shared series, or None if the collection has no
+                metrics or the METRIC_HISTORY setting is "none".
+        """
+        bucket = get_settings().scraper.metric_history
+        fields = METRICS.get(collection)
+        if bucket == "none" or not fields:
+            return None
+        with cls._registry_lock:
+            series = cls._series.get(collection)
+            if series is None or series.bucket != bucket:
+                series = cls._series[collection] = cls(collection, fields, bucket)
+        return series
+
+    def start_run(self, started: datetime) -> None:
+        """Record the items parsed from now on once each, at a run's start.
+
+        Starting the run that is already open keeps what it has recorded, so
+        jobs sharing a start time share a run.
+
+        Args:
+            started (datetime): The time the run started.
+        """
+        with self._lock:
+            if started != self.run:
+                self.run = started
+                self._observed.clear()
+
+    def ensure_indexes(self) -> None:
+        """Create the index history queries use, once per process.
+
+        Writes find their bucket by `_id`, so only reads need it.
+        """
+        if self._indexed:
+            return
+        DBUtils.get_collection(self.name).create_index(
+            [("key", ASCENDING), ("start", ASCENDING)]
+        )
+        self._indexed = True
+
+    def op(
+        self, item: BaseModel | dict[str, Any], when: datetime | None = None
+    ) -> UpdateOne | None:
+        """Build the write appending an item's metrics to its current bucket.
+
+        Args:
+            item (BaseModel | dict[str, Any]): The validated item, or its already
+                dumped document.
+            when (datetime | None, optional): The time of the observation.
+                Defaults to the start of the open run, or now outside one.
+
+        Returns:
+            UpdateOne | None: The upsert of the bucket document, or None if the
+                item was already recorded in the open run.
+        """
+        doc = item if isinstance(item, dict) else item.model_dump()
+        key = doc["title"]
+        if when is None:
+            with self._lock:
+                if key in self._observed:
+                    return None
+                if self.run is not None:
+                    self._observed.add(key)
+                when = self.run or datetime.now(UTC)
+        start = bucket_start(when, self.bucket)
+        return UpdateOne(
+            {"_id": f"{key}|{start.date().isoformat()}"},
+            {
+                "$setOnInsert": {"key": key, "start": start},
+                "$push": {"t": when, **{field: doc[field] for field in self.fields}},
+                "$inc": {"n": 1},
+            },
+            upsert=True,
+        )
+
+    def history(
+        self,
+        key: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict[str, list[Any]]:
+        """Get an item's recorded metrics as arrays, oldest first.
+
+        Args:
+            key (str): The item's title.
+            since (datetime | None, optional): Leave out older observations.
+                Defaults to None.
+            until (datetime | None, optional): Leave out observations after
+                this time. Defaults to None.
+
+        Returns:
+            dict[str, list[Any]]: The observation times under "t" and each
+                metric's values under its name, all of the same length.
+        """
+        self.ensure_indexes()
+        query: dict[str, Any] = {"key": key}
+        bounds: dict[str, datetime] = {}
+        if since is not None:
+            bounds["$gte"] = bucket_start(since, self.bucket)
+        if until is not None:
+            bounds["$lte"] = until
+        if bounds:
+            query["start"] = bounds
+        result: dict[str, list[Any]] = {"t": [], **{f: [] for f in self.fields}}
+        cursor = DBUtils.get_collection(self.name).find(
+            query, {"_id": 0, "t": 1, **dict.fromkeys(self.fields, 1)}
+        )
+        for doc in cursor.sort("start", ASCENDING):
+            for i, stamp in enumerate(doc["t"]):
+                when = stamp if stamp.tzinfo else stamp.replace(tzinfo=UTC)
+                if (since and when < since) or (until and when > until):
+                    continue
+                result["t"].append(when)
+                for field in self.fields:
+                    result[field].append(doc[field][i])
+        return result
+
+
+def history(
+    collection: str,
+    key: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict[str, list[Any]]:
+    """Get an item's recorded metrics as arrays, oldest first.
+
+    Args:
+        collection (str): The collection the item is in, e.g. "royalroad".
+        key (str): The item's title.
+        since (datetime | None, optional): Leave out older observations.
+            Defaults to None.
+        until (datetime | None, optional): Leave out observations after this
+            time. Defaults to None.
+
+    Returns:
+        dict[str, list[Any]]: The observation times under "t" and each
+            metric's values under its name.
+
+    Raises:
+        ValueError: If the collection keeps no history.
+    """
+    series = TimeSeries.get(collection)
+    if series is None:
+        msg = f"No metric history is kept for {collection!r}"
+        raise ValueError(msg)
+    return series.history(key, since=since, until=until)
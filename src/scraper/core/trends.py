@@ -0,0 +1,350 @@
+import argparse
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from scraper.core.database import DBUtils
+from scraper.core.timeseries import TimeSeries, bucket_start
+
+COLLECTION = "trends"
+DAY = np.timedelta64(1, "D")
+
+TREND_METRICS: dict[str, tuple[str, ...]] = {
+    "royalroad": ("followers", "views"),
+    "royalroad_details": ("followers", "total_views", "favorites"),
+    "anilist": ("popularity", "favorites"),
+}
+
+
+class TrendMatrix(NamedTuple):
+    """Daily metric values of every series, one row per item.
+
+    `values` maps each metric to an (items, days) float array holding the
+    last observation of each day, carried forward over days without one and
+    NaN before the first.
+    """
+
+    keys: np.ndarray
+    days: np.ndarray
+    values: dict[str, np.ndarray]
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry each row's last observed value forward over NaN gaps.
+
+    Args:
+        values (np.ndarray): An (items, days) array with NaN for no observation.
+
+    Returns:
+        np.ndarray: The filled array; leading NaNs are kept.
+    """
+    columns = np.arange(values.shape[1])
+    last = np.where(np.isnan(values), 0, columns)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return values[np.arange(values.shape[0])[:, None], last]
+
+
+def to_matrix(  # noqa: PLR0913
+    keys: Sequence[str],
+    rows: np.ndarray,
+    stamps: np.ndarray,
+    columns: dict[str, np.ndarray],
+    *,
+    first: np.datetime64,
+    days: int,
+) -> TrendMatrix:
+    """Arrange flat observations into a daily matrix.
+
+    Args:
+        keys (Sequence[str]): The item of each row.
+        rows (np.ndarray): The row of each observation.
+        stamps (np.ndarray): The time of each observation, as datetime64.
+        columns (dict[str, np.ndarray]): Each metric's observed values.
+        first (np.datetime64): The first day of the matrix.
+        days (int): The number of days.
+
+    Returns:
+        TrendMatrix: The matrix, forward filled.
+    """
+    order = np.argsort(stamps, kind="stable")
+    day = (stamps[order].astype("datetime64[D]") - first) // DAY
+    inside = (day >= 0) & (day < days)
+    order, day = order[inside], day[inside].astype(np.intp)
+    values = {}
+    for metric, observed in columns.items():
+        matrix = np.full((len(keys), days), np.nan)
+        # Observations are in time order, so the last one of a day wins.
+        matrix[rows[order], day] = observed[order]
+        values[metric] = forward_fill(matrix)
+    return TrendMatrix(np.asarray(keys), first + np.arange(days) * DAY, values)
+
+
+def load_matrix(
+    collection: str,
+    metrics: Sequence[str] | None = None,
+    days: int = 28,
+    until: datetime | None = None,
+) -> TrendMatrix:
+    """Load the recorded history of every item in a collection.
+
+    Args:
+        collection (str): The collection, e.g. "royalroad".
+        metrics (Sequence[str] | None, optional): The metrics to load.
+            Defaults to the collection's `TREND_METRICS`.
+        days (int, optional): The number of days up to `until`. Defaults to 28.
+        until (datetime | None, optional): The last day. Defaults to today.
+
+    Returns:
+        TrendMatrix: The daily matrix.
+
+    Raises:
+        ValueError: If the collection keeps no metric history.
+    """
+    series = TimeSeries.get(collection)
+    if series is None:
+        msg = f"No metric history is kept for {collection!r}"
+        raise ValueError(msg)
+    metrics = metrics or TREND_METRICS.get(collection, series.fields)
+    until = until or datetime.now(UTC)
+    start = bucket_start(until - timedelta(days=days - 1), "day")
+    series.ensure_indexes()
+    cursor = DBUtils.get_collection(series.name).find(
+        {"start": {"$gte": bucket_start(start, series.bucket)}},
+        {"_id": 0, "key": 1, "t": 1, **dict.fromkeys(metrics, 1)},
+        batch_size=10000,
+    )
+    keys: dict[str, int] = {}
+    rows: list[int] = []
+    stamps: list[datetime] = []
+    observed: dict[str, list[Any]] = {metric: [] for metric in metrics}
+    for doc in cursor:
+        row = keys.setdefault(doc["key"], len(keys))
+        rows.extend([row] * len(doc["t"]))
+        stamps.extend(doc["t"])
+        for metric in metrics:
+            observed[metric].extend(doc.get(metric) or [np.nan] * len(doc["t"]))
+    return to_matrix(
+        list(keys),
+        np.array(rows, dtype=np.intp),
+        np.array([s.replace(tzinfo=None) for s in stamps], dtype="datetime64[ms]"),
+        {m: np.array(v, dtype=np.float64) for m, v in observed.items()},
+        first=np.datetime64(start.date()),
+        days=days,
+    )
+
+
+def window_start(values: np.ndarray, window: int) -> np.ndarray:
+    """Get the column each row's last window starts at.
+
+    Rows first observed inside the window start at their first observation.
+
+    Args:
+        values (np.ndarray): An (items, days) forward-filled array.
+        window (int): The number of days.
+
+    Returns:
+        np.ndarray: The column index of each row's start.
+    """
+    last = values.shape[1] - 1
+    observed = ~np.isnan(values)
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), last)
+    return np.maximum(first, last - window)
+
+
+def velocity(values: np.ndarray, window: int) -> np.ndarray:
+    """Get each row's average daily change over its last `window` days.
+
+    Args:
+        values (np.ndarray): An (items, days) forward-filled array.
+        window (int): The number of days.
+
+    Returns:
+        np.ndarray: The change per day; NaN for rows observed on one day only.
+    """
+    last = values.shape[1] - 1
+    if last < 1:
+        return np.full(values.shape[0], np.nan)
+    start = window_start(values, window)
+    span = last - start
+    base = values[np.arange(values.shape[0]), start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(span > 0, (values[:, last] - base) / span, np.nan)
+
+
+def acceleration(values: np.ndarray, window: int) -> np.ndarray:
+    """Get the change in velocity between the last two windows.
+
+    Args:
+        values (np.ndarray): An (items, days) forward-filled array.
+        window (int): The number of days in each window.
+
+    Returns:
+        np.ndarray: The velocity minus the previous window's velocity.
+    """
+    if values.shape[1] <= window:
+        return np.full(values.shape[0], np.nan)
+    return velocity(values, window) - velocity(values[:, :-window], window)
+
+
+def zscore(values: np.ndarray) -> np.ndarray:
+    """Standardize values across items, ignoring NaN.
+
+    Args:
+        values (np.ndarray): One value per item.
+
+    Returns:
+        np.ndarray: The z-scores; all zero if the values do not vary.
+    """
+    if np.isnan(values).all():
+        return values
+    std = np.nanstd(values)
+    if not std:
+        return np.where(np.isnan(values), np.nan, 0.0)
+    return (values - np.nanmean(values)) / std
+
+
+def breakout(values: np.ndarray, window: int) -> np.ndarray:
+    """Score how unusually fast each item is growing relative to its size.
+
+    Args:
+        values (np.ndarray): An (items, days) forward-filled array.
+        window (int): The number of days.
+
+    Returns:
+        np.ndarray: The z-score of the growth per day relative to the value at
+            the start of the window.
+    """
+    base = values[np.arange(values.shape[0]), window_start(values, window)]
+    return zscore(velocity(values, window) / np.maximum(base, 1))
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """Rank values as percentiles, so different metrics can be averaged.
+
+    Args:
+        values (np.ndarray): One value per item.
+
+    Returns:
+        np.ndarray: 1.0 for the highest value down to near 0; NaN stays NaN.
+    """
+    valid = ~np.isnan(values)
+    ranks = np.full(values.shape, np.nan)
+    order = values[valid].argsort().argsort()
+    ranks[valid] = (order + 1) / max(1, valid.sum())
+    return ranks
+
+
+def compute_trends(matrix: TrendMatrix, window: int = 7) -> dict[str, np.ndarray]:
+    """Compute the trend columns of every item at once.
+
+    Args:
+        matrix (TrendMatrix): The daily matrix.
+        window (int, optional): The number of days per window. Defaults to 7.
+
+    Returns:
+        dict[str, np.ndarray]: `<metric>_velocity`, `<metric>_acceleration` and
+            `<metric>_breakout` per metric, and `score`, the average
+            percentile rank of the breakouts.
+    """
+    trends = {}
+    for metric, values in matrix.values.items():
+        trends[f"{metric}_velocity"] = velocity(values, window)
+        trends[f"{metric}_acceleration"] = acceleration(values, window)
+        trends[f"{metric}_breakout"] = breakout(values, window)
+    ranks = np.vstack(
+        [percentile_rank(trends[f"{metric}_breakout"]) for metric in matrix.values]
+    )
+    with np.errstate(invalid="ignore"):
+        trends["score"] = np.nanmean(ranks, axis=0) if ranks.size else ranks
+    return trends
+
+
+def top_n(
+    matrix: TrendMatrix, trends: dict[str, np.ndarray], n: int, by: str = "score"
+) -> list[dict[str, Any]]:
+    """Pick the items with the highest value of a trend column.
+
+    Args:
+        matrix (TrendMatrix): The daily matrix.
+        trends (dict[str, np.ndarray]): The trend columns.
+        n (int): The number of items.
+        by (str, optional): The column to rank by. Defaults to "score".
+
+    Returns:
+        list[dict[str, Any]]: The items, highest first, with their title and
+            every trend column.
+    """
+    ranked = np.nan_to_num(trends[by], nan=-np.inf)
+    n = min(n, len(ranked))
+    if not n:
+        return []
+    best = np.argpartition(-ranked, n - 1)[:n]
+    best = best[np.argsort(-ranked[best], kind="stable")]
+    return [
+        {"title": str(matrix.keys[i])}
+        | {
+            name: None if np.isnan(column[i]) else float(column[i])
+            for name, column in trends.items()
+        }
+        for i in best
+    ]
+
+
+def write_top(
+    collection: str, entries: list[dict[str, Any]], window: int, by: str = "score"
+) -> None:
+    """Replace the stored ranking of a collection.
+
+    Args:
+        collection (str): The ranked collection.
+        entries (list[dict[str, Any]]): The top items from `top_n`.
+        window (int): The window the trends were computed over.
+        by (str, optional): The column they were ranked by. Defaults to "score".
+    """
+    DBUtils.get_collection(COLLECTION).replace_one(
+        {"_id": f"{collection}/{by}"},
+        {
+            "collection": collection,
+            "by": by,
+            "window": window,
+            "computed_at": datetime.now(UTC),
+            "entries": entries,
+        },
+        upsert=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Compute and store the trends of a collection from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Rank the fastest growing items of a collection."
+    )
+    parser.add_argument("collection", help="e.g. royalroad or anilist")
+    parser.add_argument("--days", type=int, default=28, help="history to load")
+    parser.add_argument("--window", type=int, default=7, help="days per window")
+    parser.add_argument("--top", type=int, default=50, help="items to store")
+    parser.add_argument("--by", default="score", help="trend column to rank by")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    matrix = load_matrix(args.collection, days=args.days)
+    loaded = time.perf_counter()
+    entries = top_n(matrix, compute_trends(matrix, args.window), args.top, args.by)
+    write_top(args.collection, entries, args.window, args.by)
+    print(  # noqa: T201
+        f"{len(matrix.keys)} series loaded in {loaded - start:.2f}s, "
+        f"ranked in {time.perf_counter() - loaded:.2f}s"
+    )
+    for rank, entry in enumerate(entries[:10], start=1):
+        print(f"  {rank:>2}. {entry['title']} ({entry[args.by]:.3f})")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from functools import cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from scraper.core.metrics import Metrics
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@cache
+def list_adapter(model: type[M]) -> TypeAdapter[list[M]]:
+    """Get the cached list adapter for a model.
+
+    Args:
+        model (type[M]): The model class.
+
+    Returns:
+        TypeAdapter[list[M]]: An adapter validating and dumping whole lists.
+    """
+    return TypeAdapter(list[model])
+
+
+@cache
+def _defaults(model: type[BaseModel]) -> dict[str, Any]:
+    """Get the default values of a model's optional fields.
+
+    Args:
+        model (type[BaseModel]): The model class.
+
+    Returns:
+        dict[str, Any]: The defaults by field name.
+    """
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    }
+
+
+def validate_many(
+    model: type[M], rows: list[dict[str, Any]], trusted: bool = False
+) -> list[M]:
+    """Validate a page of raw rows into models in a single pass.
+
+    Args:
+        model (type[M]): The model class.
+        rows (list[dict[str, Any]]): The field values of each item.
+        trusted (bool, optional): Skip validation with `model_construct`; only
+            for rows whose values already have the model's exact types.
+            Defaults to False.
+
+    Returns:
+        list[M]: The models.
+    """
+    with Metrics.get().timer("validate_seconds", model=model.__name__):
+        if trusted:
+            return [model.model_construct(**row) for row in rows]
+        return list_adapter(model).validate_python(rows)
+
+
+def dump_many(model: type[M], items: list[M]) -> list[dict[str, Any]]:
+    """Dump a page of models to Mongo-ready dicts in a single pass.
+
+    Args:
+        model (type[M]): The model class.
+        items (list[M]): The models.
+
+    Returns:
+        list[dict[str, Any]]: The documents.
+    """
+    return list_adapter(model).dump_python(items)
+
+
+def documents(
+    model: type[BaseModel], rows: list[dict[str, Any]], trusted: bool = False
+) -> list[dict[str, Any]]:
+    """Turn a page of raw rows into Mongo-ready documents.
+
+    Args:
+        model (type[BaseModel]): The model class.
+        rows (list[dict[str, Any]]): The field values of each item.
+        trusted (bool, optional): Skip the models entirely and only fill in the
+            defaults; only for rows whose values already have the model's exact
+            types. Defaults to False.
+
+    Returns:
+        list[dict[str, Any]]: The documents, as `model_dump` would produce them.
+    """
+    if trusted:
+        defaults = _defaults(model)
+        return [{**defaults, **row} for row in rows]
+    return dump_many(model, validate_many(model, rows))
@@ -1,22 +1,52 @@
 from datetime import UTC, datetime
+from typing import Any
 
-from scrapy.crawler import CrawlerProcess
+from scrapy.crawler import CrawlerProcess, CrawlerRunner
+from twisted.internet.defer import Deferred
 
-from scraper.core.database import DBUtils
 from scraper.core.fetcher import Fetcher
+from scraper.core.metrics import Metrics
+from scraper.royalroad.models import RoyalRoadDetailModel
 from scraper.royalroad.spider import RoyalRoadSpider
 from scraper.royalroad.types import RoyalRoadPages
-from scraper.utils.utils import get_config
+from scraper.utils.settings import get_settings
+
+
+def crawler_settings() -> dict[str, Any]:
+    """Get the Scrapy settings shared by every RoyalRoad crawl.
+
+    Returns:
+        dict[str, Any]: The settings.
+    """
+    return {
+        "ROBOTSTXT_OBEY": True,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+        "DOWNLOAD_DELAY": get_settings().scraper.download_delay,
+        "LOG_LEVEL": "ERROR",
+        "ITEM_PIPELINES": {"scraper.core.pipeline.MongoPipeline": 300},
+        "DOWNLOADER_MIDDLEWARES": {
+            "scraper.core.throttle.AdaptiveThrottleMiddleware": 570,
+            "scraper.core.httpcache.ConditionalRequestMiddleware": 580,
+        },
+        "EXTENSIONS": {"scraper.core.metrics.MetricsExtension": 500},
+    }
 
 
 class RoyalRoadFetcher(Fetcher):
     """A class for fetching data from RoyalRoad."""
 
-    def __init__(
+    source = "royalroad"
+    collections = ("royalroad", RoyalRoadDetailModel.collection)
+
+    def __init__(  # noqa: PLR0913
         self,
         query_limit: int = 250,
         page: RoyalRoadPages = "Ongoing Fictions",
         max_pages: int = 10,
+        *,
+        incremental: bool = False,
+        details: bool = False,
+        resume: bool = False,
     ) -> None:
         """Initialize the RoyalRoadFetcher.
 
@@ -27,31 +57,56 @@ class RoyalRoadFetcher(Fetcher):
                 Defaults to "Ongoing Fictions".
             max_pages (int, optional): The maximum number of pages to scrape.
                 Defaults to 10.
+            incremental (bool, optional): Whether to stop paging recency-ordered
+                listings once they reach what the previous crawl already saw.
+                Defaults to False.
+            details (bool, optional): Whether to also crawl the detail pages of
+                the fictions that changed, within DETAIL_BUDGET.
+                Defaults to False.
+            resume (bool, optional): Whether to continue the last unfinished
+                crawl of the listing, fetching only its missing pages.
+                Defaults to False.
         """
-        super().__init__(query_limit=query_limit, max_pages=max_pages)
+        super().__init__(query_limit=query_limit, max_pages=max_pages, resume=resume)
         self.page = page
-        self.process = CrawlerProcess(
-            settings={
-                "ROBOTSTXT_OBEY": True,
-                "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
-                "DOWNLOAD_DELAY": get_config("SCRAPER", "DOWNLOAD_DELAY"),
-                "LOG_LEVEL": "ERROR",
-            }
-        )
+        self.incremental = incremental
+        self.details = details
 
-    def fetch(self) -> None:
-        """Fetch data from RoyalRoad."""
-        self.process.crawl(
+    def crawl(self, runner: CrawlerRunner) -> Deferred:
+        """Schedule the crawl on a runner whose reactor is, or will be, running.
+
+        The crawl's checkpoint is closed if every page was parsed, and only
+        then is the watermark set to the start of the crawl, so fictions
+        updated while it runs are picked up again by the next incremental
+        crawl and a failed page is never skipped by it. Otherwise a resumed
+        crawl fetches the rest. Its metrics are recorded whether or not it
+        succeeds.
+
+        Args:
+            runner (CrawlerRunner): The runner to crawl with.
+
+        Returns:
+            Deferred: Fires when the crawl has finished and the run is closed.
+        """
+        started = datetime.now(UTC)
+        baseline = Metrics.get().snapshot()
+        checkpoint = self.open_checkpoint()
+        self.start_history(started)
+        d = runner.crawl(
             RoyalRoadSpider,
             query_limit=self.query_limit,
             page=self.page,
             max_pages=self.max_pages,
+            since=self.watermark() if self.incremental else None,
+            details=self.details,
+            checkpoint=checkpoint,
         )
-        self.process.start()
+        d.addCallback(lambda _: self.close_run(checkpoint, started))
+        d.addBoth(lambda result: self.record_run(started, baseline) or result)
+        return d
 
-        coll = DBUtils.get_collection("last_updated")
-        coll.update_one(
-            {"_id": "royalroad"},
-            {"$set": {self.page: datetime.now(UTC)}},
-            upsert=True,
-        )
+    def fetch(self) -> None:
+        """Fetch data from RoyalRoad in a reactor of its own."""
+        process = CrawlerProcess(settings=crawler_settings())
+        self.crawl(process)
+        process.start()
@@ -0,0 +1,164 @@
+import hashlib
+import heapq
+import struct
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+MAGIC = b"RRF1"
+HEADER = struct.Struct("<4sI")
+CHAPTER_WEIGHT = 100
+
+
+def _hash(value: str) -> int:
+    """Hash a string to an unsigned 64-bit key.
+
+    Args:
+        value (str): The string.
+
+    Returns:
+        int: The key.
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+def card_version(chapters: int, last_updated: datetime) -> int:
+    """Hash what a listing card shows about a fiction's content.
+
+    Args:
+        chapters (int): The number of chapters.
+        last_updated (datetime): The last update time.
+
+    Returns:
+        int: The version key; it changes whenever the detail page may have.
+    """
+    return _hash(f"{chapters}|{last_updated.date().isoformat()}")
+
+
+class FictionFrontier:
+    """The detail pages to fetch next, and the ones already fetched.
+
+    Fetched pages are kept as four parallel arrays (URL hash, card version,
+    chapters and followers; 24 bytes per fiction) in a small binary file, so
+    the seen-set survives across runs. A fiction whose card version matches
+    the stored one is skipped; the others are queued by priority: new
+    chapters first, then follower growth, with never-fetched fictions counted
+    from zero.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the FictionFrontier and load its seen-set.
+
+        Args:
+            path (Path): The file the seen-set is persisted to.
+        """
+        self.path = path
+        self.seen: dict[int, tuple[int, int, int]] = {}
+        self.pending: dict[str, tuple[int, int, int]] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self.load()
+
+    def __len__(self) -> int:
+        """Get the number of fetched fictions.
+
+        Returns:
+            int: The size of the seen-set.
+        """
+        return len(self.seen)
+
+    def load(self) -> None:
+        """Load the seen-set from disk, if it was saved before."""
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as f:
+            magic, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                msg = f"{self.path} is not a fiction frontier file"
+                raise ValueError(msg)
+            columns = [array("Q"), array("Q"), array("I"), array("I")]
+            for column in columns:
+                column.fromfile(f, count)
+        keys, versions, chapters, followers = columns
+        self.seen = {
+            key: (version, chapter, follower)
+            for key, version, chapter, follower in zip(
+                keys, versions, chapters, followers, strict=True
+            )
+        }
+
+    def save(self) -> None:
+        """Write the seen-set to disk atomically."""
+        columns = [array("Q"), array("Q"), array("I"), array("I")]
+        for key, (version, chapters, followers) in self.seen.items():
+            columns[0].append(key)
+            columns[1].append(version)
+            columns[2].append(chapters)
+            columns[3].append(followers)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.seen)))
+            for column in columns:
+                column.tofile(f)
+        tmp.replace(self.path)
+
+    def push(
+        self, url: str, chapters: int, followers: int, last_updated: datetime
+    ) -> bool:
+        """Queue a fiction's detail page unless it is unchanged or queued.
+
+        Args:
+            url (str): The path of the detail page.
+            chapters (int): The number of chapters on the listing card.
+            followers (int): The number of followers on the listing card.
+            last_updated (datetime): The last update time on the listing card.
+
+        Returns:
+            bool: True if the page was queued.
+        """
+        if url in self.pending:
+            return False
+        version = card_version(chapters, last_updated)
+        previous = self.seen.get(_hash(url))
+        if previous is not None and previous[0] == version:
+            return False
+        _, old_chapters, old_followers = previous or (0, 0, 0)
+        priority = CHAPTER_WEIGHT * max(0, chapters - old_chapters) + max(
+            0, followers - old_followers
+        )
+        self.pending[url] = (version, chapters, followers)
+        heapq.heappush(self._heap, (-priority, len(self.pending), url))
+        return True
+
+    def pop(self, count: int) -> list[tuple[str, int]]:
+        """Take the highest-priority queued pages.
+
+        Args:
+            count (int): The most pages to take.
+
+        Returns:
+            list[tuple[str, int]]: The paths of the pages and their priorities.
+        """
+        return [
+            (url, -priority)
+            for priority, _, url in (
+                heapq.heappop(self._heap) for _ in range(min(count, len(self._heap)))
+            )
+        ]
+
+    def queued(self) -> int:
+        """Get the number of pages still waiting in the queue.
+
+        Returns:
+            int: The queue length.
+        """
+        return len(self._heap)
+
+    def done(self, url: str) -> None:
+        """Record that a queued page was fetched, so it is skipped until it changes.
+
+        Args:
+            url (str): The path of the detail page.
+        """
+        card = self.pending.pop(url, None)
+        if card is not None:
+            self.seen[_hash(url)] = card
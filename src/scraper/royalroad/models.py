@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import ClassVar
 
 from pydantic import BaseModel
 
@@ -10,6 +11,8 @@ class RoyalRoadModel(BaseModel):
     ----------
     title : str
         The title of the story.
+    url : str
+        The path of the story's detail page, e.g. "/fiction/123/slug".
     genres : list[str]
         List of genres associated with the story.
     followers : int
@@ -29,6 +32,7 @@ class RoyalRoadModel(BaseModel):
     """
 
     title: str
+    url: str
     genres: list[str]
     followers: int
     rating: float
@@ -38,3 +42,63 @@ class RoyalRoadModel(BaseModel):
     last_updated: datetime
     description: str
     new: bool = True
+
+
+class RoyalRoadChapter(BaseModel):
+    """Model representing one chapter of a RoyalRoad story.
+
+    Attributes
+    ----------
+    title : str
+        The title of the chapter.
+    url : str
+        The path of the chapter page.
+    published : datetime
+        When the chapter was published.
+    """
+
+    title: str
+    url: str
+    published: datetime
+
+
+class RoyalRoadDetailModel(BaseModel):
+    """Model representing the detail page of a RoyalRoad story.
+
+    Attributes
+    ----------
+    title : str
+        The title of the story.
+    url : str
+        The path of the detail page.
+    chapters : list[RoyalRoadChapter]
+        Every chapter, in reading order.
+    overall_score : float
+        The overall rating of the story.
+    total_views : int
+        Total number of views.
+    average_views : int
+        Average number of views per chapter.
+    followers : int
+        Number of followers the story has.
+    favorites : int
+        Number of users who have favorited the story.
+    ratings : int
+        Number of ratings the story has.
+    pages : int
+        Number of pages in the story.
+    """
+
+    collection: ClassVar[str] = "royalroad_details"
+
+    title: str
+    url: str
+    chapters: list[RoyalRoadChapter]
+    overall_score: float
+    total_views: int
+    average_views: int
+    followers: int
+    favorites: int
+    ratings: int
+    pages: int
+    new: bool = True
@@ -0,0 +1,250 @@
+import re
+from datetime import UTC, datetime
+from itertools import pairwise
+from typing import Any
+
+from lxml import etree, html
+
+from scraper.core.validation import validate_many
+from scraper.royalroad.models import RoyalRoadDetailModel, RoyalRoadModel
+
+
+def _has_class(name: str) -> str:
+    """Build the XPath predicate cssselect uses for a `.class` selector.
+
+    Args:
+        name (str): The class name.
+
+    Returns:
+        str: The XPath predicate.
+    """
+    return f"@class and contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+ITEMS = etree.XPath(
+    f"descendant-or-self::div[({_has_class('fiction-list-item')})"
+    f" and ({_has_class('row')})]"
+)
+TITLE = etree.XPath(
+    f"descendant-or-self::h2[{_has_class('fiction-title')}]"
+    "/descendant-or-self::*/a/text()"
+)
+LINK = etree.XPath(
+    f"descendant-or-self::h2[{_has_class('fiction-title')}]"
+    "/descendant-or-self::*/a/@href"
+)
+GENRES = etree.XPath(
+    f"descendant-or-self::span[{_has_class('tags')}]/descendant-or-self::*/a/text()"
+)
+ICONS = etree.XPath("descendant-or-self::i")
+TEXT = etree.XPath("text()")
+TIME_TEXT = etree.XPath("descendant-or-self::*/time/text()")
+DESCRIPTION = etree.XPath(
+    "descendant-or-self::div[@id and starts-with(@id, 'description-')]"
+    "/descendant-or-self::*/text()"
+)
+DETAIL_TITLE = etree.XPath(
+    f"descendant-or-self::div[{_has_class('fic-title')}]//h1/text()"
+)
+STAT_ITEMS = etree.XPath(f"descendant-or-self::div[{_has_class('fiction-stats')}]//li")
+SCORE = etree.XPath("descendant-or-self::*[@data-content]/@data-content")
+CHAPTER_ROWS = etree.XPath(
+    f"descendant-or-self::table[@id='chapters']//tr[{_has_class('chapter-row')}]"
+)
+CHAPTER_LINK = etree.XPath("td[1]//a")
+CHAPTER_TIME = etree.XPath("descendant-or-self::time/@unixtime")
+NUMBER = re.compile(r"[\d,]+")
+DETAIL_STATS = {
+    "overall score": "overall_score",
+    "total views": "total_views",
+    "average views": "average_views",
+    "followers": "followers",
+    "favorites": "favorites",
+    "ratings": "ratings",
+    "pages": "pages",
+}
+NUMERIC_STATS = {
+    "fa-users": "followers",
+    "fa-book": "pages",
+    "fa-eye": "views",
+    "fa-list": "chapters",
+}
+
+
+def _root(text: str) -> etree._Element:
+    """Parse a page the same way parsel does for an `HtmlResponse`.
+
+    Args:
+        text (str): The decoded page.
+
+    Returns:
+        etree._Element: The document root.
+    """
+    body = text.strip().replace("\x00", "").encode("utf8") or b"<html/>"
+    parser = html.HTMLParser(recover=True, encoding="utf8")
+    root = etree.fromstring(body, parser=parser)
+    if root is None:
+        root = etree.fromstring(b"<html/>", parser=parser)
+    return root
+
+
+def _stats(item: etree._Element) -> dict[str, str | None]:
+    """Read every icon-labelled stat of a fiction in a single walk.
+
+    Each stat takes the first value found in document order, matching what
+    `re_first`/`get` return for the equivalent `i.fa-* + span` selectors.
+
+    Args:
+        item (etree._Element): The fiction element.
+
+    Returns:
+        dict[str, str | None]: The raw stat strings by field name.
+    """
+    stats: dict[str, str | None] = dict.fromkeys(
+        [*NUMERIC_STATS.values(), "rating", "last_updated"]
+    )
+    for icon in ICONS(item):
+        span = icon.getnext()
+        while span is not None and not isinstance(span.tag, str):
+            span = span.getnext()
+        if span is None or span.tag != "span":
+            continue
+        for cls in icon.get("class", "").split():
+            field = NUMERIC_STATS.get(cls)
+            if field is not None and stats[field] is None:
+                for text in TEXT(span):
+                    match = NUMBER.search(text)
+                    if match:
+                        stats[field] = match.group()
+                        break
+            elif cls == "fa-star" and stats["rating"] is None:
+                stats["rating"] = span.get("title")
+            elif cls == "fa-calendar" and stats["last_updated"] is None:
+                times = TIME_TEXT(span)
+                stats["last_updated"] = times[0] if times else None
+    return stats
+
+
+def fiction_rows(text: str) -> list[dict[str, Any]]:
+    """Extract the raw field values of every fiction on a listing page.
+
+    Every value already has the exact type of its `RoyalRoadModel` field, so
+    the rows are safe for `validate_many(..., trusted=True)`.
+
+    Args:
+        text (str): The decoded page.
+
+    Returns:
+        list[dict[str, Any]]: The field values of each fiction.
+    """
+    rows = []
+    for item in ITEMS(_root(text)):
+        stats = _stats(item)
+        rows.append(
+            {
+                "title": str(TITLE(item)[0]).strip(),
+                "url": str(LINK(item)[0]),
+                "genres": [str(genre) for genre in GENRES(item)],
+                "followers": int(stats["followers"].replace(",", "")),
+                "rating": float(stats["rating"]),
+                "pages": int(stats["pages"].replace(",", "")),
+                "views": int(stats["views"].replace(",", "")),
+                "chapters": int(stats["chapters"].replace(",", "")),
+                "last_updated": datetime.strptime(  # noqa: DTZ007
+                    stats["last_updated"], "%b %d, %Y"
+                ),
+                "description": " ".join(DESCRIPTION(item)).strip(),
+            }
+        )
+    return rows
+
+
+def parse_fiction_list(text: str, trusted: bool = False) -> list[RoyalRoadModel]:
+    """Parse a RoyalRoad listing page with precompiled lxml XPath.
+
+    This produces the same models as `RoyalRoadSpider.parse_response_css`
+    without building parsel selectors or translating CSS for every field.
+
+    Args:
+        text (str): The decoded page.
+        trusted (bool, optional): Build the models without validation, since
+            the rows are already typed. Defaults to False.
+
+    Returns:
+        list[RoyalRoadModel]: The stories on the page.
+    """
+    return validate_many(RoyalRoadModel, fiction_rows(text), trusted=trusted)
+
+
+def _detail_stats(root: etree._Element) -> dict[str, int | float]:
+    """Read the labelled stats of a fiction detail page.
+
+    The stats are a list of label items, each followed by its value item.
+
+    Args:
+        root (etree._Element): The document root.
+
+    Returns:
+        dict[str, int | float]: The stats by field name.
+    """
+    stats: dict[str, int | float] = {}
+    items = STAT_ITEMS(root)
+    for label, value in pairwise(items):
+        name = label.text_content().strip().rstrip(":").strip().lower()
+        field = DETAIL_STATS.get(name)
+        if field is None or field in stats:
+            continue
+        if field == "overall_score":
+            scores = SCORE(value)
+            stats[field] = float(scores[0].split("/")[0]) if scores else 0.0
+        else:
+            match = NUMBER.search(value.text_content())
+            stats[field] = int(match.group().replace(",", "")) if match else 0
+    return stats
+
+
+def fiction_detail_row(text: str, url: str) -> dict[str, Any]:
+    """Extract the raw field values of a fiction detail page.
+
+    Args:
+        text (str): The decoded page.
+        url (str): The path of the page, as found on the listings.
+
+    Returns:
+        dict[str, Any]: The field values.
+    """
+    root = _root(text)
+    chapters = []
+    for row in CHAPTER_ROWS(root):
+        links = CHAPTER_LINK(row)
+        times = CHAPTER_TIME(row)
+        if not links or not times:
+            continue
+        chapters.append(
+            {
+                "title": links[0].text_content().strip(),
+                "url": links[0].get("href"),
+                "published": datetime.fromtimestamp(int(times[0]), UTC),
+            }
+        )
+    titles = DETAIL_TITLE(root)
+    return {
+        "title": str(titles[0]).strip() if titles else "",
+        "url": url,
+        "chapters": chapters,
+        **dict.fromkeys(DETAIL_STATS.values(), 0),
+        **_detail_stats(root),
+    }
+
+
+def parse_fiction_detail(text: str, url: str) -> RoyalRoadDetailModel:
+    """Parse a RoyalRoad fiction detail page.
+
+    Args:
+        text (str): The decoded page.
+        url (str): The path of the page, as found on the listings.
+
+    Returns:
+        RoyalRoadDetailModel: The story with its chapters and full stats.
+    """
+    return RoyalRoadDetailModel.model_validate(fiction_detail_row(text, url))
@@ -0,0 +1,176 @@
+import argparse
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import NamedTuple
+
+from scrapy.http import HtmlResponse
+
+from scraper.core.archive import HtmlArchive
+from scraper.core.replay import ReplayReport, replay
+from scraper.royalroad.models import RoyalRoadModel
+from scraper.royalroad.spider import RoyalRoadSpider
+from scraper.utils.utils import get_data_directory
+
+_archives: dict[str, HtmlArchive] = {}
+
+
+class SavedPage(NamedTuple):
+    """A saved RoyalRoad listing page, either archived or a legacy file."""
+
+    listing: str
+    page: int
+    root: str
+    digest: str | None = None
+    path: str | None = None
+
+    def __str__(self) -> str:
+        """Describe the page for error reports.
+
+        Returns:
+            str: The listing, page and blob or file it comes from.
+        """
+        return f"{self.listing}/{self.page} ({self.digest or self.path})"
+
+
+def iter_saved_pages(
+    listing: str | None = None, latest: bool = True
+) -> Iterator[SavedPage]:
+    """Iterate over the saved RoyalRoad listing pages, oldest first.
+
+    Pages come from the HTML archive and from the plain `<listing>/<page>.html`
+    files written before the archive existed. They are ordered by crawl time,
+    a legacy file's being its modification time, so a replay in this order
+    leaves the newest snapshot of every story.
+
+    Args:
+        listing (str | None, optional): Only this listing, e.g. "best_rated".
+            Defaults to None.
+        latest (bool, optional): Only the most recent crawl of each archived
+            page. Defaults to True.
+
+    Yields:
+        SavedPage: The saved pages.
+    """
+    root = get_data_directory(RoyalRoadSpider.name)
+    archive = HtmlArchive(root)
+    pages = [
+        (
+            entry.crawled_at,
+            SavedPage(entry.listing, entry.page, str(root), digest=entry.digest),
+        )
+        for entry in archive.entries(listing=listing, latest=latest)
+    ]
+    archive.close()
+    pattern = f"{listing}/*.html" if listing else "*/*.html"
+    pages += [
+        (
+            datetime.fromtimestamp(path.stat().st_mtime, UTC),
+            SavedPage(path.parent.name, int(path.stem), str(root), path=str(path)),
+        )
+        for path in sorted(root.glob(pattern))
+        if path.stem.isdigit()
+    ]
+    for _, page in sorted(pages, key=itemgetter(0)):
+        yield page
+
+
+def load_saved_page(page: SavedPage) -> bytes:
+    """Read the body of a saved page.
+
+    Args:
+        page (SavedPage): The saved page.
+
+    Returns:
+        bytes: The raw HTML body.
+    """
+    if page.path is not None:
+        return Path(page.path).read_bytes()
+    archive = _archives.get(page.root)
+    if archive is None:
+        archive = _archives[page.root] = HtmlArchive(Path(page.root))
+    return archive.read(page.digest)
+
+
+def parse_saved_page(page: SavedPage) -> list[RoyalRoadModel]:
+    """Parse a saved page exactly as the spider parses a live one.
+
+    Args:
+        page (SavedPage): The saved page.
+
+    Returns:
+        list[RoyalRoadModel]: The stories on the page.
+    """
+    response = HtmlResponse(
+        url=f"https://www.royalroad.com/{page.listing}?page={page.page}",
+        body=load_saved_page(page),
+        encoding="utf-8",
+    )
+    return RoyalRoadSpider.parse_response(response)
+
+
+def replay_royalroad(
+    listing: str | None = None,
+    latest: bool = True,
+    workers: int | None = None,
+    write: bool = True,
+) -> ReplayReport:
+    """Re-parse the saved RoyalRoad pages and upsert the results.
+
+    Args:
+        listing (str | None, optional): Only this listing. Defaults to None.
+        latest (bool, optional): Only the most recent crawl of each page.
+            Defaults to True.
+        workers (int | None, optional): Number of processes. Defaults to the
+            number of CPUs.
+        write (bool, optional): Whether to write the items to Mongo.
+            Defaults to True.
+
+    Returns:
+        ReplayReport: The page and item counts, timing and per-page errors.
+    """
+    return replay(
+        iter_saved_pages(listing=listing, latest=latest),
+        parse_saved_page,
+        RoyalRoadSpider.name,
+        workers=workers,
+        write=write,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the replay from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Re-parse saved RoyalRoad pages without crawling."
+    )
+    parser.add_argument("--listing", help="only this listing, e.g. best_rated")
+    parser.add_argument(
+        "--all-crawls", action="store_true", help="replay every archived crawl"
+    )
+    parser.add_argument("--workers", type=int, help="number of processes")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="parse only, do not write to Mongo"
+    )
+    args = parser.parse_args(argv)
+    report = replay_royalroad(
+        listing=args.listing,
+        latest=not args.all_crawls,
+        workers=args.workers,
+        write=not args.dry_run,
+    )
+    print(  # noqa: T201
+        f"{report.pages} pages, {report.items} items in {report.seconds:.2f}s "
+        f"({report.items_per_second:.0f} items/s), {len(report.errors)} errors"
+    )
+    for error in report.errors:
+        print(f"  {error.source}: {error.error}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
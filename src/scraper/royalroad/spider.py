@@ -1,17 +1,87 @@
 from collections.abc import AsyncIterator
-from datetime import datetime
-from pathlib import Path
-from typing import Any
+from datetime import UTC, datetime
+from typing import Any, Self
+from urllib.parse import urljoin
 
-from pymongo import UpdateOne
-from scrapy import Request, Spider
-from scrapy.http import Response
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.python.failure import Failure
 
-from scraper.core.database import DBUtils
-from scraper.royalroad.models import RoyalRoadModel
+from scraper.core.archive import HtmlArchive
+from scraper.core.changes import ChangeTracker
+from scraper.core.checkpoint import Checkpoint, PageDone
+from scraper.core.httpcache import SAVE_META, UNCHANGED_FLAG
+from scraper.core.metrics import Metrics
+from scraper.core.offload import Offloader
+from scraper.core.pipeline import AfterFlush
+from scraper.core.validation import documents, validate_many
+from scraper.royalroad.frontier import FictionFrontier
+from scraper.royalroad.models import RoyalRoadDetailModel, RoyalRoadModel
+from scraper.royalroad.parser import (
+    fiction_rows,
+    parse_fiction_detail,
+    parse_fiction_list,
+)
 from scraper.royalroad.types import RoyalRoadPages
+from scraper.utils.settings import get_settings
 from scraper.utils.utils import get_data_directory
 
+LISTING_PATHS: dict[RoyalRoadPages, str] = {
+    "Best Rated": "/fictions/best-rated?page=",
+    "Trending": "/fictions/trending?page=",
+    "Ongoing Fictions": "/fictions/active-popular?page=",
+    "Popular This Week": "/fictions/weekly-popular?page=",
+    "Latest Updates": "/fictions/latest-updates?page=",
+}
+RECENCY_LISTINGS: frozenset[RoyalRoadPages] = frozenset({"Latest Updates"})
+
+
+def listing_url(page: RoyalRoadPages) -> str:
+    """Get the URL of a listing, without its page number.
+
+    Args:
+        page (RoyalRoadPages): The listing.
+
+    Returns:
+        str: The listing URL on the ROYALROAD_URL host, ending in "page=".
+    """
+    return get_settings().scraper.royalroad_url.rstrip("/") + LISTING_PATHS[page]
+
+
+def _field(item: RoyalRoadModel | dict[str, Any], name: str) -> Any:  # noqa: ANN401
+    """Get a field of a parsed fiction, whether it is a model or a document.
+
+    Args:
+        item (RoyalRoadModel | dict[str, Any]): The fiction.
+        name (str): The field name.
+
+    Returns:
+        Any: The field value.
+    """
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def parse_listing(
+    url: str, body: bytes, encoding: str
+) -> list[RoyalRoadModel] | list[dict[str, Any]]:
+    """Parse a listing page from its raw body.
+
+    This is the picklable entry point used to parse pages in a process pool.
+
+    Args:
+        url (str): The URL of the page.
+        body (bytes): The raw HTML body.
+        encoding (str): The encoding of the body.
+
+    Returns:
+        list[RoyalRoadModel] | list[dict[str, Any]]: The stories on the page.
+    """
+    response = HtmlResponse(url=url, body=body, encoding=encoding)
+    return RoyalRoadSpider.parse_items(response)
+
 
 class RoyalRoadSpider(Spider):
     """Spider for scraping quotes from the RoyalRoad website."""
@@ -19,11 +89,15 @@ class RoyalRoadSpider(Spider):
     entries_per_page = 20
     name = "royalroad"
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         query_limit: int,
         page: RoyalRoadPages,
         max_pages: int,
+        *,
+        since: datetime | None = None,
+        details: bool = False,
+        checkpoint: Checkpoint | None = None,
     ) -> None:
         """Initialize the RoyalRoadSpider with a query limit and page type.
 
@@ -31,57 +105,420 @@ class RoyalRoadSpider(Spider):
             query_limit (int): The maximum number of items to scrape.
             page (RoyalRoadPages): The page type to scrape.
             max_pages (int): The maximum number of pages to scrape.
+            since (datetime | None, optional): The watermark of the previous
+                crawl. On recency-ordered listings, paging stops at the first
+                page holding nothing updated since then. Defaults to None, which
+                crawls every page.
+            details (bool, optional): Whether to also crawl the detail pages of
+                the fictions whose listing cards changed, up to DETAIL_BUDGET
+                pages, most changed first. Defaults to False.
+            checkpoint (Checkpoint | None, optional): The run's checkpoint;
+                pages it already has are skipped and parsed pages are marked
+                done once their items are written. Defaults to None.
         """
         super().__init__()
         self.query_limit = query_limit
         self.page = page
         self.max_pages = max_pages
+        self.since = since
+        self.last_page = min(query_limit // self.entries_per_page + 1, max_pages)
+        self.window = 1
+        self.next_page = 1
+        self.in_flight = 0
+        self.frontier_done = False
+        self.fictions: FictionFrontier | None = None
+        if details:
+            self.fictions = FictionFrontier(
+                get_data_directory(self.name) / "details.frontier"
+            )
+        self.detail_budget = get_settings().scraper.detail_budget
+        self.checkpoint = checkpoint
+        self.io_pool: Offloader | None = None
+        self.parser_pool: Offloader | None = None
+        self.archive = HtmlArchive(
+            get_data_directory(self.name),
+            compression=get_settings().scraper.archive_compression,
+        )
+
+    @classmethod
+    def from_crawler(
+        cls,
+        crawler: Crawler,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Self:
+        """Create the spider and, if enabled, its offload pools.
+
+        With the OFFLOAD setting set to "thread" or "process", HTML is saved on
+        a thread pool and pages are parsed on a pool of that kind, so the
+        reactor thread keeps servicing downloads.
+
+        Args:
+            crawler (Crawler): The crawler running the spider.
+            *args (Any): Positional arguments for the spider.
+            **kwargs (Any): Keyword arguments for the spider.
+
+        Returns:
+            Self: The spider instance.
+        """
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.schedule_details, signal=signals.spider_idle)
+        cfg = get_settings().scraper
+        if cfg.offload != "none":
+            spider.io_pool = Offloader(
+                "io",
+                "thread",
+                max_in_flight=cfg.offload_max_in_flight,
+                stats=crawler.stats,
+            )
+            spider.parser_pool = Offloader(
+                "parse",
+                cfg.offload,
+                max_workers=cfg.offload_workers or None,
+                max_in_flight=cfg.offload_max_in_flight,
+                stats=crawler.stats,
+            )
+        return spider
+
+    def closed(self, _reason: str) -> None:
+        """Shut the offload pools and the archive down when the spider closes."""
+        for pool in (self.io_pool, self.parser_pool):
+            if pool is not None:
+                pool.shutdown()
+        self.archive.close()
+        if self.fictions is not None:
+            self.fictions.save()
 
     async def start(self) -> AsyncIterator[Any]:
         """Asynchronously generate URLs to scrape based on the RoyalRoad page type.
 
+        An incremental crawl starts with the first page only and schedules the
+        rest from `parse` as the frontier advances. A resumed crawl skips the
+        pages its checkpoint already has.
+
         Yields:
             str: The URL for each page to be scraped.
         """
-        if self.page == "Best Rated":
-            base_url = "https://www.royalroad.com/fictions/best-rated?page="
-        elif self.page == "Trending":
-            base_url = "https://www.royalroad.com/fictions/trending?page="
-        elif self.page == "Ongoing Fictions":
-            base_url = "https://www.royalroad.com/fictions/active-popular?page="
-        elif self.page == "Popular This Week":
-            base_url = "https://www.royalroad.com/fictions/weekly-popular?page="
-
-        for i in range(
-            1, min((self.query_limit // self.entries_per_page) + 1, self.max_pages) + 1
-        ):
-            yield Request(url=f"{base_url}{i}", callback=self.parse)
-
-    def parse(self, response: Response) -> None:
+        if not self.incremental:
+            pages = range(1, self.last_page + 1)
+            if self.checkpoint is not None:
+                pages = self.checkpoint.pending(pages)
+            for i in pages:
+                yield self.page_request(i)
+            return
+        for request in self.advance():
+            yield request
+
+    @property
+    def incremental(self) -> bool:
+        """Check whether pages are scheduled incrementally.
+
+        Returns:
+            bool: True for a recency-ordered listing crawled since a watermark.
+        """
+        return self.since is not None and self.page in RECENCY_LISTINGS
+
+    def page_request(self, page: int) -> Request:
+        """Build the request for one page of the listing.
+
+        Args:
+            page (int): The page number.
+
+        Returns:
+            Request: The request.
+        """
+        return Request(
+            url=f"{listing_url(self.page)}{page}",
+            callback=self.parse,
+            errback=self.page_failed,
+            priority=-page,
+        )
+
+    def advance(self) -> list[Request]:
+        """Schedule pages until the incremental window is full.
+
+        The pages are planned on the checkpoint, so a crawl that fails one
+        does not finish.
+
+        Returns:
+            list[Request]: The pages to request next.
+        """
+        requests = []
+        while self.in_flight < self.window and self.next_page <= self.last_page:
+            requests.append(self.page_request(self.next_page))
+            self.next_page += 1
+            self.in_flight += 1
+        if self.checkpoint is not None:
+            self.checkpoint.plan(self.page_number(request.url) for request in requests)
+        return requests
+
+    def page_done(self, stale: bool = False, fresh: bool = False) -> list[Request]:
+        """Move the incremental frontier on after a page was handled.
+
+        A stale page ends the crawl. A page updated entirely since the
+        watermark doubles the number of pages kept in flight, up to
+        INCREMENTAL_MAX_WINDOW; a page straddling the watermark drops it back
+        to one.
+
+        Args:
+            stale (bool, optional): Whether the page held nothing new.
+                Defaults to False.
+            fresh (bool, optional): Whether everything on the page was updated
+                since the watermark. Defaults to False.
+
+        Returns:
+            list[Request]: The pages to request next.
+        """
+        if not self.incremental:
+            return []
+        self.in_flight -= 1
+        if stale and not self.frontier_done:
+            self.frontier_done = True
+            self.crawler.stats.inc_value("royalroad/frontier_stopped")
+        if self.frontier_done:
+            return []
+        max_window = get_settings().scraper.incremental_max_window
+        self.window = min(self.window * 2, max_window) if fresh else 1
+        return self.advance()
+
+    def is_stale(self, items: list[RoyalRoadModel] | list[dict[str, Any]]) -> bool:
+        """Check whether a page holds nothing updated since the watermark.
+
+        Args:
+            items (list[RoyalRoadModel] | list[dict[str, Any]]): The page's items.
+
+        Returns:
+            bool: True if every fiction is older than the watermark and, with
+                CHANGE_DETECTION on, its stored stats are unchanged.
+        """
+        if any(self.is_fresh(item) for item in items):
+            return False
+        if not get_settings().scraper.change_detection:
+            return True
+        tracker = ChangeTracker.get(self.name)
+        return all(tracker.is_unchanged(item) for item in items)
+
+    def is_fresh(self, item: RoyalRoadModel | dict[str, Any]) -> bool:
+        """Check whether a fiction was updated on or after the watermark's day.
+
+        Listings only show the update date, so a fiction updated on the day of
+        the watermark counts as fresh.
+
+        Args:
+            item (RoyalRoadModel | dict[str, Any]): The fiction.
+
+        Returns:
+            bool: True if the fiction may have been updated since the watermark.
+        """
+        updated = _field(item, "last_updated")
+        since = self.since if self.since.tzinfo else self.since.replace(tzinfo=UTC)
+        return updated.date() >= since.astimezone(UTC).date()
+
+    def page_failed(self, failure: Failure) -> list[Request]:
+        """Keep the incremental frontier moving when a page fails to download.
+
+        Args:
+            failure (Failure): The download failure.
+
+        Returns:
+            list[Request]: The pages to request next.
+        """
+        self.logger.error("Failed to fetch %s: %s", failure.request.url, failure.value)
+        return self.page_done()
+
+    async def parse(
+        self, response: Response
+    ) -> list[RoyalRoadModel | dict[str, Any] | PageDone | AfterFlush | Request]:
         """Parse the response from a Royal Road page and save its content.
 
         Args:
             response (Response): The response containing the page content.
+
+        Returns:
+            list[RoyalRoadModel | dict[str, Any] | PageDone | AfterFlush | Request]:
+                The stories on the page and its checkpoint and cache markers,
+                for the item pipeline, followed by the next pages of an
+                incremental crawl.
+        """
+        done = [] if self.checkpoint is None else [self.page_marker(response)]
+        done += self.cache_marker(response)
+        if UNCHANGED_FLAG in response.flags:
+            self.crawler.stats.inc_value("royalroad/pages_unchanged")
+            return [*done, *self.page_done(stale=True)]
+        metrics = Metrics.get()
+        if self.io_pool is None or self.parser_pool is None:
+            self.save_html(response)
+            with metrics.timer("parse_seconds", source=self.name):
+                items = self.parse_items(response)
+        else:
+            saved = self.io_pool.run(self.save_html, response)
+            with metrics.timer("parse_seconds", source=self.name):
+                items = await maybe_deferred_to_future(
+                    self.parser_pool.run(
+                        parse_listing, response.url, response.body, response.encoding
+                    )
+                )
+            await maybe_deferred_to_future(saved)
+        metrics.inc("items_total", len(items), source=self.name)
+        self.queue_details(items)
+        if not self.incremental:
+            return [*items, *done]
+        stale = self.is_stale(items)
+        fresh = bool(items) and all(self.is_fresh(item) for item in items)
+        return [*items, *done, *self.page_done(stale=stale, fresh=fresh)]
+
+    def page_marker(self, response: Response) -> PageDone:
+        """Build the checkpoint marker of a listing page.
+
+        Args:
+            response (Response): The response of the page.
+
+        Returns:
+            PageDone: The marker, yielded after the page's items.
+        """
+        return PageDone(self.checkpoint, self.page_number(response.url))
+
+    @staticmethod
+    def cache_marker(response: Response) -> list[AfterFlush]:
+        """Build the marker that stores a page's new validators and body.
+
+        Args:
+            response (Response): The response of the page.
+
+        Returns:
+            list[AfterFlush]: The marker, yielded after the page's items, or
+                nothing if the conditional cache has nothing new to store.
+        """
+        save = response.meta.get(SAVE_META)
+        return [] if save is None else [AfterFlush(save)]
+
+    @staticmethod
+    def page_number(url: str) -> int:
+        """Get the page number of a listing URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            int: The page number.
+        """
+        return int(url.rsplit("?page=", 1)[-1])
+
+    def queue_details(self, items: list[RoyalRoadModel] | list[dict[str, Any]]) -> None:
+        """Queue the detail pages of the fictions whose listing cards changed.
+
+        Args:
+            items (list[RoyalRoadModel] | list[dict[str, Any]]): The page's items.
+        """
+        if self.fictions is None:
+            return
+        for item in items:
+            queued = self.fictions.push(
+                _field(item, "url"),
+                _field(item, "chapters"),
+                _field(item, "followers"),
+                _field(item, "last_updated"),
+            )
+            key = "queued" if queued else "skipped"
+            self.crawler.stats.inc_value(f"royalroad/details/{key}")
+
+    def schedule_details(self) -> None:
+        """Schedule the top detail pages within the budget once the listings are done.
+
+        Connected to `spider_idle`, so it runs after every listing page has been
+        parsed and the queue holds every candidate of the run.
+
+        Raises:
+            DontCloseSpider: When detail pages were scheduled.
+        """
+        if self.fictions is None or self.detail_budget <= 0:
+            return
+        top = self.fictions.pop(self.detail_budget)
+        if not top:
+            return
+        self.detail_budget -= len(top)
+        for url, priority in top:
+            self.crawler.engine.crawl(
+                Request(
+                    urljoin(listing_url(self.page), url),
+                    callback=self.parse_detail,
+                    priority=priority,
+                    cb_kwargs={"path": url},
+                )
+            )
+        self.crawler.stats.inc_value("royalroad/details/scheduled", len(top))
+        raise DontCloseSpider
+
+    def parse_detail(
+        self, response: Response, path: str
+    ) -> list[RoyalRoadDetailModel | AfterFlush]:
+        """Parse a fiction detail page and mark it as fetched.
+
+        Args:
+            response (Response): The response containing the page content.
+            path (str): The path of the page, as found on the listings.
+
+        Returns:
+            list[RoyalRoadDetailModel | AfterFlush]: The story and its cache
+                marker, for the item pipeline.
+        """
+        self.fictions.done(path)
+        if UNCHANGED_FLAG in response.flags:
+            self.crawler.stats.inc_value("royalroad/details/unchanged")
+            return self.cache_marker(response)
+        metrics = Metrics.get()
+        source = RoyalRoadDetailModel.collection
+        with metrics.timer("parse_seconds", source=source):
+            item = parse_fiction_detail(response.text, path)
+        metrics.inc("items_total", source=source)
+        return [item, *self.cache_marker(response)]
+
+    @property
+    def listing(self) -> str:
+        """Get the directory-style name of the listing being crawled.
+
+        Returns:
+            str: The listing name, e.g. "best_rated".
         """
-        self.save_html(response)
-        self.save_to_coll(self.parse_response(response))
+        return self.page.replace(" ", "_").lower()
 
     def save_html(self, response: Response) -> None:
-        """Save the HTML content of a response to a file.
+        """Save the HTML content of a response to the page archive.
 
         Args:
             response (Response): The response containing the HTML content.
         """
-        base_path = get_data_directory(self.name)
-        page = response.url.split("?page=")[-1]
-        file_path = base_path / self.page.replace(" ", "_").lower()
-        file_path.mkdir(parents=True, exist_ok=True)
-        file_name = f"{page}.html"
-        Path(file_path / file_name).write_bytes(response.body)
+        with Metrics.get().timer("save_html_seconds", source=self.name):
+            self.archive.put(
+                self.listing, self.page_number(response.url), response.body
+            )
+
+    @staticmethod
+    def parse_items(response: Response) -> list[RoyalRoadModel] | list[dict[str, Any]]:
+        """Parse a Royal Road page into items for the pipeline.
+
+        With the lxml parser and TRUST_FAST_PARSER enabled the already typed rows
+        become Mongo documents directly, skipping the models; otherwise this is
+        `parse_response`.
+
+        Args:
+            response (Response): The response containing the page content.
+
+        Returns:
+            list[RoyalRoadModel] | list[dict[str, Any]]: The stories on the page.
+        """
+        cfg = get_settings().scraper
+        if cfg.royalroad_parser == "lxml" and cfg.trust_fast_parser:
+            return documents(RoyalRoadModel, fiction_rows(response.text), trusted=True)
+        return RoyalRoadSpider.parse_response(response)
 
-    def parse_response(self, response: Response) -> list[RoyalRoadModel]:
+    @staticmethod
+    def parse_response(response: Response) -> list[RoyalRoadModel]:
         """Parse the response from a Royal Road page and extract story information.
 
+        Uses the lxml fast path when the ROYALROAD_PARSER setting is "lxml" and
+        the CSS selectors otherwise; both produce identical models.
+
         Args:
             response (Response): The response containing the page content.
 
@@ -89,9 +526,25 @@ class RoyalRoadSpider(Spider):
             list[RoyalRoadModel]: A list of RoyalRoadModel instances with extracted
                 story information.
         """
-        ret = []
+        if get_settings().scraper.royalroad_parser == "lxml":
+            return parse_fiction_list(response.text)
+        return RoyalRoadSpider.parse_response_css(response)
+
+    @staticmethod
+    def parse_response_css(response: Response) -> list[RoyalRoadModel]:
+        """Parse the response from a Royal Road page with CSS selectors.
+
+        Args:
+            response (Response): The response containing the page content.
+
+        Returns:
+            list[RoyalRoadModel]: A list of RoyalRoadModel instances with extracted
+                story information.
+        """
+        rows = []
         for item in response.css("div.fiction-list-item.row"):
             title = item.css("h2.fiction-title a::text").get().strip()
+            url = item.css("h2.fiction-title a::attr(href)").get()
             genres = item.css("span.tags a::text").getall()
             followers = int(
                 item.css("i.fa-users + span::text").re_first(r"[\d,]+").replace(",", "")
@@ -112,34 +565,18 @@ class RoyalRoadSpider(Spider):
             description = " ".join(
                 item.css("div[id^=description-] ::text").getall()
             ).strip()
-            ret.append(
-                RoyalRoadModel(
-                    title=title,
-                    genres=genres,
-                    followers=followers,
-                    rating=rating,
-                    pages=pages,
-                    views=views,
-                    chapters=chapters,
-                    last_updated=last_updated,
-                    description=description,
-                )
-            )
-        return ret
-
-    def save_to_coll(self, data: list[RoyalRoadModel]) -> None:
-        """Save a list of RoyalRoadModel instances to the collection.
-
-        Args:
-            data (list[RoyalRoadModel]): The list of RoyalRoadModel instances to save.
-        """
-        coll = DBUtils.get_collection(self.name)
-        ops = [
-            UpdateOne(
-                {"_id": item.title},
-                {"$set": item.model_dump()},
-                upsert=True,
+            rows.append(
+                {
+                    "title": title,
+                    "url": url,
+                    "genres": genres,
+                    "followers": followers,
+                    "rating": rating,
+                    "pages": pages,
+                    "views": views,
+                    "chapters": chapters,
+                    "last_updated": last_updated,
+                    "description": description,
+                }
             )
-            for item in data
-        ]
-        coll.bulk_write(ops)
+        return validate_many(RoyalRoadModel, rows)
@@ -1,5 +1,5 @@
 from typing import Literal
 
 RoyalRoadPages = Literal[
-    "Best Rated", "Trending", "Ongoing Fictions", "Popular This Week"
+    "Best Rated", "Trending", "Ongoing Fictions", "Popular This Week", "Latest Updates"
 ]
@@ -0,0 +1,250 @@
+import argparse
+import time
+from collections import defaultdict
+from collections.abc import Generator, Iterable
+from datetime import UTC, datetime
+from itertools import chain
+from typing import get_args
+
+from pydantic import BaseModel
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from scrapy.utils.reactor import install_reactor
+from twisted.internet.defer import Deferred, DeferredList, inlineCallbacks
+from twisted.internet.threads import deferToThread
+
+from scraper.anilist.fetcher import AniListFetcher
+from scraper.anilist.types import AniListPages
+from scraper.core.fetcher import Fetcher
+from scraper.core.metrics import Metrics
+from scraper.royalroad.fetcher import RoyalRoadFetcher, crawler_settings
+from scraper.royalroad.types import RoyalRoadPages
+
+
+class JobReport(BaseModel):
+    """Outcome of one fetch job.
+
+    Attributes
+    ----------
+    name : str
+        The source and page of the job, e.g. "royalroad/Best Rated".
+    seconds : float
+        Wall-clock duration of the job.
+    error : str | None
+        The error the job failed with, or None if it succeeded.
+    """
+
+    name: str
+    seconds: float
+    error: str | None = None
+
+
+class RunReport(BaseModel):
+    """Summary of a runner invocation.
+
+    Attributes
+    ----------
+    jobs : list[JobReport]
+        The jobs, in the order they finished.
+    seconds : float
+        Wall-clock duration of the whole run.
+    """
+
+    jobs: list[JobReport] = []
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[JobReport]:
+        """Get the jobs that failed.
+
+        Returns:
+            list[JobReport]: The failed jobs.
+        """
+        return [job for job in self.jobs if job.error is not None]
+
+
+def default_fetchers(  # noqa: PLR0913
+    query_limit: int = 250,
+    max_pages: int = 10,
+    *,
+    incremental: bool = False,
+    concurrent: bool = False,
+    details: bool = False,
+    resume: bool = False,
+) -> list[Fetcher]:
+    """Build a fetcher for every RoyalRoad listing and AniList page.
+
+    Args:
+        query_limit (int, optional): The maximum query limit per fetch.
+            Defaults to 250.
+        max_pages (int, optional): The maximum number of pages per fetch.
+            Defaults to 10.
+        incremental (bool, optional): Crawl recency-ordered RoyalRoad listings
+            incrementally. Defaults to False.
+        concurrent (bool, optional): Use the concurrent AniList client.
+            Defaults to False.
+        details (bool, optional): Also crawl changed RoyalRoad detail pages.
+            Defaults to False.
+        resume (bool, optional): Continue each job's last unfinished run.
+            Defaults to False.
+
+    Returns:
+        list[Fetcher]: The fetchers.
+    """
+    fetchers: list[Fetcher] = [
+        RoyalRoadFetcher(
+            query_limit,
+            page,
+            max_pages,
+            incremental=incremental,
+            details=details,
+            resume=resume,
+        )
+        for page in get_args(RoyalRoadPages)
+    ]
+    fetchers += [
+        AniListFetcher(
+            query_limit, page, max_pages, concurrent=concurrent, resume=resume
+        )
+        for page in get_args(AniListPages)
+    ]
+    return fetchers
+
+
+class Runner:
+    """Runs many fetch jobs inside a single reactor run.
+
+    Jobs for the same source run one after another, so each site sees the same
+    request rate as a single crawl, while different sources run concurrently.
+    RoyalRoad crawls share one `CrawlerRunner` and its settings; AniList pulls
+    run on the reactor's thread pool. Each job sets its own `last_updated`
+    watermark as it finishes; with the METRICS setting on, each job and the
+    whole run (as job "runner") get a document in `runs`. Metric history
+    records each item once per runner run, however many listings show it.
+    """
+
+    def __init__(self, fetchers: Iterable[Fetcher]) -> None:
+        """Initialize the Runner.
+
+        Args:
+            fetchers (Iterable[Fetcher]): The jobs to run.
+        """
+        self.lanes: dict[str, list[Fetcher]] = defaultdict(list)
+        for fetcher in fetchers:
+            self.lanes[fetcher.source].append(fetcher)
+        self.report = RunReport()
+        self.crawler_runner: CrawlerRunner | None = None
+
+    def run(self) -> RunReport:
+        """Run every job and stop the reactor once all have finished.
+
+        Returns:
+            RunReport: The per-job timing and errors.
+        """
+        self.crawler_runner = CrawlerRunner(crawler_settings())
+        install_reactor(self.crawler_runner.settings["TWISTED_REACTOR"])
+        configure_logging(self.crawler_runner.settings)
+        from twisted.internet import reactor  # noqa: PLC0415 - installed just above
+
+        started = datetime.now(UTC)
+        for fetcher in chain.from_iterable(self.lanes.values()):
+            fetcher.run_started = started
+        baseline = Metrics.get().snapshot()
+        start = time.perf_counter()
+        d = DeferredList([self._lane(lane) for lane in self.lanes.values()])
+        d.addBoth(lambda _: reactor.stop())
+        reactor.run()
+        self.report.seconds = time.perf_counter() - start
+        Metrics.get().record_run("runner", started, baseline)
+        return self.report
+
+    @inlineCallbacks
+    def _lane(self, fetchers: list[Fetcher]) -> Generator[Deferred, None, None]:
+        """Run the jobs of one source one after another.
+
+        Args:
+            fetchers (list[Fetcher]): The jobs.
+
+        Yields:
+            Deferred: The running job.
+        """
+        for fetcher in fetchers:
+            start = time.perf_counter()
+            error = None
+            try:
+                yield self._start(fetcher)
+            except Exception as e:  # noqa: BLE001
+                error = repr(e)
+            self.report.jobs.append(
+                JobReport(
+                    name=fetcher.name,
+                    seconds=time.perf_counter() - start,
+                    error=error,
+                )
+            )
+
+    def _start(self, fetcher: Fetcher) -> Deferred:
+        """Start one job.
+
+        Args:
+            fetcher (Fetcher): The job.
+
+        Returns:
+            Deferred: Fires when the job has finished.
+        """
+        if isinstance(fetcher, RoyalRoadFetcher):
+            return fetcher.crawl(self.crawler_runner)
+        return deferToThread(fetcher.fetch)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Refresh every listing of every source from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments. Defaults to the
+            process arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Refresh all RoyalRoad listings and AniList pages at once."
+    )
+    parser.add_argument("--query-limit", type=int, default=250)
+    parser.add_argument("--max-pages", type=int, default=10)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="stop paging recency listings at the last crawl",
+    )
+    parser.add_argument(
+        "--concurrent", action="store_true", help="use the concurrent AniList client"
+    )
+    parser.add_argument(
+        "--details", action="store_true", help="also crawl changed detail pages"
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="continue the last unfinished runs"
+    )
+    parser.add_argument(
+        "--only", nargs="+", help="only these jobs, e.g. 'royalroad/Best Rated'"
+    )
+    args = parser.parse_args(argv)
+    fetchers = default_fetchers(
+        args.query_limit,
+        args.max_pages,
+        incremental=args.incremental,
+        concurrent=args.concurrent,
+        details=args.details,
+        resume=args.resume,
+    )
+    if args.only:
+        fetchers = [fetcher for fetcher in fetchers if fetcher.name in args.only]
+    report = Runner(fetchers).run()
+    for job in report.jobs:
+        status = "ok" if job.error is None else job.error
+        print(f"{job.name}: {job.seconds:.2f}s {status}")  # noqa: T201
+    print(  # noqa: T201
+        f"{len(report.jobs)} jobs in {report.seconds:.2f}s, {len(report.failed)} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
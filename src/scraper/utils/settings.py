@@ -0,0 +1,256 @@
+import os
+import threading
+from configparser import ConfigParser
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+CONFIG_FILE = Path(__file__).parent.parent.parent.parent / "config.ini"
+ENV_PREFIX = "SCRAPER_"
+
+
+class DatabaseSettings(BaseModel):
+    """Settings from the DATABASE section of the config file.
+
+    Attributes
+    ----------
+    uri : str
+        The MongoDB connection URI.
+    max_pool_size : int
+        Maximum number of pooled connections per client.
+    min_pool_size : int
+        Minimum number of pooled connections per client.
+    connect_timeout_ms : int
+        Timeout for establishing a connection, in milliseconds.
+    server_selection_timeout_ms : int
+        Timeout for selecting a server, in milliseconds.
+    socket_timeout_ms : int
+        Timeout for socket reads and writes in milliseconds, 0 for none.
+    write_concern : str
+        The write concern `w` value, e.g. "1" or "majority".
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    uri: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    connect_timeout_ms: int = 20000
+    server_selection_timeout_ms: int = 30000
+    socket_timeout_ms: int = 0
+    write_concern: str = "1"
+
+
+class ScraperSettings(BaseModel):
+    """Settings from the SCRAPER section of the config file.
+
+    Attributes
+    ----------
+    download_delay : float
+        Delay between consecutive requests to the same site, in seconds.
+    royalroad_url : str
+        The RoyalRoad site root the listings are crawled from.
+    anilist_url : str
+        The AniList GraphQL endpoint.
+    anilist_concurrency : int
+        Maximum number of AniList requests in flight in concurrent mode.
+    anilist_rate_limit : int
+        Initial AniList requests-per-minute budget, until the response
+        headers report the real one.
+    anilist_pages_per_query : int
+        Number of aliased pages packed into one AniList request; pages are cut
+        small enough for this many to fit ANILIST_MAX_COMPLEXITY.
+    anilist_max_complexity : int
+        Query complexity budget that caps how many pages are packed together.
+    batch_size : int
+        Number of buffered upserts that triggers a bulk write.
+    batch_flush_interval : float
+        Seconds after which a partial batch of upserts is written anyway.
+    batch_max_pending : int
+        Number of queued upserts after which producers wait for the writer.
+    offload : str
+        Where RoyalRoad pages are saved and parsed: "none" on the reactor
+        thread, "thread" or "process" on a pool of that kind.
+    offload_workers : int
+        Size of the parsing pool, 0 for the executor default.
+    offload_max_in_flight : int
+        Maximum number of offloaded calls submitted to a pool at once.
+    archive_compression : str
+        Codec for archived HTML: "auto" (zstd if installed), "gzip" or "zstd".
+    royalroad_parser : str
+        RoyalRoad listing parser: "css" selectors or the "lxml" fast path.
+    trust_fast_parser : bool
+        Build models from the lxml parser's already typed rows without
+        validating them again.
+    change_detection : bool
+        Skip writes for unchanged items and set only the changed fields.
+    http_conditional_cache : bool
+        Revalidate pages with ETag/Last-Modified and skip unchanged ones.
+    incremental_max_window : int
+        Maximum number of pages an incremental crawl keeps in flight.
+    adaptive_throttle : bool
+        Adapt each host's delay and concurrency to its latency, errors and
+        429/503 responses, starting from DOWNLOAD_DELAY.
+    throttle_min_delay : float
+        Lowest per-host delay the adaptive throttle may reach, in seconds.
+    throttle_max_delay : float
+        Highest per-host delay the adaptive throttle may reach, in seconds.
+    throttle_max_concurrency : int
+        Most requests the adaptive throttle keeps in flight per host.
+    throttle_target_latency : float
+        Response time, in seconds, above which a host counts as loaded.
+    detail_budget : int
+        Most RoyalRoad fiction detail pages fetched per crawl in details mode.
+    metric_history : str
+        Bucket size of the metric history kept for every scraped item, "day"
+        or "week", or "none" to keep no history.
+    genre_ids : bool
+        Store each item's genres as ids from the shared genre dictionary in
+        `genre_ids`, next to the names.
+    metrics : bool
+        Record per-stage latencies, counters and gauges of every fetch into
+        the `runs` collection and DATA_PATH/metrics/scraper.prom.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    download_delay: float = 1.0
+    royalroad_url: str = "https://www.royalroad.com"
+    anilist_url: str = "https://graphql.anilist.co"
+    anilist_concurrency: int = 4
+    anilist_rate_limit: int = 30
+    anilist_pages_per_query: int = 5
+    anilist_max_complexity: int = 500
+    batch_size: int = 500
+    batch_flush_interval: float = 1.0
+    batch_max_pending: int = 5000
+    offload: Literal["none", "thread", "process"] = "none"
+    offload_workers: int = 0
+    offload_max_in_flight: int = 16
+    archive_compression: Literal["auto", "gzip", "zstd"] = "auto"
+    royalroad_parser: Literal["css", "lxml"] = "css"
+    trust_fast_parser: bool = False
+    change_detection: bool = True
+    http_conditional_cache: bool = True
+    incremental_max_window: int = 4
+    adaptive_throttle: bool = True
+    throttle_min_delay: float = 0.25
+    throttle_max_delay: float = 30.0
+    throttle_max_concurrency: int = 4
+    throttle_target_latency: float = 1.0
+    detail_budget: int = 100
+    metric_history: Literal["none", "day", "week"] = "day"
+    genre_ids: bool = True
+    metrics: bool = False
+
+
+class Settings(BaseModel):
+    """Typed view of the whole config file.
+
+    Attributes
+    ----------
+    data_path : Path
+        Root directory for saved data.
+    database : DatabaseSettings
+        The DATABASE section.
+    scraper : ScraperSettings
+        The SCRAPER section.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    data_path: Path
+    database: DatabaseSettings
+    scraper: ScraperSettings = ScraperSettings()
+
+
+_lock = threading.Lock()
+_parser: ConfigParser | None = None
+_settings: Settings | None = None
+
+
+def _apply_env(cfg: ConfigParser) -> None:
+    """Apply environment overrides to a parsed config.
+
+    Variables are named `SCRAPER_<KEY>` for DEFAULT keys and
+    `SCRAPER_<SECTION>__<KEY>` for keys in a section, e.g.
+    `SCRAPER_DATABASE__URI` or `SCRAPER_SCRAPER__DOWNLOAD_DELAY`.
+
+    Args:
+        cfg (ConfigParser): The parsed config to update in place.
+    """
+    for name, value in os.environ.items():
+        if not name.startswith(ENV_PREFIX):
+            continue
+        section, _, key = name.removeprefix(ENV_PREFIX).rpartition("__")
+        if not section:
+            cfg["DEFAULT"][key] = value
+            continue
+        if not cfg.has_section(section):
+            cfg.add_section(section)
+        cfg[section][key] = value
+
+
+def _section(cfg: ConfigParser, name: str) -> dict[str, str]:
+    """Get the keys of a section as a plain dict.
+
+    Args:
+        cfg (ConfigParser): The parsed config.
+        name (str): The section name.
+
+    Returns:
+        dict[str, str]: The keys of the section, empty if it is missing.
+    """
+    if not cfg.has_section(name):
+        return {}
+    return dict(cfg.items(name))
+
+
+def get_parser() -> ConfigParser:
+    """Get the parsed config file, reading it from disk on first use only.
+
+    Returns:
+        ConfigParser: The parsed config, with environment overrides applied.
+    """
+    global _parser  # noqa: PLW0603
+    if _parser is None:
+        with _lock:
+            if _parser is None:
+                cfg = ConfigParser()
+                cfg.read(CONFIG_FILE)
+                _apply_env(cfg)
+                _parser = cfg
+    return _parser
+
+
+def get_settings() -> Settings:
+    """Get the validated settings, loading them on first use only.
+
+    Returns:
+        Settings: The cached settings object.
+    """
+    global _settings  # noqa: PLW0603
+    if _settings is None:
+        cfg = get_parser()
+        settings = Settings(
+            data_path=cfg.defaults().get("data_path"),
+            database=_section(cfg, "DATABASE"),
+            scraper=_section(cfg, "SCRAPER"),
+        )
+        with _lock:
+            _settings = settings
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """Discard the cached config and read it again from disk and environment.
+
+    Returns:
+        Settings: The freshly loaded settings object.
+    """
+    global _parser, _settings  # noqa: PLW0603
+    with _lock:
+        _parser = None
+        _settings = None
+    return get_settings()
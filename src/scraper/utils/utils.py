@@ -1,23 +1,27 @@
 import shutil
-from configparser import ConfigParser
+from functools import cache
 from pathlib import Path
 
+from scraper.utils.settings import get_parser, get_settings
 
-def get_config(section: str, key: str) -> str:
-    """Get the config from config file.
+
+def get_config(section: str, key: str, fallback: str | None = None) -> str:
+    """Get the raw config value from the cached config file.
+
+    Prefer `scraper.utils.settings.get_settings` for typed access.
 
     Args:
         section (str): The section in the config file
         key (str): The key in the section
+        fallback (str | None, optional): The value returned when the key is
+            missing. Defaults to None, in which case a missing key raises.
 
     Returns:
         str: The configuration
     """
-    curr_dir = Path(__file__).parent
-    config_file_location = curr_dir.parent.parent.parent / "config.ini"
-
-    cfg = ConfigParser()
-    cfg.read(config_file_location)
+    cfg = get_parser()
+    if fallback is not None:
+        return cfg.get(section, key, fallback=fallback)
     return cfg[section][key]
 
 
@@ -54,7 +58,20 @@ def get_data_directory(folder: str) -> Path:
     Returns:
         Path: The path of the folder created
     """
-    base_dir = get_config("DEFAULT", "DATA_PATH")
-    base_dir_path = Path(base_dir) / folder
+    return _make_data_directory(get_settings().data_path, folder)
+
+
+@cache
+def _make_data_directory(base_dir: Path, folder: str) -> Path:
+    """Create a data directory once per process.
+
+    Args:
+        base_dir (Path): The DATA_PATH root
+        folder (str): The folder name
+
+    Returns:
+        Path: The path of the folder created
+    """
+    base_dir_path = base_dir / folder
     base_dir_path.mkdir(parents=True, exist_ok=True)
     return base_dir_path
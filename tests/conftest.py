@@ -0,0 +1,61 @@
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from benchmarks.mongo import mock_client
+from scraper.core.changes import ChangeTracker
+from scraper.core.database import DBUtils
+from scraper.core.genres import GenreDictionary
+from scraper.core.metrics import Metrics
+from scraper.core.throttle import AdaptiveThrottle
+from scraper.core.timeseries import TimeSeries
+from scraper.utils.settings import ENV_PREFIX, Settings, reload_settings
+
+Configure = Callable[..., Settings]
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Give every test its own DATA_PATH, settings, mongomock and registries.
+
+    Args:
+        tmp_path (Path): The test's temporary directory.
+        monkeypatch (pytest.MonkeyPatch): Restores everything afterwards.
+    """
+    for name in list(os.environ):
+        if name.startswith(ENV_PREFIX):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv("SCRAPER_DATA_PATH", str(tmp_path / "data"))
+    monkeypatch.setenv("SCRAPER_DATABASE__URI", "mongodb://tests")
+    monkeypatch.setenv("SCRAPER_SCRAPER__DOWNLOAD_DELAY", "0")
+    monkeypatch.setenv("SCRAPER_SCRAPER__ADAPTIVE_THROTTLE", "false")
+    monkeypatch.setattr(DBUtils, "_clients", {})
+    monkeypatch.setattr(ChangeTracker, "_trackers", {})
+    monkeypatch.setattr(TimeSeries, "_series", {})
+    monkeypatch.setattr(GenreDictionary, "_instance", None)
+    monkeypatch.setattr(AdaptiveThrottle, "_instance", None)
+    monkeypatch.setattr(Metrics, "_instance", None)
+    reload_settings()
+    DBUtils.use_client(mock_client())
+
+
+@pytest.fixture
+def configure(monkeypatch: pytest.MonkeyPatch) -> Configure:
+    """Override SCRAPER settings for one test.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Restores the environment afterwards.
+
+    Returns:
+        Configure: Sets each keyword as SCRAPER_SCRAPER__<KEY> and returns the
+            reloaded settings.
+    """
+
+    def apply(**values: object) -> Settings:
+        for key, value in values.items():
+            monkeypatch.setenv(f"SCRAPER_SCRAPER__{key.upper()}", str(value))
+        return reload_settings()
+
+    return apply
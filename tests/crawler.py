@@ -0,0 +1,96 @@
+"""Run a RoyalRoad crawl scenario in a process of its own.
+
+Twisted's reactor cannot be restarted, so each scenario gets a fresh
+interpreter with the asyncio reactor and an in-memory mongomock. A scenario is
+a generator function taking the `CrawlerRunner` and keyword arguments; it
+yields the Deferreds of its crawls, as in `inlineCallbacks`, and returns a
+JSON-serializable result. It runs in the child, so it checks the database
+itself and returns what the test asserts on.
+"""
+
+import importlib
+import json
+import os
+import subprocess
+import sys
+from collections.abc import Callable, Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.reactor import install_reactor
+from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.python.failure import Failure
+
+from benchmarks.mongo import mock_client
+from scraper.core.database import DBUtils
+from scraper.royalroad.fetcher import crawler_settings
+
+ROOT = Path(__file__).resolve().parent.parent
+TIMEOUT = 120
+
+Scenario = Callable[..., Generator[Deferred, Any, Any]]
+
+
+def run_scenario(scenario: Scenario, **kwargs: Any) -> Any:  # noqa: ANN401
+    """Run a scenario in a child process with the test's environment.
+
+    Args:
+        scenario (Scenario): A module-level scenario function.
+        **kwargs (Any): JSON-serializable arguments for it.
+
+    Returns:
+        Any: The scenario's result.
+    """
+    target = f"{scenario.__module__}:{scenario.__name__}"
+    env = os.environ | {"PYTHONPATH": f"{ROOT / 'src'}{os.pathsep}{ROOT}"}
+    child = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "tests.crawler", target, json.dumps(kwargs)],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=env,
+        timeout=TIMEOUT,
+        check=False,
+    )
+    lines = child.stdout.strip().splitlines()
+    if child.returncode != 0 or not lines:
+        pytest.fail(f"{target} exited with {child.returncode}:\n{child.stderr}")
+    outcome = json.loads(lines[-1])
+    if "error" in outcome:
+        pytest.fail(f"{target} failed:\n{outcome['error']}")
+    return outcome["result"]
+
+
+def main(target: str, arguments: str) -> None:
+    """Run a scenario on a fresh reactor and print its outcome as JSON.
+
+    Args:
+        target (str): The scenario, as "module:function".
+        arguments (str): Its keyword arguments, as a JSON object.
+    """
+    DBUtils.use_client(mock_client())
+    runner = CrawlerRunner(crawler_settings())
+    install_reactor(runner.settings["TWISTED_REACTOR"])
+    from twisted.internet import reactor  # noqa: PLC0415 - installed just above
+
+    module, name = target.split(":")
+    scenario = getattr(importlib.import_module(module), name)
+    outcome: dict[str, Any] = {}
+
+    def failed(failure: Failure) -> None:
+        outcome["error"] = failure.getTraceback()
+
+    def start() -> None:
+        d = inlineCallbacks(scenario)(runner, **json.loads(arguments))
+        d.addCallbacks(lambda result: outcome.update(result=result), failed)
+        d.addBoth(lambda _: reactor.stop())
+
+    reactor.callWhenRunning(start)
+    reactor.run()
+    print(json.dumps(outcome, default=str))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+from benchmarks.fixtures import (
+    anilist_media,
+    royalroad_fiction_page,
+    royalroad_listing,
+)
+
+PAGE_ALIAS = re.compile(r"p(\d+): Page\(page: (\d+), perPage: (\d+)\)")
+LISTING_PATH = re.compile(r"^/fictions/([\w-]+)\?page=(\d+)$")
+FICTION_PATH = re.compile(r"^/fiction/(\d+)/")
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class StubServer(ThreadingHTTPServer):
+    """A local HTTP server for tests, answering from a background thread.
+
+    Handlers count what they serve in `hits` and may keep anything else they
+    need in `state`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        handler: type[BaseHTTPRequestHandler],
+        **state: Any,  # noqa: ANN401
+    ) -> None:
+        """Initialize the StubServer on a free local port.
+
+        Args:
+            handler (type[BaseHTTPRequestHandler]): The request handler.
+            **state (Any): Initial values for `state`.
+        """
+        super().__init__(("127.0.0.1", 0), handler)
+        self.hits: Counter[int | str] = Counter()
+        self.state = state
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Get the root URL of the server.
+
+        Returns:
+            str: e.g. "http://127.0.0.1:54321".
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> Self:
+        """Start serving.
+
+        Returns:
+            Self: The running server.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop serving."""
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Base handler with quiet logging and a one-call reply."""
+
+    server: StubServer
+
+    def log_message(self, *_: object) -> None:
+        """Keep the test output quiet."""
+
+    def reply(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+        content_type: str = "text/html",
+    ) -> None:
+        """Send a response.
+
+        Args:
+            status (int): The HTTP status.
+            body (bytes, optional): The body. Defaults to b"".
+            headers (dict[str, str] | None, optional): Extra headers.
+                Defaults to None.
+            content_type (str, optional): The Content-Type.
+                Defaults to "text/html".
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def graphql_pages(self) -> list[tuple[int, int]]:
+        """Read the aliased pages of an AniList GraphQL query.
+
+        Returns:
+            list[tuple[int, int]]: The (page, perPage) of each alias.
+        """
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length))["query"]
+        return [(int(page), int(size)) for _, page, size in PAGE_ALIAS.findall(query)]
+
+
+class AniListStub(StubHandler):
+    """AniList stand-in answering every aliased page with synthetic media.
+
+    Pages listed in the server's `state["fail"]` get a 500 instead, and the
+    others are answered after `state["delay"]` seconds, if set. Each page
+    served is counted in `hits` under its number.
+    """
+
+    def do_POST(self) -> None:
+        """Answer a GraphQL query."""
+        pages = self.graphql_pages()
+        if any(page in self.server.state.get("fail", ()) for page, _ in pages):
+            self.reply(500, b"{}", content_type="application/json")
+            return
+        time.sleep(self.server.state.get("delay", 0))
+        with self.server.lock:
+            self.server.hits.update(page for page, _ in pages)
+        data = {
+            f"p{page}": {"media": anilist_media(page, size)} for page, size in pages
+        }
+        body = json.dumps({"data": data}).encode()
+        self.reply(200, body, content_type="application/json")
+
+
+class RoyalRoadStub(StubHandler):
+    """RoyalRoad stand-in serving synthetic listing and fiction pages.
+
+    The server's `state` configures it:
+
+    - `validators`: "etag", "last-modified" or "none"; with the first two,
+      listing pages carry that validator and a matching conditional request
+      gets a 304.
+    - `seed`: the seed of the listing content, to change every page.
+    - `fail`: listing pages answered with a 500.
+    - `serving`: called with each listing page number before it is served.
+
+    `hits` counts listing pages by number, responses by status, e.g. "304",
+    and requests that carried a validator under "conditional".
+    """
+
+    def do_GET(self) -> None:
+        """Serve robots.txt, a listing page or a fiction page."""
+        state = self.server.state
+        if self.path == "/robots.txt":
+            self.reply(200, b"User-agent: *\nAllow: /\n", content_type="text/plain")
+        elif match := LISTING_PATH.match(self.path):
+            if "serving" in state:
+                state["serving"](int(match[2]))
+            self.listing(int(match[2]))
+        elif match := FICTION_PATH.match(self.path):
+            self.reply(200, royalroad_fiction_page(int(match[1])))
+        else:
+            self.reply(404)
+
+    def listing(self, page: int) -> None:
+        """Serve a listing page, honouring its validators.
+
+        Args:
+            page (int): The page number.
+        """
+        state = self.server.state
+        validators = state.get("validators", "etag")
+        etag = if_none_match = self.headers.get("If-None-Match")
+        since = self.headers.get("If-Modified-Since")
+        with self.server.lock:
+            self.server.hits[page] += 1
+            if if_none_match or since:
+                self.server.hits["conditional"] += 1
+        if page in state.get("fail", ()):
+            with self.server.lock:
+                self.server.hits["500"] += 1
+            self.reply(500)
+            return
+        body = royalroad_listing(page, seed=state.get("seed", 0))
+        headers = {}
+        if validators == "etag":
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            headers["ETag"] = etag
+        elif validators == "last-modified":
+            headers["Last-Modified"] = LAST_MODIFIED
+        unchanged = (validators == "etag" and if_none_match == etag) or (
+            validators == "last-modified" and since == LAST_MODIFIED
+        )
+        status = 304 if unchanged else 200
+        with self.server.lock:
+            self.server.hits[str(status)] += 1
+        self.reply(status, b"" if unchanged else body, headers)
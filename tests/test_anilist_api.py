@@ -0,0 +1,43 @@
+from scraper.anilist.api import AniListAPI
+from tests.conftest import Configure
+
+
+def test_page_complexity_counts_every_entry() -> None:
+    """A page costs its media fields once per entry."""
+    api = AniListAPI(query_limit=500, page="Top 100", max_pages=10)
+    fields = (api.page_complexity() - 1) // api.entries_per_page
+    assert fields == 8
+    api.entries_per_page = 10
+    assert api.page_complexity() == 1 + 10 * fields
+
+
+def test_batches_stay_within_complexity_budget(configure: Configure) -> None:
+    """Pages are packed only while the batch fits the budget."""
+    configure(anilist_max_complexity=500, anilist_pages_per_query=5)
+    api = AniListAPI(query_limit=500, page="Top 100", max_pages=10)
+    api.entries_per_page = 50
+    assert [len(batch) for batch in api.batches()] == [1] * 10
+    api.entries_per_page = 5
+    batches = api.batches()
+    assert sum(len(batch) for batch in batches) == 100
+    assert all(len(b) * api.page_complexity() <= 500 for b in batches)
+    assert max(len(batch) for batch in batches) > 1
+
+
+def test_default_settings_pack_several_pages_per_query() -> None:
+    """The default page size lets a full batch share one request."""
+    api = AniListAPI(query_limit=500, page="Top 100", max_pages=10)
+    batches = api.batches()
+    assert all(len(batch) == 5 for batch in batches[:-1])
+    assert all(len(b) * api.page_complexity() <= 500 for b in batches)
+    assert 5 * api.entries_per_page > 50
+    assert len(batches) < 500 // 50
+    assert len(api.page_numbers()) * api.entries_per_page >= 500
+
+
+def test_single_page_queries_use_full_pages(configure: Configure) -> None:
+    """With one page per query, pages keep AniList's 50 entries."""
+    configure(anilist_pages_per_query=1)
+    api = AniListAPI(query_limit=250, page="Top 100", max_pages=10)
+    assert api.entries_per_page == 50
+    assert [len(batch) for batch in api.batches()] == [1] * 5
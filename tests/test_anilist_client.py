@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+from email.utils import formatdate
+
+import pytest
+
+from benchmarks.fixtures import anilist_media
+from scraper.anilist.client import AsyncAniListAPI
+from scraper.core.database import DBUtils
+from scraper.core.ratelimit import TokenBucket
+from tests.conftest import Configure
+from tests.stubs import StubHandler, StubServer
+
+BURST = 2
+WINDOW = 0.5
+
+
+class RateLimitedGraphQL(StubHandler):
+    """AniList stand-in that answers at most BURST queries per WINDOW seconds.
+
+    Queries over the limit get a 429 whose `Retry-After` is an HTTP-date, the
+    form that used to abort the whole pull.
+    """
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Answer a query, or refuse it with a 429."""
+        pages = self.graphql_pages()
+        now = time.monotonic()
+        with self.server.lock:
+            recent = [t for t in self.server.state["accepted"] if now - t < WINDOW]
+            allowed = len(recent) < BURST
+            if allowed:
+                recent.append(now)
+            self.server.state["accepted"] = recent
+            self.server.hits["ok" if allowed else "throttled"] += 1
+        limits = {"X-RateLimit-Limit": "600", "X-RateLimit-Remaining": "600"}
+        if not allowed:
+            retry = formatdate(time.time() + 1, usegmt=True)
+            self.reply(429, b"{}", {**limits, "Retry-After": retry})
+            return
+        data = {
+            f"p{page}": {"media": anilist_media(page, size)} for page, size in pages
+        }
+        body = json.dumps({"data": data}).encode()
+        self.reply(200, body, limits, "application/json")
+
+
+def test_concurrent_client_retries_after_rate_limit(configure: Configure) -> None:
+    """Every page is written even though the stub throttles the burst."""
+    with StubServer(RateLimitedGraphQL, accepted=[]) as server:
+        configure(
+            anilist_url=f"{server.url}/graphql",
+            anilist_pages_per_query=1,
+            anilist_concurrency=4,
+            anilist_rate_limit=600,
+        )
+        AsyncAniListAPI(query_limit=300, page="Top 100", max_pages=6).start()
+    assert server.hits["throttled"] >= 1
+    assert server.hits["ok"] == 6
+    assert DBUtils.get_collection("anilist").count_documents({}) == 300
+
+
+@pytest.mark.parametrize("http_date", [False, True], ids=["seconds", "http-date"])
+def test_token_bucket_waits_for_retry_after(http_date: bool) -> None:
+    """Both forms of Retry-After block the next acquire."""
+    bucket = TokenBucket(600)
+    retry_after = formatdate(time.time() + 2, usegmt=True) if http_date else "1"
+    bucket.update({"Retry-After": retry_after})
+    started = time.monotonic()
+    asyncio.run(bucket.acquire())
+    assert time.monotonic() - started >= 0.5
+
+
+def test_token_bucket_ignores_malformed_retry_after() -> None:
+    """A Retry-After that is neither seconds nor a date does not raise."""
+    bucket = TokenBucket(600)
+    bucket.update({"Retry-After": "soon"})
+    assert bucket.tokens > 0
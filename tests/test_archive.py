@@ -0,0 +1,25 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from scraper.core.archive import HtmlArchive
+
+
+def test_latest_entries_and_deduplicated_blobs(tmp_path: Path) -> None:
+    """Each page's latest crawl is listed, and equal bodies share one blob."""
+    archive = HtmlArchive(tmp_path, compression="gzip")
+    first = datetime(2025, 1, 1, tzinfo=UTC)
+    later = first + timedelta(days=1)
+    same = archive.put("best_rated", 1, b"<html>one</html>", first)
+    assert archive.put("best_rated", 1, b"<html>one</html>", later) == same
+    changed = archive.put("best_rated", 2, b"<html>two</html>", first)
+    archive.put("trending", 1, b"<html>three</html>", first)
+    latest = list(archive.entries("best_rated", latest=True))
+    assert [(e.page, e.crawled_at, e.digest) for e in latest] == [
+        (1, later, same),
+        (2, first, changed),
+    ]
+    assert len(list(archive.entries())) == 4
+    assert archive.read(changed) == b"<html>two</html>"
+    assert len(list(tmp_path.rglob("*.html.gz"))) == 3
+    assert not list(tmp_path.rglob("*.tmp"))
+    archive.close()
@@ -0,0 +1,50 @@
+from datetime import UTC, datetime, timedelta
+
+from scraper.anilist.fetcher import AniListFetcher
+from scraper.core.changes import ChangeTracker
+from scraper.core.database import DBUtils
+from tests.conftest import Configure
+from tests.stubs import AniListStub, StubServer
+
+
+def write(tracker: ChangeTracker, doc: dict, now: datetime) -> None:
+    """Write a document through the tracker, if it changed.
+
+    Args:
+        tracker (ChangeTracker): The tracker.
+        doc (dict): The document.
+        now (datetime): The change time.
+    """
+    op = tracker.op(doc, now=now)
+    if op is not None:
+        DBUtils.get_collection(tracker.collection).bulk_write([op])
+
+
+def test_expire_new_clears_documents_from_earlier_runs() -> None:
+    """Only documents inserted since the last run started stay new."""
+    tracker = ChangeTracker.get("stories")
+    first = datetime.now(UTC) - timedelta(hours=1)
+    write(tracker, {"title": "Old", "followers": 1}, first)
+    second = first + timedelta(minutes=30)
+    write(tracker, {"title": "Old", "followers": 1}, second)
+    write(tracker, {"title": "Fresh", "followers": 2}, second)
+    assert tracker.expire_new(second) == 1
+    coll = DBUtils.get_collection("stories")
+    assert {doc["_id"]: doc["new"] for doc in coll.find()} == {
+        "Old": False,
+        "Fresh": True,
+    }
+
+
+def test_untouched_items_stop_being_new_after_the_next_fetch(
+    configure: Configure,
+) -> None:
+    """A second identical fetch leaves nothing marked new."""
+    with StubServer(AniListStub) as server:
+        configure(anilist_url=server.url)
+        AniListFetcher(query_limit=100, max_pages=2).fetch()
+        coll = DBUtils.get_collection("anilist")
+        assert coll.count_documents({"new": True}) == 100
+        AniListFetcher(query_limit=100, max_pages=2).fetch()
+    assert coll.count_documents({"new": True}) == 0
+    assert coll.count_documents({}) == 100
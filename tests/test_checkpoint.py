@@ -0,0 +1,107 @@
+import os
+import time
+from collections.abc import Generator
+from typing import Any
+
+from scrapy.crawler import CrawlerRunner
+from twisted.internet.defer import Deferred
+
+from scraper.core.checkpoint import COLLECTION, Checkpoint
+from scraper.core.database import DBUtils
+from scraper.royalroad.fetcher import RoyalRoadFetcher, crawler_settings
+from scraper.utils.settings import reload_settings
+from tests.crawler import run_scenario
+from tests.stubs import RoyalRoadStub, StubServer
+
+PAGES = 6
+STOP_AFTER = 3
+
+
+def test_runs_replace_the_listing_checkpoint() -> None:
+    """Starting runs keeps one document per listing; resuming continues it."""
+    first = Checkpoint.open("anilist", "Top 100")
+    first.pending(range(1, 4))
+    first.mark([1, 2])
+    assert Checkpoint.open("anilist", "Top 100", resume=True).done == {1, 2}
+    Checkpoint.open("anilist", "Top 100")
+    Checkpoint.open("anilist", "Popular")
+    coll = DBUtils.get_collection(COLLECTION)
+    assert coll.count_documents({}) == 2
+    assert Checkpoint.open("anilist", "Top 100", resume=True).done == set()
+
+
+def test_finished_run_is_not_resumed() -> None:
+    """A resume after a finished run starts over."""
+    checkpoint = Checkpoint.open("anilist", "Top 100")
+    checkpoint.pending([1])
+    checkpoint.mark(1)
+    assert checkpoint.finish()
+    assert Checkpoint.open("anilist", "Top 100", resume=True).done == set()
+
+
+def interrupted_then_resumed(
+    runner: CrawlerRunner,
+) -> Generator[Deferred, Any, dict[str, Any]]:
+    """Stop a crawl once STOP_AFTER pages were served, then resume it.
+
+    Args:
+        runner (CrawlerRunner): The runner to crawl with.
+
+    Yields:
+        Deferred: The running crawl.
+
+    Returns:
+        dict[str, Any]: The checkpoint, the pages served and the stored
+            fictions after each crawl.
+    """
+    from twisted.internet import reactor  # noqa: PLC0415 - installed by the harness
+
+    # One request at a time, so the pages after the stop are still queued.
+    single = CrawlerRunner({**crawler_settings(), "CONCURRENT_REQUESTS": 1})
+
+    def stop(page: int) -> None:
+        if page > STOP_AFTER:
+            reactor.callFromThread(single.stop)
+            time.sleep(0.5)
+
+    def outcome() -> dict[str, Any]:
+        doc = DBUtils.get_collection(COLLECTION).find_one()
+        return {
+            "done": sorted(doc["done"]),
+            "finished": doc["finished"],
+            "served": sorted(key for key in server.hits if isinstance(key, int)),
+            "fictions": DBUtils.get_collection("royalroad").count_documents({}),
+            "watermark": fetcher.watermark(),
+        }
+
+    with StubServer(RoyalRoadStub, serving=stop) as server:
+        os.environ["SCRAPER_SCRAPER__ROYALROAD_URL"] = server.url
+        reload_settings()
+        fetcher = RoyalRoadFetcher(
+            query_limit=PAGES * 20, page="Best Rated", max_pages=PAGES
+        )
+        yield fetcher.crawl(single)
+        interrupted = outcome()
+        del server.state["serving"]
+        server.hits.clear()
+        fetcher.resume = True
+        yield fetcher.crawl(runner)
+        resumed = outcome()
+    return {"interrupted": interrupted, "resumed": resumed}
+
+
+def test_interrupted_crawl_resumes_with_the_missing_pages() -> None:
+    """A resumed crawl requests exactly the pages the stopped one did not mark."""
+    result = run_scenario(interrupted_then_resumed)
+    interrupted, resumed = result["interrupted"], result["resumed"]
+    assert not interrupted["finished"]
+    assert interrupted["watermark"] is None
+    assert set(range(1, STOP_AFTER)) <= set(interrupted["done"])
+    assert len(interrupted["done"]) < PAGES
+    assert interrupted["fictions"] >= len(interrupted["done"]) * 20
+    missing = sorted(set(range(1, PAGES + 1)) - set(interrupted["done"]))
+    assert resumed["served"] == missing
+    assert resumed["done"] == list(range(1, PAGES + 1))
+    assert resumed["finished"]
+    assert resumed["fictions"] == PAGES * 20
+    assert resumed["watermark"] is not None
@@ -0,0 +1,80 @@
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from scraper.core.database import DBUtils
+from scraper.core.export import ColumnarExporter, decode_npz, parquet_schema
+
+
+def fiction(i: int, **extra: Any) -> dict[str, Any]:  # noqa: ANN401
+    """Build a stored RoyalRoad listing document.
+
+    Args:
+        i (int): The fiction number.
+        **extra (Any): Fields written next to the model's.
+
+    Returns:
+        dict[str, Any]: The document.
+    """
+    return {
+        "_id": f"Fiction {i}",
+        "title": f"Fiction {i}",
+        "url": f"/fiction/{i}/slug",
+        "genres": ["Fantasy", "Action"][: i % 2 + 1],
+        "followers": i * 10,
+        "rating": 4.5,
+        "pages": 100,
+        "views": 1000,
+        "chapters": 20,
+        "last_updated": datetime(2025, 1, i + 1, tzinfo=UTC),
+        "description": "A description.",
+        **extra,
+    }
+
+
+def test_parquet_schema_is_declared_from_the_model(tmp_path: Path) -> None:
+    """Fields missing from the first batch keep their declared types."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    coll = DBUtils.get_collection("royalroad")
+    coll.insert_many([fiction(i) for i in range(2)])
+    changed = datetime(2025, 2, 1, tzinfo=UTC)
+    coll.insert_many(
+        [fiction(i, _changed_at=changed, genre_ids=[1, 2]) for i in range(2, 4)]
+    )
+    report = ColumnarExporter(
+        "royalroad", batch_size=2, fmt="parquet", root=tmp_path
+    ).export()
+    table = pq.read_table(report.files[0])
+    assert report.rows == 4
+    assert table.schema == parquet_schema("royalroad")
+    assert table.schema.field("chapters").type == pa.int64()
+    assert table.schema.field("genres").type == pa.list_(pa.string())
+    assert table.column("_changed_at").null_count == 2
+    assert table.column("genre_ids").to_pylist()[2:] == [[1, 2], [1, 2]]
+
+
+def test_parquet_schema_of_selected_and_unknown_fields() -> None:
+    """Selected fields keep their order; unknown ones fall back to inference."""
+    pa = pytest.importorskip("pyarrow")
+    schema = parquet_schema("royalroad_details", ["title", "chapters"])
+    assert schema.names == ["title", "chapters"]
+    assert pa.types.is_struct(schema.field("chapters").type.value_type)
+    assert parquet_schema("royalroad", ["title", "unknown"]) is None
+    assert parquet_schema("runs") is None
+
+
+def test_npz_parts_decode_list_columns(tmp_path: Path) -> None:
+    """List columns come back as one array per row."""
+    DBUtils.get_collection("royalroad").insert_many([fiction(i) for i in range(3)])
+    report = ColumnarExporter(
+        "royalroad", fields=["title", "genres"], fmt="npz", root=tmp_path
+    ).export()
+    columns = decode_npz(Path(report.files[0]))
+    assert [list(row) for row in columns["genres"]] == [
+        ["Fantasy"],
+        ["Fantasy", "Action"],
+        ["Fantasy"],
+    ]
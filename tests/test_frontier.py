@@ -0,0 +1,85 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from scraper.royalroad.frontier import CHAPTER_WEIGHT, FictionFrontier
+
+MONDAY = datetime(2026, 3, 2, 9, tzinfo=UTC)
+TUESDAY = datetime(2026, 3, 3, 9, tzinfo=UTC)
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    """Get where the frontier is saved.
+
+    Args:
+        tmp_path (Path): The test's temporary directory.
+
+    Returns:
+        Path: The frontier file.
+    """
+    return tmp_path / "frontier.bin"
+
+
+def test_pop_takes_new_chapters_then_follower_growth(path: Path) -> None:
+    """The budget goes to the biggest changes, and to the first queued on ties."""
+    frontier = FictionFrontier(path)
+    frontier.push("/fiction/1/steady", 10, 500, MONDAY)
+    frontier.push("/fiction/2/popular", 5, 2000, MONDAY)
+    for url, _ in frontier.pop(2):
+        frontier.done(url)
+
+    assert frontier.push("/fiction/1/steady", 13, 500, TUESDAY)
+    assert frontier.push("/fiction/2/popular", 5, 2250, TUESDAY)
+    assert frontier.push("/fiction/3/new", 1, 40, TUESDAY)
+    assert frontier.push("/fiction/4/also-new", 1, 40, TUESDAY)
+    assert frontier.queued() == 4
+    assert frontier.pop(3) == [
+        ("/fiction/1/steady", 3 * CHAPTER_WEIGHT),
+        ("/fiction/2/popular", 250),
+        ("/fiction/3/new", CHAPTER_WEIGHT + 40),
+    ]
+    assert frontier.pop(3) == [("/fiction/4/also-new", CHAPTER_WEIGHT + 40)]
+    assert frontier.pop(3) == []
+
+
+def test_push_skips_queued_and_unchanged_pages(path: Path) -> None:
+    """A page is queued once per run and again only once its card changes."""
+    frontier = FictionFrontier(path)
+    assert frontier.push("/fiction/1/story", 10, 500, MONDAY)
+    assert not frontier.push("/fiction/1/story", 11, 600, TUESDAY)
+    frontier.pop(1)
+    frontier.done("/fiction/1/story")
+    assert not frontier.push("/fiction/1/story", 10, 900, MONDAY.replace(hour=20))
+    assert frontier.push("/fiction/1/story", 10, 900, TUESDAY)
+    assert frontier.pop(1) == [("/fiction/1/story", 400)]
+
+
+def test_seen_set_survives_a_reload(path: Path) -> None:
+    """Only fetched pages are saved, and a reload skips them until they change."""
+    frontier = FictionFrontier(path)
+    frontier.push("/fiction/1/fetched", 10, 500, MONDAY)
+    frontier.push("/fiction/2/unfetched", 3, 20, MONDAY)
+    frontier.pop(1)
+    frontier.done("/fiction/1/fetched")
+    frontier.done("/fiction/9/never-queued")
+    frontier.save()
+
+    reloaded = FictionFrontier(path)
+    assert len(reloaded) == 1
+    assert reloaded.seen == frontier.seen
+    assert not reloaded.push("/fiction/1/fetched", 10, 500, MONDAY)
+    assert reloaded.push("/fiction/2/unfetched", 3, 20, MONDAY)
+    assert reloaded.push("/fiction/1/fetched", 12, 480, TUESDAY)
+    assert reloaded.pop(2) == [
+        ("/fiction/2/unfetched", 3 * CHAPTER_WEIGHT + 20),
+        ("/fiction/1/fetched", 2 * CHAPTER_WEIGHT),
+    ]
+
+
+def test_load_rejects_other_files(path: Path) -> None:
+    """A file without the frontier header is refused rather than misread."""
+    path.write_bytes(b"not a frontier")
+    with pytest.raises(ValueError, match="not a fiction frontier file"):
+        FictionFrontier(path)
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from scraper.core.database import DBUtils
+from scraper.core.genres import GenreDictionary, GenreIndex
+
+GENRES = ["Fantasy", "Action", "Romance", "Horror", "LitRPG"]
+STORIES = {
+    "Dungeon Diver": ["Fantasy", "Action", "LitRPG"],
+    "Heartwood": ["Fantasy", "Romance"],
+    "Night Shift": ["Horror"],
+    "Level Zero": ["Action", "LitRPG"],
+    "Plain Tales": [],
+}
+
+
+@pytest.fixture
+def index() -> GenreIndex:
+    """Store the stories, half with `genre_ids` and half with names only.
+
+    Returns:
+        GenreIndex: The index of the stored stories.
+    """
+    coll = DBUtils.get_collection("stories")
+    for i, (title, genres) in enumerate(STORIES.items()):
+        doc = {"_id": title, "genres": genres}
+        if i % 2:
+            doc["genre_ids"] = GenreDictionary.get().ids(genres)
+        coll.insert_one(doc)
+    return GenreIndex.load("stories")
+
+
+@pytest.mark.parametrize(
+    ("include", "exclude", "any_of", "expected"),
+    [
+        ((), (), (), set(STORIES)),
+        (["LitRPG"], (), (), {"Dungeon Diver", "Level Zero"}),
+        (["Action", "LitRPG"], ["Fantasy"], (), {"Level Zero"}),
+        ((), (), ["Romance", "Horror"], {"Heartwood", "Night Shift"}),
+        (["Fantasy"], ["Action"], ["Romance", "LitRPG"], {"Heartwood"}),
+        ((), ["Fantasy", "Action", "Horror"], (), {"Plain Tales"}),
+        (["Unknown"], (), (), set()),
+        ((), ["Unknown"], (), set(STORIES)),
+    ],
+)
+def test_match_combines_include_exclude_and_any_of(
+    index: GenreIndex,
+    include: list[str],
+    exclude: list[str],
+    any_of: list[str],
+    expected: set[str],
+) -> None:
+    """Matches have every included genre, one of `any_of` and no excluded one."""
+    assert set(index.query(include, exclude, any_of)) == expected
+    assert index.count(include, exclude, any_of) == len(expected)
+
+
+def test_match_agrees_with_a_scan() -> None:
+    """Random combinations over many items match checking each item's genres."""
+    rng = random.Random(0)  # noqa: S311
+    stories = {f"Story {i}": rng.sample(GENRES, rng.randint(0, 3)) for i in range(300)}
+    coll = DBUtils.get_collection("stories")
+    coll.insert_many([{"_id": k, "genres": v} for k, v in stories.items()])
+    index = GenreIndex.load("stories")
+    for _ in range(50):
+        include, exclude, any_of = (
+            rng.sample(GENRES, rng.randint(0, 2)) for _ in "abc"
+        )
+        expected = {
+            title
+            for title, genres in stories.items()
+            if set(include) <= set(genres)
+            and not set(exclude) & set(genres)
+            and (not any_of or set(any_of) & set(genres))
+        }
+        assert set(index.query(include, exclude, any_of)) == expected
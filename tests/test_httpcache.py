@@ -0,0 +1,121 @@
+import os
+from collections.abc import Generator
+from typing import Any
+from unittest import mock
+
+import pytest
+from mongomock.collection import Collection
+from pymongo.errors import PyMongoError
+from scrapy.crawler import CrawlerRunner
+from twisted.internet.defer import Deferred
+
+from scraper.core.changes import ChangeTracker
+from scraper.core.database import DBUtils
+from scraper.royalroad.fetcher import RoyalRoadFetcher
+from scraper.utils.settings import reload_settings
+from tests.crawler import run_scenario
+from tests.stubs import RoyalRoadStub, StubServer
+
+PAGES = 3
+
+
+def snapshot() -> dict[str, str]:
+    """Get when each stored fiction last changed.
+
+    Returns:
+        dict[str, str]: `_changed_at` by title.
+    """
+    coll = DBUtils.get_collection("royalroad")
+    return {doc["_id"]: str(doc["_changed_at"]) for doc in coll.find()}
+
+
+def crawl_twice(
+    runner: CrawlerRunner, validators: str
+) -> Generator[Deferred, Any, dict[str, Any]]:
+    """Crawl a listing twice against a stub that never changes it.
+
+    Args:
+        runner (CrawlerRunner): The runner to crawl with.
+        validators (str): The validators the stub sends.
+
+    Yields:
+        Deferred: The running crawl.
+
+    Returns:
+        dict[str, Any]: The stub's hits and the stored fictions after each crawl.
+    """
+    with StubServer(RoyalRoadStub, validators=validators) as server:
+        os.environ["SCRAPER_SCRAPER__ROYALROAD_URL"] = server.url
+        reload_settings()
+        fetcher = RoyalRoadFetcher(
+            query_limit=PAGES * 20, page="Best Rated", max_pages=PAGES
+        )
+        yield fetcher.crawl(runner)
+        first = {"hits": dict(server.hits), "fictions": snapshot()}
+        server.hits.clear()
+        yield fetcher.crawl(runner)
+        second = {"hits": dict(server.hits), "fictions": snapshot()}
+    return {"first": first, "second": second}
+
+
+def crawl_after_failed_write(
+    runner: CrawlerRunner,
+) -> Generator[Deferred, Any, dict[str, Any]]:
+    """Crawl a listing whose writes fail, then crawl it again.
+
+    Args:
+        runner (CrawlerRunner): The runner to crawl with.
+
+    Yields:
+        Deferred: The running crawl.
+
+    Returns:
+        dict[str, Any]: The stub's hits and the stored fictions after the
+            second crawl.
+    """
+    with StubServer(RoyalRoadStub, validators="etag") as server:
+        os.environ["SCRAPER_SCRAPER__ROYALROAD_URL"] = server.url
+        reload_settings()
+        fetcher = RoyalRoadFetcher(
+            query_limit=PAGES * 20, page="Best Rated", max_pages=PAGES
+        )
+        with mock.patch.object(
+            Collection, "bulk_write", side_effect=PyMongoError("down")
+        ):
+            yield fetcher.crawl(runner)
+        # A new run loads the fingerprints of what was actually stored.
+        ChangeTracker.get("royalroad").load(reload=True)
+        server.hits.clear()
+        yield fetcher.crawl(runner)
+        return {"hits": dict(server.hits), "fictions": snapshot()}
+
+
+@pytest.mark.parametrize("validators", ["etag", "last-modified"])
+def test_second_crawl_revalidates_with_conditional_requests(validators: str) -> None:
+    """Unchanged listings come back as 304s and write nothing."""
+    result = run_scenario(crawl_twice, validators=validators)
+    first, second = result["first"], result["second"]
+    assert first["hits"].get("conditional", 0) == 0
+    assert first["hits"]["200"] == PAGES
+    assert len(first["fictions"]) == PAGES * 20
+    assert second["hits"]["conditional"] == PAGES
+    assert second["hits"]["304"] == PAGES
+    assert "200" not in second["hits"]
+    assert second["fictions"] == first["fictions"]
+
+
+def test_unchanged_bodies_are_skipped_without_validators() -> None:
+    """A 200 whose body hashes the same as last time writes nothing either."""
+    result = run_scenario(crawl_twice, validators="none")
+    first, second = result["first"], result["second"]
+    assert second["hits"].get("conditional", 0) == 0
+    assert second["hits"]["200"] == PAGES
+    assert second["fictions"] == first["fictions"]
+
+
+def test_pages_whose_writes_failed_are_fetched_again() -> None:
+    """Validators are kept only once the page's items were written."""
+    result = run_scenario(crawl_after_failed_write)
+    assert result["hits"].get("conditional", 0) == 0
+    assert result["hits"]["200"] == PAGES
+    assert len(result["fictions"]) == PAGES * 20
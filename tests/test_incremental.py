@@ -0,0 +1,94 @@
+import os
+from collections.abc import Generator
+from datetime import UTC, datetime
+from typing import Any
+
+from scrapy.crawler import CrawlerRunner
+from twisted.internet.defer import Deferred
+
+from scraper.royalroad.fetcher import RoyalRoadFetcher
+from scraper.utils.settings import reload_settings
+from tests.crawler import run_scenario
+from tests.stubs import RoyalRoadStub, StubServer
+
+PAGES = 4
+
+
+def crawl_since_now(
+    runner: CrawlerRunner, change_detection: bool
+) -> Generator[Deferred, Any, dict[str, Any]]:
+    """Crawl "Latest Updates" incrementally with a watermark of now.
+
+    Every synthetic fiction was last updated before 2025, so the first page
+    is already older than the watermark.
+
+    Args:
+        runner (CrawlerRunner): The runner to crawl with.
+        change_detection (bool): The CHANGE_DETECTION setting.
+
+    Yields:
+        Deferred: The running crawl.
+
+    Returns:
+        dict[str, Any]: The stub's hits.
+    """
+    with StubServer(RoyalRoadStub) as server:
+        os.environ["SCRAPER_SCRAPER__ROYALROAD_URL"] = server.url
+        os.environ["SCRAPER_SCRAPER__CHANGE_DETECTION"] = str(change_detection)
+        reload_settings()
+        fetcher = RoyalRoadFetcher(
+            query_limit=PAGES * 20,
+            page="Latest Updates",
+            max_pages=PAGES,
+            incremental=True,
+        )
+        fetcher.set_watermark(datetime.now(UTC))
+        yield fetcher.crawl(runner)
+    return dict(server.hits)
+
+
+def crawl_with_failed_page(
+    runner: CrawlerRunner,
+) -> Generator[Deferred, Any, dict[str, Any]]:
+    """Crawl a listing whose second page fails, then resume it.
+
+    Args:
+        runner (CrawlerRunner): The runner to crawl with.
+
+    Yields:
+        Deferred: The running crawl.
+
+    Returns:
+        dict[str, Any]: The watermark and the pages fetched after each crawl.
+    """
+    with StubServer(RoyalRoadStub, fail={2}) as server:
+        os.environ["SCRAPER_SCRAPER__ROYALROAD_URL"] = server.url
+        reload_settings()
+        fetcher = RoyalRoadFetcher(
+            query_limit=PAGES * 20, page="Best Rated", max_pages=PAGES
+        )
+        yield fetcher.crawl(runner)
+        failed = {"watermark": fetcher.watermark(), "hits": dict(server.hits)}
+        server.state["fail"] = set()
+        server.hits.clear()
+        fetcher.resume = True
+        yield fetcher.crawl(runner)
+        resumed = {"watermark": fetcher.watermark(), "hits": dict(server.hits)}
+    return {"failed": failed, "resumed": resumed}
+
+
+def test_incremental_crawl_stops_without_change_detection() -> None:
+    """Paging stops at the first stale page even with CHANGE_DETECTION off."""
+    hits = run_scenario(crawl_since_now, change_detection=False)
+    assert hits["1"] == 1
+    assert all(str(page) not in hits for page in range(2, PAGES + 1))
+
+
+def test_watermark_waits_for_every_page() -> None:
+    """A crawl with a failed page keeps the watermark until it is resumed."""
+    result = run_scenario(crawl_with_failed_page)
+    failed, resumed = result["failed"], result["resumed"]
+    assert failed["hits"]["500"] >= 1
+    assert failed["watermark"] is None
+    assert set(resumed["hits"]) == {"2", "200"}
+    assert resumed["watermark"] is not None
@@ -0,0 +1,95 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from scraper.core.database import DBUtils
+from scraper.core.matching import COLLECTION, WATERMARK, match_titles, normalize
+
+
+@pytest.mark.parametrize(
+    ("title", "expected"),
+    [
+        ("Beware Of Chicken", "beware of chicken"),
+        ("Beware of Chicken (Light Novel)", "beware of chicken"),
+        ("Re:Zéro — Starting  Life", "re zero starting life"),
+        ("So I'm a Spider, So What?", "so i m a spider so what"),
+        ("Mushoku Tensei (Web Novel)", "mushoku tensei"),
+    ],
+)
+def test_normalize(title: str, expected: str) -> None:
+    """Case, accents, punctuation, format tags and spacing are dropped."""
+    assert normalize(title) == expected
+
+
+def links() -> dict[str, tuple[str, float]]:
+    """Get the stored links.
+
+    Returns:
+        dict[str, tuple[str, float]]: The right key and score of each left key.
+    """
+    coll = DBUtils.get_collection(COLLECTION)
+    return {doc["left"]: (doc["right"], round(doc["score"], 2)) for doc in coll.find()}
+
+
+def test_match_titles_links_known_royalroad_and_anilist_titles() -> None:
+    """Titles match through format tags and AniList's alternative titles."""
+    DBUtils.get_collection("royalroad").insert_many(
+        [
+            {"_id": "Beware Of Chicken"},
+            {"_id": "So I'm a Spider, So What?"},
+            {"_id": "The Wandering Inn"},
+        ]
+    )
+    DBUtils.get_collection("anilist").insert_many(
+        [
+            {"_id": "Beware of Chicken (Light Novel)"},
+            {
+                "_id": "Kumo Desu ga, Nani ka?",
+                "alt_titles": ["So I'm a Spider, So What?"],
+            },
+            {"_id": "Omniscient Reader's Viewpoint"},
+        ]
+    )
+    assert match_titles(full=True) == 2
+    assert links() == {
+        "Beware Of Chicken": ("Beware of Chicken (Light Novel)", 1.0),
+        "So I'm a Spider, So What?": ("Kumo Desu ga, Nani ka?", 1.0),
+    }
+
+
+def test_links_from_the_right_side_replace_only_weaker_links() -> None:
+    """A changed AniList title does not take over a better stored link."""
+    before = datetime.now(UTC) - timedelta(days=1)
+    DBUtils.get_collection("royalroad").insert_many(
+        [
+            {"_id": "Mother of Learning", "_changed_at": before},
+            {"_id": "The Perfect Run", "_changed_at": before},
+        ]
+    )
+    anilist = DBUtils.get_collection("anilist")
+    anilist.insert_many(
+        [
+            {"_id": "Mother of Learning (Web Novel)", "_changed_at": before},
+            {"_id": "Perfect Run", "_changed_at": before},
+        ]
+    )
+    assert match_titles(full=True) == 2
+    assert links() == {
+        "Mother of Learning": ("Mother of Learning (Web Novel)", 1.0),
+        "The Perfect Run": ("Perfect Run", 0.73),
+    }
+    DBUtils.get_collection("last_updated").update_one(
+        {"_id": WATERMARK}, {"$set": {"royalroad/anilist": before + timedelta(hours=1)}}
+    )
+    now = datetime.now(UTC)
+    anilist.insert_many(
+        [
+            {"_id": "Mother of Learnings", "_changed_at": now},
+            {"_id": "The Perfect Runs", "_changed_at": now},
+        ]
+    )
+    assert match_titles() == 1
+    assert links() == {
+        "Mother of Learning": ("Mother of Learning (Web Novel)", 1.0),
+        "The Perfect Run": ("The Perfect Runs", 0.82),
+    }
@@ -0,0 +1,83 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from scraper.core.database import DBUtils
+from scraper.core.metrics import BUCKETS, COLLECTION, Metrics, NullMetrics, since
+from scraper.utils.utils import get_data_directory
+from tests.conftest import Configure
+
+
+def by_name(snapshot: list[dict]) -> dict[str, dict]:
+    """Index a snapshot by metric name.
+
+    Args:
+        snapshot (list[dict]): The snapshot.
+
+    Returns:
+        dict[str, dict]: Each entry by its name.
+    """
+    return {entry["name"]: entry for entry in snapshot}
+
+
+def test_snapshot_and_run_record_what_changed(configure: Configure) -> None:
+    """Counters and histograms are stored as deltas, gauges as they are."""
+    configure(metrics=True)
+    metrics = Metrics.get()
+    assert metrics is Metrics.get()
+    metrics.inc("pages_total", 2, source="royalroad")
+    metrics.observe("parse_seconds", 0.003, source="royalroad")
+    baseline = metrics.snapshot()
+    metrics.inc("pages_total", 3, source="royalroad")
+    metrics.observe("parse_seconds", 0.2, source="royalroad")
+    metrics.observe("parse_seconds", 60, source="royalroad")
+    with metrics.in_flight("in_flight", source="royalroad"):
+        metrics.set("write_queue", 7)
+        assert by_name(metrics.snapshot())["in_flight"]["value"] == 1
+
+    entries = by_name(metrics.snapshot())
+    assert entries["pages_total"] == {
+        "name": "pages_total",
+        "labels": {"source": "royalroad"},
+        "type": "counter",
+        "value": 5,
+    }
+    parse = entries["parse_seconds"]
+    assert parse["count"] == 3
+    assert parse["sum"] == pytest.approx(60.203)
+    assert len(parse["buckets"]) == len(BUCKETS) + 1
+    assert parse["buckets"][BUCKETS.index(0.005)] == 1
+    assert parse["buckets"][BUCKETS.index(0.25)] == 2
+    assert parse["buckets"][-1] == 3
+    assert entries["in_flight"]["value"] == 0
+
+    changed = by_name(since(metrics.snapshot(), baseline))
+    assert changed["pages_total"]["value"] == 3
+    assert changed["parse_seconds"]["count"] == 2
+    assert changed["write_queue"]["value"] == 7
+
+    metrics.record_run("royalroad/Best Rated", datetime.now(UTC), baseline)
+    run = DBUtils.get_collection(COLLECTION).find_one()
+    assert run["job"] == "royalroad/Best Rated"
+    assert by_name(run["metrics"])["pages_total"]["value"] == 3
+    text = (get_data_directory("metrics") / "scraper.prom").read_text()
+    assert 'scraper_pages_total{source="royalroad"} 5' in text
+    assert 'scraper_parse_seconds_bucket{source="royalroad",le="+Inf"} 3' in text
+
+
+def test_null_metrics_record_nothing() -> None:
+    """With METRICS off every call is a no-op and nothing is stored."""
+    metrics = Metrics.get()
+    assert isinstance(metrics, NullMetrics)
+    baseline = metrics.snapshot()
+    metrics.inc("pages_total", source="royalroad")
+    metrics.set("write_queue", 7)
+    metrics.add("in_flight", 1)
+    metrics.observe("parse_seconds", 0.1)
+    with metrics.timer("parse_seconds"), metrics.in_flight("in_flight"):
+        pass
+    metrics.record_run("royalroad/Best Rated", datetime.now(UTC), baseline)
+    assert metrics.snapshot() == []
+    assert Metrics._instance is None  # noqa: SLF001
+    assert DBUtils.get_collection(COLLECTION).count_documents({}) == 0
+    assert not (get_data_directory("metrics") / "scraper.prom").exists()
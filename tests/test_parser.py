@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+from benchmarks.fixtures import royalroad_fiction_page, royalroad_listing
+from benchmarks.royalroad_parser import check_parity, fixture_responses
+from scraper.core.archive import HtmlArchive
+from scraper.royalroad.parser import parse_fiction_detail, parse_fiction_list
+from scraper.royalroad.spider import RoyalRoadSpider
+from scraper.utils.utils import get_data_directory
+
+
+def test_listing_page_parses_every_fiction() -> None:
+    """Every card on a listing page becomes a model, trusted or not."""
+    text = royalroad_listing(2).decode()
+    fictions = parse_fiction_list(text)
+    assert len(fictions) == 20
+    assert fictions[0].url == "/fiction/20/fiction-20"
+    assert parse_fiction_list(text, trusted=True) == fictions
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_lxml_parser_matches_css_selectors(seed: int) -> None:
+    """Both parsers build the same models from fixture and saved pages."""
+    archive = HtmlArchive(get_data_directory(RoyalRoadSpider.name))
+    for page in range(1, 4):
+        archive.put("best_rated", page, royalroad_listing(page, seed=seed))
+    archive.close()
+    responses = fixture_responses(2, saved=True)
+    assert len(responses) == 5
+    assert check_parity(responses) == 5 * 20
+    for response in responses:
+        expected = RoyalRoadSpider.parse_response_css(response)
+        assert parse_fiction_list(response.text, trusted=True) == expected
+
+
+def test_detail_page_stats_pair_each_label_with_its_value() -> None:
+    """Each stat label is read with the item that follows it."""
+    text = royalroad_fiction_page(7, chapters=12).decode()
+    expected = {
+        label: int(value.replace(",", ""))
+        for label, value in re.findall(r">([A-Za-z ]+) :</li>[^>]*>([\d,]+)<", text)
+    }
+    fiction = parse_fiction_detail(text, "/fiction/7/fiction-7")
+    assert len(fiction.chapters) == 12
+    assert fiction.total_views == expected["Total Views"]
+    assert fiction.average_views == expected["Average Views"]
+    assert fiction.followers == expected["Followers"]
+    assert fiction.pages == expected["Pages"]
+    assert 0 <= fiction.overall_score <= 5
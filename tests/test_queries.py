@@ -0,0 +1,168 @@
+import os
+import random
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from pymongo import DESCENDING, MongoClient
+from pymongo.errors import PyMongoError
+
+from scraper.anilist.models import AniListModel
+from scraper.core.database import DBUtils
+from scraper.core.queries import Query, ensure_indexes
+from scraper.royalroad.models import RoyalRoadDetailModel, RoyalRoadModel
+
+# Not under SCRAPER_, which the `isolated` fixture clears.
+LIVE_URI = "MONGODB_TEST_URI"
+MARKER = "_query_test"
+GENRES = ["Fantasy", "Action", "Romance", "Horror", "Comedy"]
+
+
+def fiction(i: int, rng: random.Random) -> dict[str, Any]:
+    """Build a stored RoyalRoad listing document.
+
+    Args:
+        i (int): The fiction number.
+        rng (random.Random): The random source.
+
+    Returns:
+        dict[str, Any]: The document.
+    """
+    return {
+        "_id": f"Query test fiction {i}",
+        "title": f"Query test fiction {i}",
+        "url": f"/fiction/{i}/query-test",
+        "genres": rng.sample(GENRES, 2),
+        "followers": rng.randint(0, 10000),
+        "rating": rng.random() * 5,
+        "pages": rng.randint(1, 900),
+        "views": rng.randint(0, 100000),
+        "chapters": rng.randint(1, 200),
+        "last_updated": datetime(2025, 1, 1, tzinfo=UTC) - timedelta(days=i),
+        "description": "A long description. " * 50,
+        "new": i % 10 == 0,
+    }
+
+
+def anime(i: int, rng: random.Random) -> dict[str, Any]:
+    """Build a stored AniList document.
+
+    Args:
+        i (int): The entry number.
+        rng (random.Random): The random source.
+
+    Returns:
+        dict[str, Any]: The document.
+    """
+    return {
+        "_id": f"Query test anime {i}",
+        "title": f"Query test anime {i}",
+        "genres": rng.sample(GENRES, 2),
+        "popularity": rng.randint(0, 10000),
+        "favorites": rng.randint(0, 1000),
+        "rating": rng.random() * 100,
+        "status": "FINISHED",
+        "description": "A long description. " * 50,
+        "new": i % 10 == 0,
+    }
+
+
+def test_listing_queries_keep_the_chapter_count() -> None:
+    """Only the detail model's chapter list is projected away by default."""
+    rng = random.Random(1)  # noqa: S311
+    DBUtils.get_collection("royalroad").insert_one(fiction(1, rng))
+    (model,) = Query(RoyalRoadModel, "royalroad").top("followers")
+    assert isinstance(model.chapters, int)
+    assert "description" not in model.model_fields_set
+    detail = Query(RoyalRoadDetailModel, "royalroad_details").projection()
+    assert "chapters" not in detail
+    assert "followers" in detail
+
+
+@pytest.fixture
+def live_mongo() -> Iterator[None]:
+    """Serve the live MongoDB named by MONGODB_TEST_URI to DBUtils.
+
+    `mongomock` has no query planner, so explain tests need a real server.
+    They are skipped unless the variable names a reachable one. Documents are
+    inserted into the scraper database with a marker field and removed
+    afterwards; the declared indexes are left in place, as `ensure_indexes`
+    would create them anyway.
+
+    Yields:
+        None: While the server is in use.
+    """
+    uri = os.environ.get(LIVE_URI)
+    if not uri:
+        pytest.skip(f"{LIVE_URI} is not set")
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB at {uri} is unavailable: {e}")
+    DBUtils.use_client(client)
+    rng = random.Random(0)  # noqa: S311
+    royalroad = DBUtils.get_collection("royalroad")
+    anilist = DBUtils.get_collection("anilist")
+    royalroad.insert_many([fiction(i, rng) | {MARKER: True} for i in range(500)])
+    anilist.insert_many([anime(i, rng) | {MARKER: True} for i in range(500)])
+    ensure_indexes(["royalroad", "anilist"])
+    try:
+        yield
+    finally:
+        royalroad.delete_many({MARKER: True})
+        anilist.delete_many({MARKER: True})
+        client.close()
+
+
+@pytest.mark.usefixtures("live_mongo")
+@pytest.mark.parametrize(
+    ("model", "collection", "query", "sort", "index"),
+    [
+        (RoyalRoadModel, "royalroad", {}, "followers", "followers_-1"),
+        (RoyalRoadModel, "royalroad", {}, "rating", "rating_-1"),
+        (
+            RoyalRoadModel,
+            "royalroad",
+            Query.genre_filter(["Fantasy"]),
+            "followers",
+            "genres_1_followers_-1",
+        ),
+        (
+            RoyalRoadModel,
+            "royalroad",
+            {"last_updated": {"$gte": datetime(2024, 12, 1, tzinfo=UTC)}},
+            "last_updated",
+            "last_updated_-1",
+        ),
+        (RoyalRoadModel, "royalroad", {"new": True}, None, "new_1"),
+        (AniListModel, "anilist", {}, "popularity", "popularity_-1"),
+        (AniListModel, "anilist", {}, "favorites", "favorites_-1"),
+        (
+            AniListModel,
+            "anilist",
+            Query.genre_filter(["Action"]),
+            "popularity",
+            "genres_1_popularity_-1",
+        ),
+        (AniListModel, "anilist", {"new": True}, None, "new_1"),
+    ],
+    ids=[
+        "royalroad-top-followers",
+        "royalroad-top-rating",
+        "royalroad-genre-top",
+        "royalroad-updated-since",
+        "royalroad-new",
+        "anilist-top-popularity",
+        "anilist-top-favorites",
+        "anilist-genre-top",
+        "anilist-new",
+    ],
+)
+def test_typed_queries_use_their_declared_index(
+    model: type, collection: str, query: dict, sort: str | None, index: str
+) -> None:
+    """Each typed query's winning plan reads the index declared for it."""
+    order = [(sort, DESCENDING)] if sort else None
+    assert index in Query(model, collection).explain(query, order)
@@ -0,0 +1,52 @@
+import os
+from datetime import UTC, datetime, timedelta
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.fixtures import royalroad_listing
+from scraper.core.archive import HtmlArchive
+from scraper.core.database import DBUtils
+from scraper.royalroad.replay import iter_saved_pages, replay_royalroad
+from scraper.royalroad.spider import RoyalRoadSpider
+from scraper.utils.utils import get_data_directory
+
+
+def followers(body: bytes) -> dict[str, int]:
+    """Parse the follower counts of a listing page.
+
+    Args:
+        body (bytes): The page.
+
+    Returns:
+        dict[str, int]: Followers by title.
+    """
+    response = HtmlResponse(
+        url="https://www.royalroad.com/fictions/best-rated?page=1",
+        body=body,
+        encoding="utf-8",
+    )
+    return {m.title: m.followers for m in RoyalRoadSpider.parse_response(response)}
+
+
+def test_replay_keeps_the_newest_snapshot() -> None:
+    """Older crawls and legacy files never overwrite a newer crawl."""
+    root = get_data_directory(RoyalRoadSpider.name)
+    first = datetime(2025, 1, 1, tzinfo=UTC)
+    legacy = root / "trending" / "1.html"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(royalroad_listing(1, seed=0))
+    stamp = (first - timedelta(days=1)).timestamp()
+    os.utime(legacy, (stamp, stamp))
+    archive = HtmlArchive(root)
+    archive.put("best_rated", 1, royalroad_listing(1, seed=2), first + timedelta(2))
+    archive.put("trending", 1, royalroad_listing(1, seed=1), first)
+    archive.close()
+    order = [(page.listing, page.path is None) for page in iter_saved_pages()]
+    assert order == [("trending", False), ("trending", True), ("best_rated", True)]
+    report = replay_royalroad(workers=2)
+    assert report.pages == 3
+    stored = {
+        doc["_id"]: doc["followers"]
+        for doc in DBUtils.get_collection("royalroad").find()
+    }
+    assert stored == followers(royalroad_listing(1, seed=2))
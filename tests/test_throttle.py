@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+from contextlib import suppress
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request
+from scrapy.core.downloader import Slot
+from scrapy.http import Response
+
+from scraper.anilist.client import AsyncAniListAPI
+from scraper.core.throttle import MIN_STEP, AdaptiveThrottle, AdaptiveThrottleMiddleware
+from tests.conftest import Configure
+from tests.stubs import AniListStub, StubServer
+
+HOST = "example.com"
+
+
+def single_slot() -> AdaptiveThrottle:
+    """Build a throttle allowing one request in flight and no delay.
+
+    Returns:
+        AdaptiveThrottle: The throttle.
+    """
+    return AdaptiveThrottle(
+        start_delay=0,
+        min_delay=0,
+        max_delay=1,
+        max_concurrency=1,
+        target_latency=1,
+        adaptive=False,
+    )
+
+
+def adaptive() -> AdaptiveThrottle:
+    """Build an adaptive throttle starting at a one-second delay.
+
+    Returns:
+        AdaptiveThrottle: The throttle.
+    """
+    return AdaptiveThrottle(
+        start_delay=1,
+        min_delay=0.1,
+        max_delay=10,
+        max_concurrency=3,
+        target_latency=1,
+    )
+
+
+def test_rate_limit_backs_off_and_honours_retry_after() -> None:
+    """A 429 doubles the delay, halves the concurrency and holds the host."""
+    throttle = adaptive()
+    throttle.state(HOST).concurrency = 2
+    state = throttle.record(HOST, 0.1, 429, wait=2)
+    assert state.delay == 2
+    assert state.concurrency == 1
+    assert state.throttled == 1
+    assert throttle.reserve(HOST) > 1.5
+
+
+@pytest.mark.parametrize(
+    ("latency", "status", "errors"),
+    [(None, None, 1), (0.1, 500, 1), (5, 200, 0)],
+    ids=["network-error", "server-error", "slow"],
+)
+def test_errors_and_slow_responses_raise_the_delay(
+    latency: float | None, status: int | None, errors: int
+) -> None:
+    """Failures and responses over the target latency slow the host down."""
+    throttle = adaptive()
+    state = throttle.record(HOST, latency, status)
+    assert state.delay == 1.25
+    assert state.concurrency == 1
+    assert state.errors == errors
+
+
+def test_fast_responses_recover_after_backoff() -> None:
+    """Fast responses bring the delay down, then add concurrency up to the cap."""
+    throttle = adaptive()
+    throttle.record(HOST, 0.1, 429)
+    for _ in range(100):
+        state = throttle.record(HOST, 0.1, 200)
+    assert state.delay == 0.1
+    assert state.concurrency == 3
+    state = throttle.record(HOST, 0.1, 503)
+    assert state.concurrency == 1
+    assert state.delay == MIN_STEP
+
+
+def test_middleware_holds_the_slot_for_retry_after() -> None:
+    """Scrapy's slot does not download again before `Retry-After` passes."""
+    throttle = adaptive()
+    slot = Slot(concurrency=1, delay=1, randomize_delay=False)
+    stats: dict[str, float] = {}
+    crawler = SimpleNamespace(
+        stats=SimpleNamespace(set_value=stats.__setitem__),
+        engine=SimpleNamespace(downloader=SimpleNamespace(slots={HOST: slot})),
+    )
+    middleware = AdaptiveThrottleMiddleware(crawler, throttle)
+    request = Request(f"https://{HOST}/", meta={"download_slot": HOST})
+    response = Response(request.url, status=429, headers={"Retry-After": "30"})
+    middleware.process_response(request, response, None)
+    assert slot.delay == 2
+    assert slot.lastseen > time.time() + 25
+    assert stats[f"throttle/{HOST}/throttled"] == 1
+
+
+def test_wait_async_wakes_when_another_thread_releases() -> None:
+    """A waiter blocks while the slot is busy and claims it once released."""
+    throttle = single_slot()
+    assert throttle.reserve(HOST) == 0
+
+    async def wait() -> None:
+        waiter = asyncio.create_task(throttle.wait_async(HOST))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        threading.Timer(0.1, throttle.release, [HOST]).start()
+        await asyncio.wait_for(waiter, timeout=2)
+
+    asyncio.run(wait())
+    state = throttle.state(HOST)
+    assert state.in_flight == 1
+    assert state.waiters == []
+
+
+def test_cancelled_waiter_does_not_break_release() -> None:
+    """Releasing after a waiter's loop has closed still frees the slot."""
+    throttle = single_slot()
+    throttle.reserve(HOST)
+
+    async def give_up() -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(throttle.wait_async(HOST), timeout=0.1)
+
+    asyncio.run(give_up())
+    throttle.release(HOST)
+    assert throttle.reserve(HOST) == 0
+
+
+def test_cancelled_sleep_frees_the_claimed_slot() -> None:
+    """A waiter cancelled while sleeping out the delay gives its slot back."""
+    throttle = single_slot()
+    throttle.start_delay = 5
+    throttle.max_concurrency = 2
+    assert throttle.reserve(HOST) == 0
+
+    async def give_up() -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(throttle.wait_async(HOST), timeout=0.1)
+
+    asyncio.run(give_up())
+    assert throttle.state(HOST).in_flight == 1
+
+
+def test_failed_concurrent_pull_frees_every_slot(configure: Configure) -> None:
+    """Batches cancelled after another one failed leave no slot claimed."""
+    with StubServer(AniListStub, fail={1}, delay=0.5) as server:
+        configure(
+            anilist_url=f"{server.url}/graphql",
+            anilist_pages_per_query=1,
+            anilist_concurrency=2,
+            throttle_max_concurrency=2,
+        )
+        with pytest.raises(ExceptionGroup):
+            AsyncAniListAPI(query_limit=100, page="Top 100", max_pages=2).start()
+        assert AdaptiveThrottle.get().state("127.0.0.1").in_flight == 0
+        server.state.update(fail=set(), delay=0)
+        AsyncAniListAPI(query_limit=100, page="Top 100", max_pages=2).start()
+    assert server.hits[1] == 1
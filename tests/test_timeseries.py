@@ -0,0 +1,61 @@
+from datetime import UTC, datetime, timedelta
+
+from scraper.anilist.fetcher import AniListFetcher
+from scraper.core.database import DBUtils
+from scraper.core.pipeline import item_ops
+from scraper.core.timeseries import TimeSeries, history
+from tests.conftest import Configure
+from tests.stubs import AniListStub, StubServer
+
+STORY = {
+    "title": "Story",
+    "followers": 10,
+    "views": 100,
+    "rating": 4.5,
+    "chapters": 3,
+    "pages": 50,
+}
+
+
+def observe(doc: dict) -> None:
+    """Write an item's metric history as the pipeline does.
+
+    Args:
+        doc (dict): The item.
+    """
+    for name, op in item_ops("royalroad", doc):
+        if name.endswith("_history"):
+            DBUtils.get_collection(name).bulk_write([op])
+
+
+def test_items_are_recorded_once_per_run() -> None:
+    """A repeated item adds nothing until the next run starts."""
+    series = TimeSeries.get("royalroad")
+    first = datetime(2026, 3, 2, 6, tzinfo=UTC)
+    series.start_run(first)
+    observe(STORY)
+    observe({**STORY, "followers": 11})
+    series.start_run(first)
+    observe(STORY)
+    second = first + timedelta(hours=6)
+    series.start_run(second)
+    observe({**STORY, "followers": 12})
+    recorded = history("royalroad", "Story")
+    assert recorded["t"] == [first, second]
+    assert recorded["followers"] == [10, 12]
+    assert DBUtils.get_collection("royalroad_history").count_documents({}) == 1
+
+
+def test_jobs_of_one_runner_run_record_each_item_once(configure: Configure) -> None:
+    """Fetches sharing the runner's start record the items they share once."""
+    with StubServer(AniListStub) as server:
+        configure(anilist_url=server.url)
+        started = datetime.now(UTC).replace(microsecond=0)
+        for _ in range(2):
+            fetcher = AniListFetcher(query_limit=50, max_pages=1)
+            fetcher.run_started = started
+            fetcher.fetch()
+        title = DBUtils.get_collection("anilist").find_one()["title"]
+        assert history("anilist", title)["t"] == [started]
+        AniListFetcher(query_limit=50, max_pages=1).fetch()
+    assert len(history("anilist", title)["t"]) == 2
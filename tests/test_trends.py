@@ -0,0 +1,47 @@
+import numpy as np
+
+from scraper.core.trends import acceleration, forward_fill, velocity
+
+NAN = np.nan
+
+
+def test_forward_fill_carries_values_over_gaps_but_not_before_the_first() -> None:
+    """Gaps take the last observed value; days before any observation stay NaN."""
+    values = np.array(
+        [
+            [NAN, 1.0, NAN, 3.0, NAN],
+            [2.0, NAN, NAN, NAN, 5.0],
+            [NAN, NAN, NAN, NAN, NAN],
+        ]
+    )
+    np.testing.assert_array_equal(
+        forward_fill(values),
+        [
+            [NAN, 1.0, 1.0, 3.0, 3.0],
+            [2.0, 2.0, 2.0, 2.0, 5.0],
+            [NAN, NAN, NAN, NAN, NAN],
+        ],
+    )
+
+
+def test_velocity_is_the_daily_change_over_the_window() -> None:
+    """Rows first seen inside the window start there; one-day rows have none."""
+    values = np.array(
+        [
+            np.arange(11.0),
+            [NAN] * 8 + [4.0, 6.0, 8.0],
+            [NAN] * 10 + [5.0],
+            [NAN] * 11,
+        ]
+    )
+    np.testing.assert_array_equal(velocity(values, 7), [1.0, 2.0, NAN, NAN])
+    np.testing.assert_array_equal(velocity(values[:, :1], 7), [NAN] * 4)
+
+
+def test_acceleration_compares_the_last_two_windows() -> None:
+    """Growing from one to three a day over a week is an acceleration of two."""
+    speeding_up = np.concatenate([np.arange(8.0), 7 + 3 * np.arange(1.0, 8.0)])
+    steady = np.full(15, 40.0)
+    values = np.vstack([speeding_up, steady])
+    np.testing.assert_array_equal(acceleration(values, 7), [2.0, 0.0])
+    np.testing.assert_array_equal(acceleration(values[:, :7], 7), [NAN, NAN])